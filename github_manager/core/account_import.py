@@ -0,0 +1,159 @@
+"""
+Bulk account import from CSV or JSON (label, token, optional name / email).
+Tokens are validated concurrently (bounded), stored through core.secrets, and
+the caller appends all new accounts to accounts.json in one write.
+Every input row gets a report entry: valid, invalid or duplicate.
+"""
+import csv
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .github_api import get_user, get_user_emails, last_error
+from .metrics import error_text
+from .rate_limit import PRIORITY_BACKGROUND
+from .secrets import create_and_store_token
+
+STATUS_VALID = "valid"
+STATUS_INVALID = "invalid"
+STATUS_DUPLICATE = "duplicate"
+
+# Accepted column / key names (lower-case) -> field
+_FIELD_ALIASES = {
+    "label": "label",
+    "token": "token",
+    "pat": "token",
+    "name": "name",
+    "contributor_name": "name",
+    "email": "email",
+    "contributor_email": "email",
+}
+
+
+def _normalize(raw: dict) -> dict:
+    row = {"label": "", "token": "", "name": "", "email": ""}
+    for key, value in raw.items():
+        field = _FIELD_ALIASES.get(str(key or "").strip().lower())
+        if field and value is not None:
+            row[field] = str(value).strip()
+    return row
+
+
+def parse_file(path: str) -> list[dict]:
+    """
+    Rows from a .json (list of objects, or {"accounts": [...]}) or .csv file with a header line.
+    Each row: {"row": 1-based number, "label", "token", "name", "email"}. Raises ValueError on bad format.
+    """
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8-sig") as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"JSON không hợp lệ: {e}") from e
+        if isinstance(data, dict):
+            data = data.get("accounts")
+        if not isinstance(data, list) or not all(isinstance(x, dict) for x in data):
+            raise ValueError("JSON phải là danh sách object {label, token, name, email}.")
+        raws = data
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "token" not in {
+                _FIELD_ALIASES.get(h.strip().lower()) for h in reader.fieldnames if h
+            }:
+                raise ValueError("CSV cần dòng tiêu đề có cột label và token (name, email tùy chọn).")
+            raws = list(reader)
+    rows = []
+    for n, raw in enumerate(raws, start=1):
+        row = _normalize(raw)
+        row["row"] = n
+        rows.append(row)
+    return rows
+
+
+def _check(row: dict) -> dict:
+    """Validate one token (GET /user, /user/emails only when no email is known)."""
+    if not row["token"]:
+        return {"user": None, "email": "", "error": "Thiếu token"}
+    user = get_user(row["token"], priority=PRIORITY_BACKGROUND)
+    if not user:
+        return {"user": None, "email": "", "error": error_text(last_error()) or "Token không hợp lệ"}
+    email = row["email"] or user.get("email") or ""
+    if not email:
+        emails = get_user_emails(row["token"], priority=PRIORITY_BACKGROUND) or []
+        primary = next((e for e in emails if e.get("primary") and e.get("verified")), None)
+        email = primary.get("email", "") if primary else ""
+    if not email:
+        email = f"{user.get('login', '')}@users.noreply.github.com"
+    return {"user": user, "email": email, "error": ""}
+
+
+def validate_rows(
+    rows: list[dict],
+    existing_logins: set[str],
+    max_parallel: int = 16,
+    on_progress=None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Validate rows concurrently (max_parallel at a time) and store tokens of new valid accounts.
+    existing_logins: logins already in accounts.json (lower-case); later rows with the same login
+    as an earlier one are duplicates too. on_progress(done, total) is called from this thread.
+    Returns (new account dicts for accounts.json, report rows in input order:
+    {"row", "label", "login", "status", "message"}).
+    """
+    results: dict[int, dict] = {}
+    if rows:
+        with ThreadPoolExecutor(max_workers=max(1, min(int(max_parallel), len(rows)))) as pool:
+            futures = {pool.submit(_check, row): row["row"] for row in rows}
+            for done, fut in enumerate(as_completed(futures), start=1):
+                try:
+                    results[futures[fut]] = fut.result()
+                except Exception as e:
+                    results[futures[fut]] = {"user": None, "email": "", "error": f"{type(e).__name__}: {e}"}
+                if on_progress:
+                    on_progress(done, len(rows))
+
+    # Duplicates and secrets in input order, so the first row of a login wins
+    seen = set(existing_logins)
+    now = datetime.utcnow().isoformat() + "Z"
+    accounts = []
+    report = []
+    for row in rows:
+        res = results[row["row"]]
+        user = res["user"]
+        login = (user or {}).get("login", "")
+        entry = {"row": row["row"], "label": row["label"], "login": login}
+        if not user:
+            report.append(dict(entry, status=STATUS_INVALID, message=res["error"]))
+            continue
+        if login.lower() in seen:
+            report.append(dict(entry, status=STATUS_DUPLICATE, message="Login đã có trong danh sách tài khoản"))
+            continue
+        try:
+            secret_key = create_and_store_token(row["token"])
+        except Exception as e:
+            report.append(dict(entry, status=STATUS_INVALID, message=f"Không lưu được token: {e}"))
+            continue
+        seen.add(login.lower())
+        accounts.append({
+            "id": str(uuid.uuid4()),
+            "label": row["label"] or login,
+            "secretKey": secret_key,
+            "login": login,
+            "email": res["email"],
+            "name": row["name"] or user.get("name") or login,
+            "avatarUrl": user.get("avatar_url", ""),
+            "addedAt": now,
+            "patStatus": "Valid",
+            "lastCheckAt": now,
+        })
+        report.append(dict(entry, label=row["label"] or login, status=STATUS_VALID, message=""))
+    return accounts, report
+
+
+def write_report_csv(path: str, report: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=["row", "label", "login", "status", "message"])
+        w.writeheader()
+        w.writerows(report)
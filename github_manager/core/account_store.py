@@ -0,0 +1,173 @@
+"""
+In-memory copy of data/accounts.json shared by all pages.
+Reads never touch the disk; the file is re-read only when its mtime / size
+changed (reload_if_changed, driven by a file watcher in the UI). Changes apply to
+the copy at once, are reported to subscribers with the changed ids, and are
+written by core.store_service (batched, locked across processes, re-applied on
+the file's latest content so another instance's edits are kept). If a write fails,
+the copy is reloaded from disk and error listeners are told.
+"""
+import copy
+import logging
+import os
+import threading
+
+from .store_json import read_json, get_data_dir
+from .store_service import get_writer
+
+ACCOUNTS_FILE = "accounts.json"
+
+
+class AccountStore:
+    """Thread-safe; use get_account_store() for the shared instance."""
+
+    def __init__(self, filename: str = ACCOUNTS_FILE):
+        self.filename = filename
+        self._lock = threading.RLock()
+        self._data: dict | None = None
+        self._stat: tuple[int, int] | None = None
+        self._listeners = []
+        self._error_listeners = []
+        self._pending = 0  # writes queued but not flushed yet
+
+    def _path(self) -> str:
+        return os.path.join(get_data_dir(), self.filename)
+
+    def _file_stat(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(self._path())
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> dict:
+        if self._data is None:
+            self._stat = self._file_stat()
+            data = read_json(self.filename)
+            if not isinstance(data, dict):
+                data = {}
+            if not isinstance(data.get("accounts"), list):
+                data["accounts"] = []
+            self._data = data
+        return self._data
+
+    def accounts(self) -> list[dict]:
+        """Copies of all account dicts, in file order. No disk I/O once loaded."""
+        with self._lock:
+            return [dict(a) for a in self._load()["accounts"]]
+
+    def get(self, account_id: str) -> dict | None:
+        with self._lock:
+            for a in self._load()["accounts"]:
+                if a.get("id") == account_id:
+                    return dict(a)
+        return None
+
+    def subscribe(self, callback) -> None:
+        """callback(changed_ids: list[str] | None) after each change; None = reloaded from disk."""
+        self._listeners.append(callback)
+
+    def subscribe_errors(self, callback) -> None:
+        """callback(message: str) when a change could not be written (called on the writer thread)."""
+        self._error_listeners.append(callback)
+
+    def _notify(self, ids) -> None:
+        for cb in list(self._listeners):
+            cb(ids)
+
+    def update(self, mutator) -> list[str]:
+        """
+        Apply mutator(accounts list) to a working copy, swap it in and queue the same change
+        for the file. mutator returns the ids it changed (or None for "all"); nothing is
+        written for []. It runs again on the file's content, so it must only depend on its input.
+        """
+        def apply_to_file(file_data):
+            if not isinstance(file_data.get("accounts"), list):
+                file_data["accounts"] = []
+            mutator(file_data["accounts"])
+
+        with self._lock:
+            data = copy.deepcopy(self._load())
+            changed = mutator(data["accounts"])
+            if changed is not None and not changed:
+                return []
+            self._data = data
+            self._pending += 1
+            # Queued under the lock so the file sees changes in the same order as memory
+            fut = get_writer().submit(self.filename, apply_to_file)
+        # Outside the lock: the callback takes it, and runs right here if the write already finished
+        fut.add_done_callback(self._on_flushed)
+        ids = list(changed) if changed is not None else [a.get("id", "") for a in data["accounts"]]
+        self._notify(ids)
+        return ids
+
+    def _on_flushed(self, fut) -> None:
+        """Writer thread: once no write is pending, adopt the file as written (it may include other processes' edits)."""
+        merged = False
+        error = fut.exception()
+        if error is not None:
+            logging.getLogger(__name__).error("Writing %s failed", self.filename, exc_info=error)
+            for cb in list(self._error_listeners):
+                cb(f"{type(error).__name__}: {error}")
+        with self._lock:
+            self._pending -= 1
+            if self._pending:
+                return
+            if error is None:
+                _, written = fut.result()
+                if written != self._data:
+                    self._data = copy.deepcopy(written)
+                    merged = True
+            else:
+                # The change is not on disk: show what is (a later success merges the same way)
+                self._data = None
+                self._load()
+                merged = True
+            self._stat = self._file_stat()
+        if merged:
+            self._notify(None)
+
+    def flush(self) -> None:
+        """Wait until queued changes are on disk."""
+        get_writer().flush()
+
+    def patch(self, account_id: str, fields: dict) -> bool:
+        """Set fields on one account. False if the account does not exist."""
+        def apply(accounts):
+            for a in accounts:
+                if a.get("id") == account_id:
+                    a.update(fields)
+                    return [account_id]
+            return []
+        return bool(self.update(apply))
+
+    def add(self, new_accounts: list[dict]) -> None:
+        if new_accounts:
+            self.update(lambda accounts: accounts.extend(new_accounts) or [a.get("id", "") for a in new_accounts])
+
+    def remove(self, account_id: str) -> bool:
+        def apply(accounts):
+            before = len(accounts)
+            accounts[:] = [a for a in accounts if a.get("id") != account_id]
+            return [account_id] if len(accounts) != before else []
+        return bool(self.update(apply))
+
+    def reload_if_changed(self) -> bool:
+        """Re-read the file if it was changed outside this store (mtime / size). True if reloaded."""
+        with self._lock:
+            if self._pending or (self._data is not None and self._file_stat() == self._stat):
+                return False
+            self._data = None
+            self._load()
+        self._notify(None)
+        return True
+
+    def path(self) -> str:
+        return self._path()
+
+
+_store = AccountStore()
+
+
+def get_account_store() -> AccountStore:
+    return _store
@@ -0,0 +1,128 @@
+"""
+Content-addressed avatar cache: <app data>/avatars/<sha256>.img plus index.json
+(url -> sha, ETag). Reads never touch the network; fetch() revalidates with
+If-None-Match and only replaces the image when the ETag / content changed.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+from .store_json import get_app_data_root
+from .http_client import get_client
+from .rate_limit import PRIORITY_INTERACTIVE
+
+AVATAR_DIRNAME = "avatars"
+INDEX_NAME = "index.json"
+# Cached avatars are revalidated in the background after this long
+REFRESH_AFTER_SECONDS = 24 * 3600
+
+_lock = threading.Lock()
+_index: dict | None = None
+
+
+def _dir() -> str:
+    path = os.path.join(get_app_data_root(), AVATAR_DIRNAME)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _blob_path(sha: str) -> str:
+    return os.path.join(_dir(), sha + ".img")
+
+
+def _load_index() -> dict:
+    global _index
+    if _index is None:
+        try:
+            with open(os.path.join(_dir(), INDEX_NAME), "r", encoding="utf-8") as f:
+                _index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            _index = {}
+    return _index
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+
+
+def _save_index() -> None:
+    _atomic_write(os.path.join(_dir(), INDEX_NAME), json.dumps(_index).encode("utf-8"))
+
+
+def get_cached(url: str) -> bytes | None:
+    """Image bytes for url from disk, or None. No network."""
+    if not url:
+        return None
+    with _lock:
+        entry = _load_index().get(url)
+    if not entry:
+        return None
+    try:
+        with open(_blob_path(entry["sha"]), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def cached_sha(url: str) -> str | None:
+    """Content hash of the cached image for url (stable key for in-memory icon caches)."""
+    with _lock:
+        entry = _load_index().get(url)
+    return entry.get("sha") if entry else None
+
+
+def needs_refresh(url: str) -> bool:
+    with _lock:
+        entry = _load_index().get(url)
+    return not entry or time.time() - entry.get("fetchedAt", 0) > REFRESH_AFTER_SECONDS
+
+
+def fetch(url: str, priority: str = PRIORITY_INTERACTIVE, timeout: float = 5) -> bytes | None:
+    """
+    Download (or revalidate) the avatar at url and store it.
+    Returns image bytes (cached bytes on 304), or None on failure.
+    """
+    if not url:
+        return None
+    with _lock:
+        entry = dict(_load_index().get(url) or {})
+    headers = {"If-None-Match": entry["etag"]} if entry.get("etag") else None
+    try:
+        resp = get_client().get(url, headers=headers, timeout=timeout, priority=priority)
+    except Exception:
+        return get_cached(url)
+    if resp.status_code == 304 and entry:
+        with _lock:
+            _load_index()[url] = dict(entry, fetchedAt=time.time())
+            _save_index()
+        return get_cached(url)
+    if resp.status_code != 200 or not resp.content:
+        return get_cached(url)
+    data = resp.content
+    sha = hashlib.sha256(data).hexdigest()
+    if not os.path.isfile(_blob_path(sha)):
+        _atomic_write(_blob_path(sha), data)
+    with _lock:
+        index = _load_index()
+        old_sha = (index.get(url) or {}).get("sha")
+        index[url] = {"sha": sha, "etag": resp.headers.get("ETag", ""), "fetchedAt": time.time()}
+        _save_index()
+        # Drop the previous image if no other URL points at it
+        if old_sha and old_sha != sha and all(e.get("sha") != old_sha for e in index.values()):
+            try:
+                os.unlink(_blob_path(old_sha))
+            except OSError:
+                pass
+    return data
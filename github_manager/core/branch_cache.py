@@ -0,0 +1,90 @@
+"""
+Per-repo cache of remote branch names (data/branch_cache.json) with a TTL.
+Branches come from the REST API, or `git ls-remote --heads` as fallback, so
+no clone is needed. Readers get cached names at once and refresh when stale.
+Writes go through core.store_service and only touch the repos they store, so
+entries written by another instance are kept.
+"""
+import threading
+import time
+
+from .store_json import read_json
+from .store_service import get_writer
+from .github_api import get_branches
+from .git_ops import ls_remote_heads
+from .settings import get_setting
+
+CACHE_FILE = "branch_cache.json"
+
+_lock = threading.Lock()
+_entries: dict | None = None  # "<account_id>/<owner/repo>" -> {"branches": [...], "fetchedAt": epoch}
+
+
+def _key(account_id: str, full_name: str) -> str:
+    return f"{account_id}/{full_name}"
+
+
+def _load() -> dict:
+    global _entries
+    if _entries is None:
+        data = read_json(CACHE_FILE)
+        _entries = data if isinstance(data, dict) else {}
+    return _entries
+
+
+def get_cached(account_id: str, full_name: str) -> tuple[list[str], float] | None:
+    """(branches, fetched_at) from memory / disk, or None if never fetched."""
+    with _lock:
+        entry = _load().get(_key(account_id, full_name))
+    if not entry:
+        return None
+    return list(entry.get("branches", [])), float(entry.get("fetchedAt", 0))
+
+
+def is_fresh(fetched_at: float) -> bool:
+    return time.time() - fetched_at < float(get_setting("branchCacheTtlSeconds"))
+
+
+def _merge(changes: dict):
+    """File mutator: set the given keys, unless the file already has a newer fetch for one."""
+    def apply(data):
+        for key, entry in changes.items():
+            current = data.get(key)
+            if not isinstance(current, dict) or float(current.get("fetchedAt", 0)) <= entry["fetchedAt"]:
+                data[key] = entry
+    return apply
+
+
+def put(account_id: str, full_name: str, branches: list[str]) -> None:
+    put_many(account_id, {full_name: branches})
+
+
+def put_many(account_id: str, branches_by_repo: dict[str, list[str]]) -> None:
+    """Store several repos at once (e.g. branch lists from the GraphQL loader); one write."""
+    if not branches_by_repo:
+        return
+    now = time.time()
+    changes = {
+        _key(account_id, full_name): {"branches": list(branches), "fetchedAt": now}
+        for full_name, branches in branches_by_repo.items()
+    }
+    with _lock:
+        _load().update(changes)
+        # Queued under the lock so the file sees the same order as memory
+        get_writer().submit(CACHE_FILE, _merge(changes))
+
+
+def fetch(account_id: str, full_name: str, token: str, clone_url: str = "", on_page=None, priority: str | None = None) -> list[str] | None:
+    """
+    Fetch branch names (API pages via on_page as they arrive; ls-remote fallback),
+    store them in the cache and return them. None if both ways fail.
+    """
+    kwargs = {"priority": priority} if priority else {}
+    branches = get_branches(token, full_name, on_page=on_page, **kwargs)
+    if branches is None and clone_url:
+        branches = ls_remote_heads(clone_url, token)
+        if branches is not None and on_page:
+            on_page(branches)
+    if branches is not None:
+        put(account_id, full_name, branches)
+    return branches
@@ -0,0 +1,69 @@
+"""
+File-backed keyring for systems without a keyring service (e.g. headless Linux).
+Tokens live in <app data>/keyring/tokens.json as plaintext, created readable by the current user only.
+core.secrets switches to it only when keyring has no usable backend and the user allowed it.
+"""
+import json
+import os
+import tempfile
+
+from jaraco.classes import properties
+from keyring.backend import KeyringBackend
+from keyring.errors import PasswordDeleteError
+
+from .store_json import get_app_data_root
+from .store_service import file_lock
+
+
+class FileKeyring(KeyringBackend):
+    @properties.classproperty
+    def priority(cls):
+        # Not viable for keyring's automatic backend selection: only ever set explicitly
+        raise RuntimeError("FileKeyring is only used when set explicitly")
+
+    def path(self) -> str:
+        path = os.path.join(get_app_data_root(), "keyring")
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        return os.path.join(path, "tokens.json")
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict) -> None:
+        path = self.path()
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+        try:
+            os.chmod(tmp, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def get_password(self, service, username):
+        return self._read().get(service, {}).get(username)
+
+    def set_password(self, service, username, password):
+        with file_lock(self.path()):
+            data = self._read()
+            data.setdefault(service, {})[username] = password
+            self._write(data)
+
+    def delete_password(self, service, username):
+        with file_lock(self.path()):
+            data = self._read()
+            if username not in data.get(service, {}):
+                raise PasswordDeleteError("Password not found")
+            del data[service][username]
+            self._write(data)
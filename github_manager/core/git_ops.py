@@ -191,3 +191,74 @@ def get_branches(workspace_path: str) -> list[str]:
     if code != 0:
         return []
     return [s.strip() for s in out.strip().splitlines() if s.strip()]
+
+
+def get_head_sha(workspace_path: str) -> str:
+    """Commit SHA of HEAD, or "" for an empty repo / not a repo."""
+    code, out, _ = _run(
+        ["git", "rev-parse", "--verify", "-q", "HEAD"],
+        cwd=workspace_path,
+    )
+    return out.strip() if code == 0 else ""
+
+
+def is_ancestor(workspace_path: str, ancestor: str, descendant: str = "HEAD") -> bool:
+    """True if commit ancestor is reachable from descendant."""
+    code, _, _ = _run(
+        ["git", "merge-base", "--is-ancestor", ancestor, descendant],
+        cwd=workspace_path,
+    )
+    return code == 0
+
+
+def list_tree_files(workspace_path: str, path: str, ref: str = "HEAD") -> list[str]:
+    """Files under path at ref (git ls-tree -r), repo-relative with "/" separators."""
+    code, out, _ = _run(
+        ["git", "ls-tree", "-r", "-z", "--name-only", ref, "--", path],
+        cwd=workspace_path,
+    )
+    if code != 0:
+        return []
+    return [p for p in out.split("\0") if p]
+
+
+def diff_name_status(workspace_path: str, old: str, new: str, path: str) -> list[tuple[str, str]]:
+    """
+    Added/deleted files under path between two commits: [(status, path), ...]
+    status is "A" or "D" (renames are reported as D + A).
+    """
+    code, out, _ = _run(
+        ["git", "diff", "--name-status", "-z", "--no-renames", "--diff-filter=AD", old, new, "--", path],
+        cwd=workspace_path,
+    )
+    if code != 0:
+        return []
+    parts = [p for p in out.split("\0") if p]
+    return list(zip(parts[0::2], parts[1::2]))
+
+
+def get_current_branch(workspace_path: str) -> str:
+    """Name of the checked-out branch ("main" if it cannot be read)."""
+    return _get_default_branch(workspace_path)
+
+
+def ls_remote_heads(clone_url: str, pat: str) -> list[str] | None:
+    """Branch names on the remote (git ls-remote --heads), no clone needed. None on failure."""
+    if "https://" in clone_url and "@" not in clone_url and pat:
+        auth_url = clone_url.replace("https://", f"https://{pat}@", 1)
+    else:
+        auth_url = clone_url
+    code, out, _ = _run(
+        ["git", "ls-remote", "--heads", auth_url],
+        cwd=os.path.expanduser("~"),
+        env={"GIT_TERMINAL_PROMPT": "0"},
+    )
+    if code != 0:
+        return None
+    prefix = "refs/heads/"
+    names = []
+    for line in out.splitlines():
+        parts = line.split("\t", 1)
+        if len(parts) == 2 and parts[1].startswith(prefix):
+            names.append(parts[1][len(prefix):])
+    return names
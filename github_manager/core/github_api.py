@@ -1,67 +1,59 @@
 """
 GitHub REST API client using PAT. No username/password.
+All calls go through the shared pooled client (core.http_client); listing and
+user/release reads are conditional requests served from the on-disk cache on 304.
+Functions return None on failure; last_error() then gives the status and reason.
 """
-import requests
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .http_client import get_client
+from .rate_limit import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from .metrics import last_error, set_last_error, response_reason, endpoint_template
 
 API_BASE = "https://api.github.com"
+# Max concurrent page requests when listing repositories
+REPO_PAGE_CONCURRENCY = 8
 
 
-def get_user(token: str) -> dict | None:
+def get_user(token: str, priority: str = PRIORITY_INTERACTIVE) -> dict | None:
     """
     GET /user. Returns user dict or None on failure.
     """
-    resp = requests.get(
-        f"{API_BASE}/user",
-        headers={
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json",
-        },
-        timeout=15,
-    )
+    resp = get_client().get(f"{API_BASE}/user", token=token, cache=True, priority=priority)
     if resp.status_code != 200:
         return None
     return resp.json()
 
 
-def get_user_emails(token: str) -> list[dict] | None:
+def get_user_emails(token: str, priority: str = PRIORITY_INTERACTIVE) -> list[dict] | None:
     """
     GET /user/emails. Cần PAT có scope user:email (classic) hoặc Email: Read (fine-grained).
     Returns list of {"email", "primary", "verified", ...} or None.
     """
-    resp = requests.get(
-        f"{API_BASE}/user/emails",
-        headers={
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json",
-        },
-        timeout=15,
-    )
+    resp = get_client().get(f"{API_BASE}/user/emails", token=token, cache=True, priority=priority)
     if resp.status_code != 200:
         return None
     return resp.json()
 
 
-def get_latest_release(owner: str, repo: str) -> dict | None:
+def get_latest_release(owner: str, repo: str, priority: str = PRIORITY_BACKGROUND) -> dict | None:
     """
     Lấy bản phát hành mới nhất. Public API, không cần token.
     Thử /releases/latest trước; nếu 404 (vd. chỉ có pre-release) thì dùng /releases (bản đầu tiên = mới nhất, kể cả pre-release).
     Returns release dict (tag_name, html_url, body, ...) or None.
     """
-    headers = {"Accept": "application/vnd.github.v3+json"}
-    resp = requests.get(
-        f"{API_BASE}/repos/{owner}/{repo}/releases/latest",
-        headers=headers,
-        timeout=15,
-    )
+    client = get_client()
+    resp = client.get(f"{API_BASE}/repos/{owner}/{repo}/releases/latest", cache=True, priority=priority)
     if resp.status_code == 200:
         return resp.json()
     # 404 khi chưa có release hoặc chỉ có pre-release → lấy danh sách releases, bản đầu = mới nhất
     if resp.status_code == 404:
-        resp_list = requests.get(
+        resp_list = client.get(
             f"{API_BASE}/repos/{owner}/{repo}/releases",
             params={"per_page": 1},
-            headers=headers,
-            timeout=15,
+            cache=True,
+            priority=priority,
         )
         if resp_list.status_code == 200:
             data = resp_list.json()
@@ -70,19 +62,154 @@ def get_latest_release(owner: str, repo: str) -> dict | None:
     return None
 
 
-def get_repos(token: str, per_page: int = 100) -> list[dict] | None:
+def _last_page(resp) -> int:
+    """Page number of rel="last" in the Link header (1 if there is only one page)."""
+    last = resp.links.get("last", {}).get("url", "")
+    m = re.search(r"[?&]page=(\d+)", last)
+    return int(m.group(1)) if m else 1
+
+
+def _get_all_pages(
+    url: str,
+    token: str | None,
+    per_page: int,
+    on_page,
+    max_parallel: int,
+    priority: str,
+) -> list | None:
+    """
+    GET every page of a paginated list endpoint. Page 1 gives the page count
+    (Link rel="last"); the remaining pages are fetched concurrently, at most
+    max_parallel at a time. on_page(list) is called from the fetching threads
+    with each page as it arrives (page 1 first). Returns items in page order or None.
+    """
+    client = get_client()
+
+    def fetch_raw(page: int):
+        return client.get(
+            url,
+            params={"per_page": per_page, "page": page},
+            token=token,
+            cache=True,
+            priority=priority,
+        )
+
+    def fetch(page: int):
+        resp = fetch_raw(page)
+        return resp if resp.status_code == 200 else None
+
+    first = fetch(1)
+    if first is None:
+        return None  # last_error() set by the client in this thread
+    pages = {1: first.json()}
+    if on_page:
+        on_page(pages[1])
+    last = _last_page(first)
+    if last > 1:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, last - 1))) as pool:
+            futures = {pool.submit(fetch_raw, n): n for n in range(2, last + 1)}
+            failed = False
+            for fut in as_completed(futures):
+                exc = fut.exception()
+                resp = fut.result() if exc is None else None
+                if resp is None or resp.status_code != 200:
+                    # Pages run in pool threads: copy the failure to the caller's thread
+                    if not failed:
+                        if exc is not None:
+                            set_last_error(0, f"{type(exc).__name__}: {exc}", endpoint_template("GET", url))
+                        else:
+                            set_last_error(resp.status_code, response_reason(resp), endpoint_template("GET", url))
+                    failed = True
+                    continue
+                items = resp.json()
+                pages[futures[fut]] = items
+                if on_page:
+                    on_page(items)
+        if failed:
+            return None
+    return [r for n in sorted(pages) for r in pages[n]]
+
+
+def get_repos(
+    token: str,
+    per_page: int = 100,
+    on_page=None,
+    max_parallel: int = REPO_PAGE_CONCURRENCY,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> list[dict] | None:
     """
-    GET /user/repos. Returns list of repo dicts or None on failure.
+    GET /user/repos, all pages (fetched concurrently). Returns list of repo dicts
+    (in page order) or None on failure. on_page(list) gets each page as it arrives.
     """
-    resp = requests.get(
-        f"{API_BASE}/user/repos",
-        params={"per_page": per_page},
-        headers={
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json",
-        },
-        timeout=15,
+    return _get_all_pages(f"{API_BASE}/user/repos", token, per_page, on_page, max_parallel, priority)
+
+
+def get_branches(
+    token: str,
+    full_name: str,
+    on_page=None,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> list[str] | None:
+    """
+    GET /repos/{owner}/{repo}/branches, all pages. Returns branch names or None.
+    on_page(list of names) gets each page as it arrives.
+    """
+    page_cb = (lambda items: on_page([b.get("name", "") for b in items])) if on_page else None
+    items = _get_all_pages(
+        f"{API_BASE}/repos/{full_name}/branches",
+        token,
+        100,
+        page_cb,
+        REPO_PAGE_CONCURRENCY,
+        priority,
+    )
+    if items is None:
+        return None
+    return [b.get("name", "") for b in items]
+
+
+def get_tree_paths(token: str, full_name: str, ref: str, path: str) -> list[str] | None:
+    """
+    Files under directory path (top-level dir, e.g. "uploads") at ref, via the git trees API.
+    Returns paths relative to that directory, [] if it does not exist, None on failure.
+    """
+    client = get_client()
+    resp = client.get(f"{API_BASE}/repos/{full_name}/git/trees/{ref}", token=token)
+    if resp.status_code == 409:  # empty repository
+        return []
+    if resp.status_code != 200:
+        return None
+    sub = next(
+        (t for t in resp.json().get("tree", []) if t.get("path") == path and t.get("type") == "tree"),
+        None,
+    )
+    if not sub:
+        return []
+    resp = client.get(
+        f"{API_BASE}/repos/{full_name}/git/trees/{sub['sha']}",
+        params={"recursive": 1},
+        token=token,
+        timeout=30,
     )
     if resp.status_code != 200:
         return None
-    return resp.json()
+    data = resp.json()
+    if not data.get("truncated"):
+        return [t["path"] for t in data.get("tree", []) if t.get("type") == "blob"]
+    # Too large for one recursive listing: walk the subtrees one level at a time
+    paths: list[str] = []
+    pending = [("", sub["sha"])]
+    while pending:
+        prefix, sha = pending.pop()
+        resp = client.get(f"{API_BASE}/repos/{full_name}/git/trees/{sha}", token=token, timeout=30)
+        if resp.status_code != 200:
+            return None
+        data = resp.json()
+        if data.get("truncated"):
+            return None
+        for t in data.get("tree", []):
+            if t.get("type") == "blob":
+                paths.append(prefix + t["path"])
+            elif t.get("type") == "tree":
+                pending.append((prefix + t["path"] + "/", t["sha"]))
+    return paths
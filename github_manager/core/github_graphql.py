@@ -0,0 +1,233 @@
+"""
+GitHub GraphQL loader: repositories with default branch, all branches and
+viewer permission in a few paged queries (instead of REST calls per repo).
+Results use the same dict shape as github_api.get_repos, plus "branches".
+The endpoint can point at a local stand-in that replays recorded responses
+(argument or GITHUB_GRAPHQL_URL).
+"""
+import os
+
+from .http_client import get_client
+from .rate_limit import PRIORITY_INTERACTIVE
+from .metrics import set_last_error
+
+GRAPHQL_URL = os.environ.get("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+# Repos per query and branches fetched with each repo (GraphQL node limit: first*refs << 500k)
+REPOS_PER_PAGE = 50
+REFS_PER_REPO = 100
+# Repos whose remaining branches are fetched together in one aliased query
+REFS_BATCH = 20
+
+_REPOS_QUERY = """
+query($first: Int!, $after: String, $refs: Int!) {
+  viewer {
+    repositories(first: $first, after: $after,
+                 ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],
+                 orderBy: {field: NAME, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        name
+        nameWithOwner
+        isPrivate
+        url
+        owner { login }
+        defaultBranchRef { name }
+        viewerPermission
+        refs(refPrefix: "refs/heads/", first: $refs) {
+          pageInfo { hasNextPage endCursor }
+          nodes { name }
+        }
+      }
+    }
+  }
+}
+"""
+
+_REFS_FRAGMENT = """
+  r{i}: repository(owner: {owner}, name: {name}) {{
+    refs(refPrefix: "refs/heads/", first: 100, after: {after}) {{
+      pageInfo {{ hasNextPage endCursor }}
+      nodes {{ name }}
+    }}
+  }}"""
+
+_DETAILS_FRAGMENT = """
+  r{i}: repository(owner: {owner}, name: {name}) {{
+    diskUsage
+    pushedAt
+    pullRequests(states: OPEN) {{ totalCount }}
+  }}"""
+# Repos per aliased details query
+DETAILS_BATCH = 25
+
+# viewerPermission -> REST-style permissions dict
+_PERMISSION_LEVELS = ["READ", "TRIAGE", "WRITE", "MAINTAIN", "ADMIN"]
+
+
+def _graphql(
+    token: str,
+    query: str,
+    variables: dict | None,
+    endpoint: str,
+    priority: str,
+    partial: bool = False,
+) -> dict | None:
+    """
+    POST one query; returns the "data" object or None on HTTP / GraphQL errors (see metrics.last_error).
+    partial: keep "data" when only some fields failed (aliased queries; failed aliases are null).
+    """
+    resp = get_client().post(
+        endpoint,
+        token=token,
+        json={"query": query, "variables": variables or {}},
+        priority=priority,
+        resource="graphql",
+    )
+    if resp.status_code != 200:
+        return None
+    body = resp.json()
+    data = body.get("data")
+    if body.get("errors") or not data:
+        errors = body.get("errors") or [{}]
+        set_last_error(200, errors[0].get("message") or "GraphQL error", "POST /graphql")
+        if not (partial and data):
+            return None
+    return data
+
+
+def _permissions(level: str | None) -> dict:
+    rank = _PERMISSION_LEVELS.index(level) if level in _PERMISSION_LEVELS else -1
+    return {
+        "pull": rank >= 0,
+        "triage": rank >= 1,
+        "push": rank >= 2,
+        "maintain": rank >= 3,
+        "admin": rank >= 4,
+    }
+
+
+def _to_repo(node: dict) -> dict:
+    """GraphQL repository node -> get_repos-style dict."""
+    url = node.get("url", "")
+    default = (node.get("defaultBranchRef") or {}).get("name") or "main"
+    branches = [n["name"] for n in (node.get("refs") or {}).get("nodes", [])]
+    return {
+        "name": node.get("name", ""),
+        "full_name": node.get("nameWithOwner", ""),
+        "private": bool(node.get("isPrivate")),
+        "html_url": url,
+        "clone_url": f"{url}.git" if url else "",
+        "owner": {"login": (node.get("owner") or {}).get("login", "")},
+        "default_branch": default,
+        "permissions": _permissions(node.get("viewerPermission")),
+        "viewer_permission": node.get("viewerPermission") or "",
+        "branches": branches,
+    }
+
+
+def _quote(s: str) -> str:
+    return '"' + s.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _fetch_remaining_refs(token: str, pending: list[tuple[dict, str]], endpoint: str, priority: str) -> bool:
+    """
+    pending: [(repo dict, refs endCursor)] for repos with more than REFS_PER_REPO branches.
+    Fetches the rest REFS_BATCH repos per aliased query. Returns False on failure.
+    """
+    while pending:
+        batch, pending = pending[:REFS_BATCH], pending[REFS_BATCH:]
+        parts = []
+        for i, (repo, cursor) in enumerate(batch):
+            owner, _, name = repo["full_name"].partition("/")
+            parts.append(_REFS_FRAGMENT.format(i=i, owner=_quote(owner), name=_quote(name), after=_quote(cursor)))
+        data = _graphql(token, "query {" + "".join(parts) + "\n}", None, endpoint, priority)
+        if data is None:
+            return False
+        for i, (repo, _) in enumerate(batch):
+            refs = (data.get(f"r{i}") or {}).get("refs") or {}
+            repo["branches"].extend(n["name"] for n in refs.get("nodes", []))
+            info = refs.get("pageInfo") or {}
+            if info.get("hasNextPage"):
+                pending.append((repo, info.get("endCursor")))
+    return True
+
+
+def load_repos_with_branches(
+    token: str,
+    endpoint: str | None = None,
+    on_page=None,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> list[dict] | None:
+    """
+    All repos of the token's user with default branch, branch names and viewer permission.
+    Returns list of repo dicts (get_repos shape + "branches", "viewer_permission") or None on failure.
+    on_page(list) gets each page once its branch lists are complete.
+    """
+    endpoint = endpoint or GRAPHQL_URL
+    repos = []
+    after = None
+    while True:
+        data = _graphql(
+            token,
+            _REPOS_QUERY,
+            {"first": REPOS_PER_PAGE, "after": after, "refs": REFS_PER_REPO},
+            endpoint,
+            priority,
+        )
+        if data is None:
+            return None
+        conn = (data.get("viewer") or {}).get("repositories") or {}
+        page = []
+        pending = []
+        for node in conn.get("nodes", []):
+            repo = _to_repo(node)
+            page.append(repo)
+            info = (node.get("refs") or {}).get("pageInfo") or {}
+            if info.get("hasNextPage"):
+                pending.append((repo, info.get("endCursor")))
+        if pending and not _fetch_remaining_refs(token, pending, endpoint, priority):
+            return None
+        repos.extend(page)
+        if on_page:
+            on_page(page)
+        info = conn.get("pageInfo") or {}
+        if not info.get("hasNextPage"):
+            return repos
+        after = info.get("endCursor")
+
+
+def load_repo_details(
+    token: str,
+    full_names: list[str],
+    endpoint: str | None = None,
+    priority: str = PRIORITY_INTERACTIVE,
+) -> dict[str, dict] | None:
+    """
+    Size (KB), last push and open pull request count for the given repos, DETAILS_BATCH per
+    aliased query. Returns {full_name: {"size_kb", "pushed_at", "open_prs"}} or None if no batch
+    succeeded. Repos that fail on their own (deleted / renamed, SAML, missing pull request access)
+    and batches whose query failed are left out.
+    """
+    endpoint = endpoint or GRAPHQL_URL
+    out = {}
+    ok = False
+    for start in range(0, len(full_names), DETAILS_BATCH):
+        batch = full_names[start:start + DETAILS_BATCH]
+        parts = []
+        for i, full in enumerate(batch):
+            owner, _, name = full.partition("/")
+            parts.append(_DETAILS_FRAGMENT.format(i=i, owner=_quote(owner), name=_quote(name)))
+        data = _graphql(token, "query {" + "".join(parts) + "\n}", None, endpoint, priority, partial=True)
+        if data is None:
+            continue
+        ok = True
+        for i, full in enumerate(batch):
+            node = data.get(f"r{i}")
+            if not node:
+                continue
+            out[full] = {
+                "size_kb": int(node.get("diskUsage") or 0),
+                "pushed_at": node.get("pushedAt") or "",
+                "open_prs": int((node.get("pullRequests") or {}).get("totalCount") or 0),
+            }
+    return out if ok else None
@@ -0,0 +1,162 @@
+"""
+On-disk cache for conditional GETs (ETag / Last-Modified).
+Storage: <app data>/http_cache/<key>.entry — one JSON metadata line, then the raw body.
+A 304 answer is served from the stored body; GitHub does not count 304s against the quota.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CACHE_DIRNAME = "http_cache"
+MAX_BYTES = 64 * 1024 * 1024
+MAX_AGE_SECONDS = 30 * 24 * 3600
+# Run eviction once every N stores
+_EVICT_EVERY = 50
+# Only these response headers are kept (body is stored decoded, so no Content-Encoding)
+_KEEP_HEADERS = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+
+class HttpCache:
+    """Thread-safe, size/age-bounded store of GET bodies keyed by URL + params + token."""
+
+    def __init__(self, root: str, max_bytes: int = MAX_BYTES, max_age: float = MAX_AGE_SECONDS):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(url: str, params: dict | None = None, token: str | None = None) -> str:
+        """Cache key; the token is only mixed in as a hash (responses differ per user)."""
+        h = hashlib.sha256()
+        h.update(url.encode("utf-8"))
+        if params:
+            h.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        if token:
+            h.update(b"\0" + hashlib.sha256(token.encode("utf-8")).digest())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key + ".entry")
+
+    def get(self, key: str) -> tuple[dict, bytes] | None:
+        """(meta, body) or None. Entries older than max_age are treated as missing."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                meta = json.loads(f.readline().decode("utf-8"))
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta.get("stored_at", 0) > self.max_age:
+            return None
+        return meta, body
+
+    def conditional_headers(self, meta: dict) -> dict:
+        h = {}
+        headers = meta.get("headers", {})
+        if headers.get("ETag"):
+            h["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            h["If-Modified-Since"] = headers["Last-Modified"]
+        return h
+
+    def put(self, key: str, resp: requests.Response) -> None:
+        """Store a 200 response that carries a validator (ETag or Last-Modified)."""
+        headers = {k: resp.headers[k] for k in _KEEP_HEADERS if k in resp.headers}
+        if "ETag" not in headers and "Last-Modified" not in headers:
+            return
+        meta = {"url": resp.url, "stored_at": time.time(), "headers": headers}
+        self._write(key, meta, resp.content)
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % _EVICT_EVERY == 1
+        if evict:
+            self.evict()
+
+    def refresh(self, key: str, meta: dict, body: bytes) -> None:
+        """Entry was revalidated (304): restart its age clock."""
+        meta = dict(meta, stored_at=time.time())
+        self._write(key, meta, body)
+
+    def _write(self, key: str, meta: dict, body: bytes) -> None:
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".", suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8") + b"\n")
+                f.write(body)
+            os.replace(tmp, self._path(key))
+        except OSError:
+            self._unlink(tmp)
+
+    def response_from(self, meta: dict, body: bytes, fresh: requests.Response) -> requests.Response:
+        """Build a 200 Response from a cached body plus the headers of the 304 (rate limit etc.)."""
+        r = requests.Response()
+        r.status_code = 200
+        r.reason = "OK (cached)"
+        r._content = body
+        r.headers = CaseInsensitiveDict(meta.get("headers", {}))
+        for k, v in fresh.headers.items():
+            if k.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                r.headers[k] = v
+        r.url = fresh.url
+        r.request = fresh.request
+        r.elapsed = fresh.elapsed
+        r.encoding = "utf-8"
+        r.from_cache = True
+        return r
+
+    def evict(self) -> None:
+        """Drop entries older than max_age, then the least recently stored until under max_bytes."""
+        now = time.time()
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.root) as it:
+                for e in it:
+                    if not e.name.endswith(".entry"):
+                        continue
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    if now - st.st_mtime > self.max_age:
+                        self._unlink(e.path)
+                        continue
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+        except OSError:
+            return
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    def clear(self) -> None:
+        for name in os.listdir(self.root):
+            if name.endswith(".entry"):
+                self._unlink(os.path.join(self.root, name))
+
+    @staticmethod
+    def _unlink(path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
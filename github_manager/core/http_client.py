@@ -0,0 +1,273 @@
+"""
+Shared HTTP client for GitHub API calls and avatar downloads.
+One HTTPAdapter (keep-alive connection pool per host) is shared by all threads;
+each thread gets its own light Session on top of it, so workers can call the
+client concurrently. Default headers, timeout and retries live here.
+GETs made with cache=True are revalidated against core.http_cache (ETag / Last-Modified).
+Every request is scheduled by core.rate_limit (per-token quota, background priority).
+Authenticated responses also update core.token_status (PAT expiry, scopes, validity).
+Each request (timings of new connections included) is recorded in core.metrics.
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util import connection
+from urllib3.util.retry import Retry
+
+from .http_cache import HttpCache, CACHE_DIRNAME
+from .rate_limit import get_limiter, PRIORITY_INTERACTIVE
+from .store_json import get_app_data_root
+from . import token_status
+from . import metrics
+
+DEFAULT_TIMEOUT = 15
+# Hosts kept in the pool manager (api.github.com, avatars, ...) and sockets per host
+POOL_HOSTS = 8
+POOL_MAXSIZE = 16
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github.v3+json",
+    "User-Agent": "GitHubManager",
+}
+
+
+class _TimedConnectionMixin:
+    """
+    Reports DNS and TCP connect time of each new socket to core.metrics. Same steps and
+    errors as urllib3's _new_conn, with the lookup done once up front so it can be timed:
+    the resolved addresses are tried in order, as create_connection would.
+    """
+
+    def _new_conn(self):
+        t0 = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(self._dns_host, self.port, connection.allowed_gai_family(), socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        t1 = time.perf_counter()
+        error = None
+        for info in infos:
+            try:
+                sock = connection.create_connection(
+                    (info[4][0], self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+                break
+            except socket.timeout as e:
+                error = ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                )
+                error.__cause__ = e
+            except OSError as e:
+                error = NewConnectionError(self, f"Failed to establish a new connection: {e}")
+                error.__cause__ = e
+        else:
+            raise error or NewConnectionError(self, f"Failed to establish a new connection: no address for {self.host}")
+        metrics.note_connection(dns=t1 - t0, connect=time.perf_counter() - t1)
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        conn = metrics.take_connection() or {}
+        tls = time.perf_counter() - t0 - conn.get("dns", 0) - conn.get("connect", 0)
+        metrics.note_connection(**conn, tls=max(0.0, tls))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class HttpClient:
+    """Thread-safe pooled client. Use get_client() for the shared instance."""
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = 2,
+        pool_maxsize: int = POOL_MAXSIZE,
+        cache: HttpCache | None = None,
+    ):
+        self.timeout = timeout
+        self.cache = cache
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            raise_on_status=False,
+            respect_retry_after_header=True,
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self._adapter.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._requests = 0
+
+    def _session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = requests.Session()
+            s.headers.update(DEFAULT_HEADERS)
+            s.mount("https://", self._adapter)
+            s.mount("http://", self._adapter)
+            self._local.session = s
+        return s
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        token: str | None = None,
+        headers: dict | None = None,
+        timeout: float | None = None,
+        priority: str = PRIORITY_INTERACTIVE,
+        resource: str = "core",
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request; token adds the Authorization header. Raises requests exceptions like requests.get.
+        Waits first if the token's quota (resource: core / graphql / search) is exhausted;
+        priority=PRIORITY_BACKGROUND yields to interactive calls.
+        """
+        h = {}
+        if token:
+            h["Authorization"] = f"token {token}"
+        if headers:
+            h.update(headers)
+        limiter = get_limiter()
+        limiter.acquire(url, token, priority, resource)
+        resp = None
+        metrics.begin_request()
+        started = time.perf_counter()
+        try:
+            resp = self._session().request(
+                method,
+                url,
+                headers=h,
+                timeout=timeout or self.timeout,
+                **kwargs,
+            )
+        except Exception as e:
+            metrics.get_metrics().record(
+                method, url, 0, type(e).__name__, 0, time.perf_counter() - started, metrics.take_connection()
+            )
+            metrics.set_last_error(0, f"{type(e).__name__}: {e}", metrics.endpoint_template(method, url))
+            raise
+        finally:
+            limiter.release(url, token, priority, resp, resource)
+        failed = resp.status_code >= 400
+        reason = metrics.response_reason(resp) if failed else resp.reason or ""
+        metrics.get_metrics().record(
+            method,
+            url,
+            resp.status_code,
+            reason,
+            len(resp.content or b""),
+            time.perf_counter() - started,
+            metrics.take_connection(),
+            cached=resp.status_code == 304,
+        )
+        if failed:
+            metrics.set_last_error(resp.status_code, reason, metrics.endpoint_template(method, url))
+        token_status.observe(token, resp, url)
+        with self._lock:
+            self._requests += 1
+        return resp
+
+    def get(self, url: str, cache: bool = False, **kwargs) -> requests.Response:
+        """
+        GET url. With cache=True a stored ETag / Last-Modified is sent and a 304
+        is answered from disk (the returned Response has from_cache=True).
+        """
+        if not cache or self.cache is None:
+            return self.request("GET", url, **kwargs)
+        key = self.cache.key(url, kwargs.get("params"), kwargs.get("token"))
+        entry = self.cache.get(key)
+        if entry:
+            kwargs["headers"] = {**self.cache.conditional_headers(entry[0]), **(kwargs.get("headers") or {})}
+        resp = self.request("GET", url, **kwargs)
+        if resp.status_code == 304 and entry:
+            self.cache.hits += 1
+            self.cache.refresh(key, *entry)
+            return self.cache.response_from(entry[0], entry[1], resp)
+        self.cache.misses += 1
+        if resp.status_code == 200:
+            self.cache.put(key, resp)
+        return resp
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Connection reuse counters from the urllib3 pools:
+        requests sent, TCP/TLS connections opened, requests served on a reused connection.
+        """
+        opened = 0
+        sent = 0
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            sent += pool.num_requests
+        with self._lock:
+            total = self._requests
+        return {
+            "requests": total,
+            "connections_opened": opened,
+            "connections_reused": max(0, sent - opened),
+            "hosts": len(pools),
+            "cache_hits": self.cache.hits if self.cache else 0,
+            "cache_misses": self.cache.misses if self.cache else 0,
+        }
+
+    def close(self) -> None:
+        self._adapter.close()
+
+
+_client: HttpClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Shared client used by core.github_api and the UI workers."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                cache = HttpCache(os.path.join(get_app_data_root(), CACHE_DIRNAME))
+                _client = HttpClient(cache=cache)
+    return _client
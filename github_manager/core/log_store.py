@@ -0,0 +1,204 @@
+"""
+Run logs appended to rotating segment files (logs/segments/) instead of one file per commit.
+A run keeps a reference "segment:offset:length" (run_store column logRef). The active
+segment is plain text; once it passes SEGMENT_MAX_BYTES it is closed and compressed in
+independent BLOCK_SIZE blocks with an offset index, so reading one run's log costs one
+index lookup and one or two block reads whatever the segment size.
+Appending, packing and removing segments hold an advisory lock (segments/.active.lock)
+shared with other app instances, so offsets and packed segments stay consistent.
+"""
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from .store_json import get_logs_dir
+from .store_service import file_lock
+
+SEGMENT_MAX_BYTES = 4 * 1024 * 1024
+BLOCK_SIZE = 64 * 1024
+
+_ACTIVE_EXT = ".log"
+_PACKED_EXT = ".logz"
+_INDEX_EXT = ".idx"
+# .idx = little-endian uint64 offsets of each compressed block in .logz, plus the end offset
+_OFFSET = struct.Struct("<Q")
+
+_lock = threading.Lock()
+
+
+def _segments_dir() -> str:
+    path = os.path.join(get_logs_dir(), "segments")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@contextmanager
+def _segments_locked():
+    """Held around every change to the segment files, in this process and across instances."""
+    with _lock, file_lock(os.path.join(_segments_dir(), "active")):
+        yield
+
+
+def _segment_path(segment: int, ext: str) -> str:
+    return os.path.join(_segments_dir(), f"{segment:06d}{ext}")
+
+
+def _segment_numbers() -> list[int]:
+    nums = set()
+    for name in os.listdir(_segments_dir()):
+        stem, ext = os.path.splitext(name)
+        if ext in (_ACTIVE_EXT, _PACKED_EXT) and stem.isdigit():
+            nums.add(int(stem))
+    return sorted(nums)
+
+
+def format_ref(segment: int, offset: int, length: int) -> str:
+    return f"{segment}:{offset}:{length}"
+
+
+def parse_ref(ref: str) -> tuple[int, int, int] | None:
+    try:
+        segment, offset, length = (int(x) for x in (ref or "").split(":"))
+    except ValueError:
+        return None
+    return segment, offset, length
+
+
+def _active_segment() -> int:
+    """Segment to append to: the last plain one, or a new one after the last packed."""
+    nums = _segment_numbers()
+    if not nums:
+        return 1
+    last = nums[-1]
+    if os.path.isfile(_segment_path(last, _ACTIVE_EXT)):
+        return last
+    return last + 1
+
+
+def append(text: str) -> str:
+    """Append one run's log; returns its reference for run_store (logRef)."""
+    data = text.encode("utf-8")
+    with _segments_locked():
+        segment = _active_segment()
+        path = _segment_path(segment, _ACTIVE_EXT)
+        with open(path, "ab") as f:
+            # Size from the file itself: another instance may have appended since it was opened
+            offset = os.fstat(f.fileno()).st_size
+            # Records are separated by a newline so the segment stays readable as text
+            f.write(data + b"\n")
+            f.flush()
+            end = offset + len(data) + 1
+        if end >= SEGMENT_MAX_BYTES:
+            _pack_segment(segment)
+    return format_ref(segment, offset, len(data))
+
+
+def pack_segment(segment: int) -> bool:
+    """Compress a closed plain segment into .logz + .idx and remove the .log. True if packed."""
+    with _segments_locked():
+        return _pack_segment(segment)
+
+
+def _pack_segment(segment: int) -> bool:
+    src = _segment_path(segment, _ACTIVE_EXT)
+    packed = _segment_path(segment, _PACKED_EXT)
+    index = _segment_path(segment, _INDEX_EXT)
+    if not os.path.isfile(src):
+        return False
+    offsets = [0]
+    with open(src, "rb") as fin, open(packed + ".tmp", "wb") as fout:
+        while True:
+            block = fin.read(BLOCK_SIZE)
+            if not block:
+                break
+            fout.write(zlib.compress(block, 6))
+            offsets.append(fout.tell())
+    with open(index + ".tmp", "wb") as f:
+        f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+    # Index first: a .logz is only read when its .log is gone, and by then the index is in place
+    os.replace(index + ".tmp", index)
+    os.replace(packed + ".tmp", packed)
+    os.remove(src)
+    return True
+
+
+def _read_packed(segment: int, offset: int, length: int) -> bytes | None:
+    first = offset // BLOCK_SIZE
+    last = (offset + max(length, 1) - 1) // BLOCK_SIZE
+    with open(_segment_path(segment, _INDEX_EXT), "rb") as f:
+        f.seek(first * _OFFSET.size)
+        raw = f.read((last - first + 2) * _OFFSET.size)
+    bounds = [_OFFSET.unpack_from(raw, i * _OFFSET.size)[0] for i in range(len(raw) // _OFFSET.size)]
+    if len(bounds) < last - first + 2:
+        return None
+    out = []
+    with open(_segment_path(segment, _PACKED_EXT), "rb") as f:
+        f.seek(bounds[0])
+        chunk = f.read(bounds[-1] - bounds[0])
+    for i in range(len(bounds) - 1):
+        out.append(zlib.decompress(chunk[bounds[i] - bounds[0]:bounds[i + 1] - bounds[0]]))
+    start = offset - first * BLOCK_SIZE
+    return b"".join(out)[start:start + length]
+
+
+def read(ref: str) -> str | None:
+    """Log text for a reference from append(), or None if it is missing / unreadable."""
+    parsed = parse_ref(ref)
+    if parsed is None:
+        return None
+    segment, offset, length = parsed
+    try:
+        try:
+            with open(_segment_path(segment, _ACTIVE_EXT), "rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+        except FileNotFoundError:
+            # Packed (possibly just now, by this or another instance)
+            data = _read_packed(segment, offset, length)
+    except (OSError, zlib.error):
+        return None
+    if data is None or len(data) != length:
+        return None
+    return data.decode("utf-8", errors="replace")
+
+
+def read_run_log(run: dict) -> str | None:
+    """Log of a run_store entry: segment reference, or the per-run file of older runs (logPath)."""
+    if run.get("logRef"):
+        return read(run["logRef"])
+    path = run.get("logPath") or ""
+    if path and os.path.isfile(path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return None
+    return None
+
+
+def remove_unreferenced(referenced: set[int], min_age_seconds: float = 3600) -> int:
+    """
+    Delete closed segments no run points to any more (after retention); returns how many.
+    The active segment and recently written ones are kept: a log is appended just before its run is saved.
+    """
+    removed = 0
+    with _segments_locked():
+        active = _active_segment()
+        now = time.time()
+        for segment in _segment_numbers():
+            if segment >= active or segment in referenced:
+                continue
+            paths = [_segment_path(segment, ext) for ext in (_ACTIVE_EXT, _PACKED_EXT, _INDEX_EXT)]
+            try:
+                if any(now - os.path.getmtime(p) < min_age_seconds for p in paths if os.path.isfile(p)):
+                    continue
+                for p in paths:
+                    if os.path.isfile(p):
+                        os.remove(p)
+            except OSError:
+                continue
+            removed += 1
+    return removed
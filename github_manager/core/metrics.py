@@ -0,0 +1,272 @@
+"""
+Request instrumentation for the shared HTTP client.
+Every request is recorded per endpoint template ("GET /repos/{owner}/{repo}/branches"):
+status, bytes, DNS / connect / TLS / total time, connection reuse and cache hits,
+into fixed-bucket latency histograms. Viewable in Help -> API metrics, exportable as JSON.
+Also keeps the last API failure per thread (status + reason) for callers that got None.
+"""
+import json
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+API_HOST = "api.github.com"
+# Histogram bucket upper bounds in ms (last bucket: above the final bound)
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+RECENT_MAX = 200
+
+_HEX_SHA = re.compile(r"^[0-9a-f]{40}$")
+# Path segments whose next segment is a ref / sha, not a fixed name
+_REF_PARENTS = {"trees", "commits", "blobs", "branches", "tags"}
+
+
+def endpoint_template(method: str, url: str) -> str:
+    """'GET https://api.github.com/repos/a/b/branches?page=2' -> 'GET /repos/{owner}/{repo}/branches'."""
+    parts = urlsplit(url)
+    segs = [s for s in parts.path.split("/") if s]
+    out = []
+    i = 0
+    while i < len(segs):
+        s = segs[i]
+        if s == "repos" and i + 2 < len(segs) and not out:
+            out += ["repos", "{owner}", "{repo}"]
+            i += 3
+            continue
+        if s in ("users", "orgs") and i + 1 < len(segs) and not out:
+            out += [s, "{name}"]
+            i += 2
+            continue
+        if out and out[-1] in _REF_PARENTS:
+            out.append("{ref}")
+        elif s.isdigit():
+            out.append("{id}")
+        elif _HEX_SHA.match(s):
+            out.append("{sha}")
+        else:
+            out.append(s)
+        i += 1
+    path = "/" + "/".join(out)
+    host = "" if parts.netloc == API_HOST else parts.netloc
+    return f"{method.upper()} {host}{path}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (ms)."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms: float) -> None:
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile (capped at the max seen)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                bound = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.mean(), 2),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max, 2),
+            "buckets_ms": list(BUCKETS_MS),
+            "counts": list(self.counts),
+        }
+
+
+class _EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.statuses: dict[str, int] = {}
+        self.bytes = 0
+        self.new_connections = 0
+        self.reused = 0
+        self.cache_hits = 0
+        self.total = Histogram()
+        self.dns = Histogram()
+        self.connect = Histogram()
+        self.tls = Histogram()
+        self.last_error: dict | None = None
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "bytes": self.bytes,
+            "new_connections": self.new_connections,
+            "reused_connections": self.reused,
+            "cache_hits": self.cache_hits,
+            "total": self.total.to_dict(),
+            "dns": self.dns.to_dict(),
+            "connect": self.connect.to_dict(),
+            "tls": self.tls.to_dict(),
+            "last_error": self.last_error,
+        }
+
+
+class Metrics:
+    """Thread-safe registry; use get_metrics() for the shared instance."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointStats] = {}
+        self._recent: deque = deque(maxlen=RECENT_MAX)
+        self._started = time.time()
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: int,
+        reason: str,
+        nbytes: int,
+        total_s: float,
+        connection: dict | None,
+        cached: bool = False,
+    ) -> None:
+        """
+        One finished request. status 0 = no response (exception, reason = its type).
+        connection: {"dns", "connect", "tls"} seconds if a new connection was opened, else None (reused).
+        """
+        endpoint = endpoint_template(method, url)
+        failed = status == 0 or status >= 400
+        with self._lock:
+            st = self._endpoints.get(endpoint)
+            if st is None:
+                st = self._endpoints[endpoint] = _EndpointStats()
+            st.count += 1
+            key = str(status)
+            st.statuses[key] = st.statuses.get(key, 0) + 1
+            st.bytes += nbytes
+            st.total.add(total_s * 1000)
+            if connection:
+                st.new_connections += 1
+                st.dns.add(connection.get("dns", 0) * 1000)
+                st.connect.add(connection.get("connect", 0) * 1000)
+                if "tls" in connection:
+                    st.tls.add(connection["tls"] * 1000)
+            elif status:
+                st.reused += 1
+            if cached:
+                st.cache_hits += 1
+            if failed:
+                st.errors += 1
+                st.last_error = {"status": status, "reason": reason, "at": time.time()}
+            self._recent.append({
+                "at": time.time(),
+                "endpoint": endpoint,
+                "status": status,
+                "reason": reason if failed else "",
+                "bytes": nbytes,
+                "ms": round(total_s * 1000, 2),
+                "new_connection": bool(connection),
+                "cached": cached,
+            })
+
+    def snapshot(self) -> dict:
+        """All stats as plain data (JSON-serializable)."""
+        with self._lock:
+            return {
+                "since": self._started,
+                "endpoints": {k: v.to_dict() for k, v in sorted(self._endpoints.items())},
+                "recent": list(self._recent),
+            }
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=2, ensure_ascii=False)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._recent.clear()
+            self._started = time.time()
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    return _metrics
+
+
+# --- Per-thread state: new-connection timings of the current request, last API error ---
+
+_local = threading.local()
+
+
+def begin_request() -> None:
+    _local.connection = None
+
+
+def note_connection(**timings: float) -> None:
+    """Called by the HTTP connection classes when a socket is opened (dns / connect / tls seconds)."""
+    conn = getattr(_local, "connection", None) or {}
+    conn.update(timings)
+    _local.connection = conn
+
+
+def take_connection() -> dict | None:
+    conn = getattr(_local, "connection", None)
+    _local.connection = None
+    return conn
+
+
+def set_last_error(status: int, reason: str, endpoint: str = "") -> None:
+    _local.last_error = {"status": status, "reason": reason, "endpoint": endpoint}
+
+
+def last_error() -> dict | None:
+    """Last API failure recorded in this thread: {"status", "reason", "endpoint"} or None."""
+    return getattr(_local, "last_error", None)
+
+
+def clear_last_error() -> None:
+    _local.last_error = None
+
+
+def response_reason(resp) -> str:
+    """GitHub's error message from a JSON body, else the HTTP reason phrase."""
+    try:
+        body = resp.json()
+        msg = body.get("message") if isinstance(body, dict) else None
+    except ValueError:
+        msg = None
+    return msg or resp.reason or ""
+
+
+def error_text(err: dict | None) -> str:
+    """'401 Bad credentials' / 'ConnectionError' / '' for display."""
+    if not err:
+        return ""
+    if err.get("status"):
+        return f"{err['status']} {err.get('reason', '')}".strip()
+    return err.get("reason", "")
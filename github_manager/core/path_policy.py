@@ -1,11 +1,25 @@
 """
 Path rules for commit uploads: fixed base uploads/, clean filenames, dedupe.
+Optional sharded layouts (uploads/ab/cd/<name>, uploads/YYYY/MM/DD/<name>) keep
+each git tree object small when a repo holds many uploaded files.
 """
+import hashlib
+import json
 import os
 import re
+from datetime import datetime
 
 UPLOADS_BASE = "uploads"
 
+# Layouts: flat = uploads/<name> (mặc định, tương thích cũ)
+LAYOUT_FLAT = "flat"
+LAYOUT_HASH = "hash"
+LAYOUT_DATE = "date"
+LAYOUTS = (LAYOUT_FLAT, LAYOUT_HASH, LAYOUT_DATE)
+
+# Manifest lives inside .git/ so it is never committed (it would grow with every upload)
+MANIFEST_NAME = "uploads_manifest.jsonl"
+
 
 def clean_filename(name: str) -> str:
     """Remove invalid filename chars for Windows/Git."""
@@ -14,26 +28,59 @@ def clean_filename(name: str) -> str:
     return name.strip() or "file"
 
 
-def resolve_upload_path(uploads_dir: str, desired_name: str, existing_names: set[str]) -> tuple[str, str]:
+def split_name(name: str) -> tuple[str, str]:
+    """(stem, ext) as used for dedupe names; empty stem becomes "file"."""
+    stem, ext = os.path.splitext(name)
+    if not stem:
+        stem, ext = "file", ext or ""
+    return stem, ext
+
+
+def shard_dir(name: str, layout: str = LAYOUT_FLAT, when: datetime | None = None) -> str:
+    """
+    Sub-directory (relative to uploads/, "/"-separated) where name goes for layout.
+    hash: first 4 hex chars of sha1(name) -> "ab/cd" (stable, computable from the name).
+    date: upload date -> "YYYY/MM/DD" (look up via manifest).
+    flat: "".
+    """
+    if layout == LAYOUT_HASH:
+        h = hashlib.sha1(name.encode("utf-8")).hexdigest()
+        return f"{h[:2]}/{h[2:4]}"
+    if layout == LAYOUT_DATE:
+        return (when or datetime.utcnow()).strftime("%Y/%m/%d")
+    return ""
+
+
+def resolve_upload_path(
+    uploads_dir: str,
+    desired_name: str,
+    existing_names: set[str],
+    layout: str = LAYOUT_FLAT,
+    when: datetime | None = None,
+    first_suffix: int = 2,
+) -> tuple[str, str]:
     """
     Given uploads_dir (absolute path to repo's uploads/), desired filename,
-    and set of already-used names in that folder, return:
+    and set of already-used paths relative to uploads/ ("name" for flat,
+    "ab/cd/name" for sharded layouts), return:
     (absolute_path, relative_path_for_commit e.g. uploads/filename.ext)
 
-    Dedupe: file.ext -> file (2).ext -> file (3).ext ...
+    Dedupe: file.ext -> file (2).ext -> file (3).ext ... (within the same shard)
+    existing_names may be any object with `in` and add() (e.g. UploadNameIndex);
+    first_suffix lets an index skip numbers it already knows are taken.
     """
     base = desired_name
-    stem, ext = os.path.splitext(base)
-    if not stem:
-        stem, ext = "file", ext or ""
+    stem, ext = split_name(base)
+    sub = shard_dir(base, layout, when)
+    prefix = f"{sub}/" if sub else ""
     candidate = base
-    n = 2
-    while candidate in existing_names:
+    n = max(first_suffix, 2)
+    while prefix + candidate in existing_names:
         candidate = f"{stem} ({n}){ext}"
         n += 1
-    existing_names.add(candidate)
-    abs_path = os.path.join(uploads_dir, candidate)
-    rel_path = f"{UPLOADS_BASE}/{candidate}"
+    existing_names.add(prefix + candidate)
+    abs_path = os.path.join(uploads_dir, *sub.split("/"), candidate) if sub else os.path.join(uploads_dir, candidate)
+    rel_path = f"{UPLOADS_BASE}/{prefix}{candidate}"
     return abs_path, rel_path
 
 
@@ -42,3 +89,47 @@ def ensure_upload_dir(workspace_path: str) -> str:
     uploads = os.path.join(workspace_path, UPLOADS_BASE)
     os.makedirs(uploads, exist_ok=True)
     return uploads
+
+
+def _manifest_path(workspace_path: str) -> str:
+    return os.path.join(workspace_path, ".git", MANIFEST_NAME)
+
+
+def append_manifest(workspace_path: str, rel_path: str, source_name: str, layout: str = LAYOUT_FLAT) -> None:
+    """Record one uploaded file: original name -> committed path (one JSON line)."""
+    entry = {
+        "name": source_name,
+        "path": rel_path,
+        "layout": layout,
+        "time": datetime.utcnow().isoformat() + "Z",
+    }
+    with open(_manifest_path(workspace_path), "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def find_uploads(workspace_path: str, name: str) -> list[str]:
+    """
+    Committed paths (uploads/...) for an uploaded file name.
+    Uses the manifest; falls back to the flat and hash locations that are
+    computable from the name (files uploaded before the manifest existed).
+    """
+    found = []
+    path = _manifest_path(workspace_path)
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("name") == name and entry.get("path") not in found:
+                    found.append(entry.get("path"))
+    if found:
+        return found
+    cleaned = clean_filename(name)
+    for layout in (LAYOUT_FLAT, LAYOUT_HASH):
+        sub = shard_dir(cleaned, layout)
+        rel = f"{UPLOADS_BASE}/{sub}/{cleaned}" if sub else f"{UPLOADS_BASE}/{cleaned}"
+        if os.path.isfile(os.path.join(workspace_path, *rel.split("/"))):
+            found.append(rel)
+    return found
@@ -0,0 +1,139 @@
+"""
+GitHub rate-limit tracking and request scheduling, per token.
+Quota comes from X-RateLimit-* / Retry-After on every response. Requests wait
+before they would fail; background work (update checks, PAT checks, repo
+refreshes) keeps a reserve for interactive calls and yields to them.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .secrets import token_fingerprint
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+# Background work pauses when remaining quota drops to this (left for interactive calls);
+# capped at a tenth of the limit the server reports (anonymous calls get only 60/hour)
+BACKGROUND_RESERVE = 100
+# Background requests in flight at once, per token
+BACKGROUND_CONCURRENCY = 4
+# Interactive calls wait at most this long for a reset, then go anyway (and fail visibly)
+MAX_INTERACTIVE_WAIT = 30.0
+
+
+class RateLimiter:
+    """Thread-safe; shared by all HttpClient requests."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        # (host, token fingerprint, resource) -> {"limit", "remaining", "reset", "updated"}
+        self._quota: dict[tuple[str, str, str], dict] = {}
+        # (host, token fingerprint) -> time before which nothing is sent (Retry-After, secondary limit)
+        self._blocked_until: dict[tuple[str, str], float] = {}
+        self._interactive_active = 0
+        # (host, token fingerprint) -> background requests in flight
+        self._background_active: dict[tuple[str, str], int] = {}
+
+    @staticmethod
+    def _keys(url: str, token: str | None, resource: str):
+        host = urlsplit(url).netloc
+        fp = token_fingerprint(token) if token else "anonymous"
+        return (host, fp, resource), (host, fp)
+
+    def _wait_time(self, qkey, bkey, priority: str) -> float:
+        now = time.time()
+        wait = self._blocked_until.get(bkey, 0) - now
+        q = self._quota.get(qkey)
+        if q and q["reset"] > now:
+            floor = min(BACKGROUND_RESERVE, q["limit"] // 10) if priority == PRIORITY_BACKGROUND else 0
+            if q["remaining"] <= floor:
+                wait = max(wait, q["reset"] - now + 1)
+        return wait
+
+    def acquire(self, url: str, token: str | None, priority: str = PRIORITY_INTERACTIVE, resource: str = "core") -> None:
+        """Block until a request may be sent; reserves one unit of quota."""
+        qkey, bkey = self._keys(url, token, resource)
+        interactive = priority != PRIORITY_BACKGROUND
+        started = time.time()
+        with self._cond:
+            # Interactive calls count from now until release(): background work waits meanwhile
+            if interactive:
+                self._interactive_active += 1
+            while True:
+                wait = self._wait_time(qkey, bkey, priority)
+                if interactive:
+                    if wait <= 0 or time.time() - started >= MAX_INTERACTIVE_WAIT:
+                        break
+                elif (
+                    wait <= 0
+                    and self._interactive_active == 0
+                    and self._background_active.get(bkey, 0) < BACKGROUND_CONCURRENCY
+                ):
+                    break
+                self._cond.wait(timeout=min(max(wait, 0.2), 5.0))
+            if not interactive:
+                self._background_active[bkey] = self._background_active.get(bkey, 0) + 1
+            q = self._quota.get(qkey)
+            if q and q["remaining"] > 0:
+                q["remaining"] -= 1
+
+    def release(self, url: str, token: str | None, priority: str = PRIORITY_INTERACTIVE, resp=None, resource: str = "core") -> None:
+        """Record quota headers of resp (None if the request raised) and wake waiters."""
+        qkey, bkey = self._keys(url, token, resource)
+        with self._cond:
+            if priority == PRIORITY_BACKGROUND:
+                n = self._background_active.get(bkey, 1) - 1
+                if n > 0:
+                    self._background_active[bkey] = n
+                else:
+                    self._background_active.pop(bkey, None)
+            else:
+                self._interactive_active -= 1
+            if resp is not None:
+                self._update(qkey, bkey, resp)
+            self._cond.notify_all()
+
+    def _update(self, qkey, bkey, resp) -> None:
+        h = resp.headers
+        now = time.time()
+        if "X-RateLimit-Remaining" in h:
+            try:
+                remaining = int(h["X-RateLimit-Remaining"])
+                limit = int(h.get("X-RateLimit-Limit", 0))
+                reset = float(h.get("X-RateLimit-Reset", 0))
+            except ValueError:
+                remaining = None
+            if remaining is not None:
+                # Server count replaces the optimistic decrements made in acquire()
+                resource = h.get("X-RateLimit-Resource", qkey[2])
+                key = (qkey[0], qkey[1], resource)
+                self._quota[key] = {"limit": limit, "remaining": remaining, "reset": reset, "updated": now}
+        if resp.status_code in (403, 429):
+            retry_after = h.get("Retry-After")
+            until = 0.0
+            if retry_after:
+                try:
+                    until = now + float(retry_after)
+                except ValueError:
+                    until = now + 60
+            elif h.get("X-RateLimit-Remaining") == "0":
+                until = float(h.get("X-RateLimit-Reset", now + 60))
+            if until > self._blocked_until.get(bkey, 0):
+                self._blocked_until[bkey] = until
+
+    def quota(self, fingerprint: str, resource: str = "core") -> dict | None:
+        """Last known quota for a token fingerprint (any API host), or None."""
+        with self._cond:
+            best = None
+            for (host, fp, res), q in self._quota.items():
+                if fp == fingerprint and res == resource and (best is None or q["updated"] > best["updated"]):
+                    best = dict(q)
+            return best
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    return _limiter
@@ -0,0 +1,110 @@
+"""
+Repository metadata cache per account, shared by the Repositories and Commit pages.
+Kept in memory and in data/repo_cache/<account_id>.json; pages show the cached
+list at once and refresh it in the background when stale (stale-while-revalidate).
+Files are written through core.store_service; a newer list written by another
+instance is not replaced by an older one.
+"""
+import os
+import threading
+import time
+
+from .store_json import read_json, get_data_dir
+from .store_service import get_writer
+from .github_api import get_repos
+from .github_graphql import load_repos_with_branches
+from .rate_limit import PRIORITY_INTERACTIVE
+from .settings import get_setting
+from . import branch_cache
+from .repo_index import get_index
+
+CACHE_DIR = "repo_cache"
+
+_lock = threading.Lock()
+_entries: dict[str, dict] = {}  # account_id -> {"repos": [...], "fetchedAt": epoch}
+# account_id -> Event set when the running refresh ends (one fetch per account at a time)
+_inflight: dict[str, threading.Event] = {}
+
+
+def _filename(account_id: str) -> str:
+    return f"{CACHE_DIR}/{account_id}.json"
+
+
+def get(account_id: str) -> tuple[list[dict], float] | None:
+    """(repos, fetched_at) from memory, else disk; None if never loaded."""
+    if not account_id:
+        return None
+    with _lock:
+        entry = _entries.get(account_id)
+        if entry is None:
+            data = read_json(_filename(account_id))
+            if isinstance(data, dict) and isinstance(data.get("repos"), list):
+                entry = data
+                _entries[account_id] = entry
+    if entry is None:
+        return None
+    return entry["repos"], float(entry.get("fetchedAt", 0))
+
+
+def is_fresh(fetched_at: float) -> bool:
+    return time.time() - fetched_at < float(get_setting("repoCacheTtlSeconds"))
+
+
+def put(account_id: str, repos: list[dict]) -> None:
+    """Store an account's repo list (also updates the cross-account search index)."""
+    entry = {"repos": repos, "fetchedAt": time.time()}
+
+    def apply(data):
+        if float(data.get("fetchedAt", 0)) <= entry["fetchedAt"]:
+            data.clear()
+            data.update(entry)
+
+    with _lock:
+        _entries[account_id] = entry
+        get_writer().submit(_filename(account_id), apply)
+    get_index().update_account(account_id, repos, entry["fetchedAt"])
+
+
+def forget(account_id: str) -> None:
+    """Drop an account's cache (e.g. account deleted)."""
+    with _lock:
+        _entries.pop(account_id, None)
+        # A queued put() would otherwise recreate the file after it is removed
+        get_writer().flush()
+        try:
+            os.unlink(os.path.join(get_data_dir(), _filename(account_id)))
+        except OSError:
+            pass
+    get_index().remove_account(account_id)
+
+
+def refresh(account_id: str, token: str, on_page=None, priority: str = PRIORITY_INTERACTIVE) -> list[dict] | None:
+    """
+    Fetch the account's repos (GraphQL with branches; REST as fallback), update
+    the cache (and branch cache) and return them. None on failure (cache kept).
+    If a refresh for the account is already running (other page), waits for it
+    and returns its result instead of fetching again; on_page is not called then.
+    """
+    started = time.time()
+    with _lock:
+        event = _inflight.get(account_id)
+        owner = event is None
+        if owner:
+            event = _inflight[account_id] = threading.Event()
+    if not owner:
+        event.wait()
+        entry = get(account_id)
+        return entry[0] if entry and entry[1] >= started else None
+    try:
+        repos = load_repos_with_branches(token, on_page=on_page, priority=priority)
+        if repos is None:
+            repos = get_repos(token, on_page=on_page, priority=priority)
+        if repos is None:
+            return None
+        put(account_id, repos)
+        branch_cache.put_many(account_id, {r.get("full_name", ""): r["branches"] for r in repos if "branches" in r})
+        return repos
+    finally:
+        with _lock:
+            _inflight.pop(account_id, None)
+        event.set()
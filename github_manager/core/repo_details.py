@@ -0,0 +1,75 @@
+"""
+Per-repo details for the Repositories page (size, last push, open PRs, local workspace),
+fetched only for the rows being looked at and cached in memory for repoDetailsTtlSeconds.
+Remote details come from one aliased GraphQL query per batch of repos; the workspace
+status is read from the local clone (.git/HEAD), without running git.
+"""
+import os
+import threading
+import time
+
+from .github_graphql import load_repo_details
+from .rate_limit import PRIORITY_BACKGROUND
+from .settings import get_setting
+from .store_json import get_workspaces_dir
+
+_lock = threading.Lock()
+# (account_id, full_name) -> (details or None if the fetch failed, fetched_at)
+_entries: dict[tuple[str, str], tuple[dict | None, float]] = {}
+# Failed lookups are retried after this many seconds
+FAILURE_TTL_SECONDS = 120
+
+
+def get(account_id: str, full_name: str) -> dict | None:
+    """Cached details {"size_kb", "pushed_at", "open_prs", "workspace"} (stale ones too), or None."""
+    with _lock:
+        entry = _entries.get((account_id, full_name))
+    return entry[0] if entry else None
+
+
+def missing(account_id: str, full_names: list[str]) -> list[str]:
+    """Names with no cached details, or details older than the TTL."""
+    ttl = float(get_setting("repoDetailsTtlSeconds"))
+    now = time.time()
+    out = []
+    with _lock:
+        for full in full_names:
+            entry = _entries.get((account_id, full))
+            if entry is None or now - entry[1] >= (ttl if entry[0] is not None else FAILURE_TTL_SECONDS):
+                out.append(full)
+    return out
+
+
+def workspace_status(account_id: str, full_name: str) -> str:
+    """"Cloned (<branch>)" if the repo has a local workspace clone, else ""."""
+    path = os.path.join(get_workspaces_dir(), account_id, full_name.replace("/", "_"), ".git", "HEAD")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return ""
+    branch = head[len("ref: refs/heads/"):] if head.startswith("ref: refs/heads/") else head[:8]
+    return f"Cloned ({branch})"
+
+
+def fetch(account_id: str, token: str, full_names: list[str], priority: str = PRIORITY_BACKGROUND) -> dict[str, dict]:
+    """Fetch and cache details for full_names; returns {full_name: details} (failed names map to nothing)."""
+    remote = load_repo_details(token, full_names, priority=priority) if token else None
+    now = time.time()
+    out = {}
+    with _lock:
+        for full in full_names:
+            details = (remote or {}).get(full)
+            if details is None:
+                _entries[(account_id, full)] = (None, now)
+                continue
+            details = dict(details, workspace=workspace_status(account_id, full))
+            _entries[(account_id, full)] = (details, now)
+            out[full] = details
+    return out
+
+
+def forget(account_id: str) -> None:
+    with _lock:
+        for key in [k for k in _entries if k[0] == account_id]:
+            del _entries[key]
@@ -0,0 +1,274 @@
+"""
+Index of repositories across all accounts (data/repo_index/<account_id>.json), for instant search.
+Fed by core.repo_cache whenever an account's repo list is fetched; a background
+worker refreshes stale accounts one by one. Search structures are kept per account,
+so an update rebuilds and rewrites only that account. Search = prefix match (bisect
+over sorted names) + substring / fuzzy match (trigram posting lists), in a few ms
+for tens of thousands of repos.
+"""
+import bisect
+import heapq
+import os
+import threading
+import time
+
+from .store_json import read_json, get_data_dir
+from .store_service import get_writer
+
+INDEX_DIR = "repo_index"
+# Single-file index of earlier versions, split into INDEX_DIR on first load
+LEGACY_INDEX_FILE = "repo_index.json"
+DEFAULT_LIMIT = 50
+# Fuzzy search counts at most this many posting-list entries per query
+FUZZY_BUDGET = 30000
+
+
+def _trigrams(s: str) -> set[str]:
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _filename(account_id: str) -> str:
+    return f"{INDEX_DIR}/{account_id}.json"
+
+
+class _Snapshot:
+    """Immutable search structures for one account; rebuilt off the UI thread and swapped in."""
+
+    def __init__(self, account_id: str, repos: list[list]):
+        self.account_id = account_id
+        rows = [(r[0].lower(), r) for r in repos]
+        # Entry id order = rank for ties: shorter names first, then alphabetical
+        rows.sort(key=lambda t: (len(t[0]), t[0]))
+        self.lower = [t[0] for t in rows]
+        self.repo = [t[1] for t in rows]
+        # Sorted (key, id) for prefix search on "owner/name" and on "name"
+        keys = []
+        for i, name in enumerate(self.lower):
+            keys.append((name, i))
+            _, _, short = name.partition("/")
+            if short:
+                keys.append((short, i))
+        keys.sort()
+        self.keys = [k for k, _ in keys]
+        self.key_ids = [i for _, i in keys]
+        # trigram -> ascending entry ids
+        post: dict[str, list[int]] = {}
+        for i, name in enumerate(self.lower):
+            for g in _trigrams(name):
+                post.setdefault(g, []).append(i)
+        self.postings = post
+
+    def rank(self, i: int) -> tuple:
+        """Rank of entry i across all accounts (lower is better)."""
+        name = self.lower[i]
+        return (len(name), name, self.account_id)
+
+
+class RepoIndex:
+    """Thread-safe; use get_index() for the shared instance."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # account_id -> {"fetchedAt": epoch, "repos": [[full_name, can_push, private, clone_url, default_branch]]}
+        self._accounts: dict[str, dict] = {}
+        # account_id -> _Snapshot; replaced as a whole (copy on write) so searches need no lock
+        self._snaps: dict[str, _Snapshot] = {}
+        self._loaded = False
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._migrate_legacy()
+            folder = os.path.join(get_data_dir(), INDEX_DIR)
+            names = os.listdir(folder) if os.path.isdir(folder) else []
+            for name in names:
+                if name.startswith(".") or not name.endswith(".json"):
+                    continue
+                entry = read_json(f"{INDEX_DIR}/{name}")
+                if isinstance(entry, dict) and isinstance(entry.get("repos"), list):
+                    self._accounts[name[:-len(".json")]] = entry
+            self._snaps = {a: _Snapshot(a, e["repos"]) for a, e in self._accounts.items()}
+            self._loaded = True
+
+    def _migrate_legacy(self) -> None:
+        path = os.path.join(get_data_dir(), LEGACY_INDEX_FILE)
+        if not os.path.isfile(path):
+            return
+        data = read_json(LEGACY_INDEX_FILE)
+        accounts = data.get("accounts", {}) if isinstance(data, dict) else {}
+        for account_id, entry in (accounts if isinstance(accounts, dict) else {}).items():
+            if isinstance(entry, dict):
+                self._persist(account_id, entry)
+        get_writer().flush()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _persist(account_id: str, entry: dict) -> None:
+        """Queue the account's file write; a newer entry written by another instance is kept."""
+        def apply(data):
+            if float(data.get("fetchedAt", 0)) <= float(entry.get("fetchedAt", 0)):
+                data.clear()
+                data.update(entry)
+
+        get_writer().submit(_filename(account_id), apply)
+
+    def update_account(self, account_id: str, repos: list[dict], fetched_at: float | None = None) -> None:
+        """Replace one account's entries with a fetched repo list (get_repos shape)."""
+        self._ensure_loaded()
+        compact = [
+            [
+                r.get("full_name", ""),
+                bool(r.get("permissions", {}).get("push", True)),
+                bool(r.get("private")),
+                r.get("clone_url", ""),
+                r.get("default_branch", "main"),
+            ]
+            for r in repos
+            if r.get("full_name")
+        ]
+        entry = {"fetchedAt": fetched_at or time.time(), "repos": compact}
+        # Built outside the lock: only this account's structures, O(its repos)
+        snap = _Snapshot(account_id, compact)
+        with self._lock:
+            self._accounts[account_id] = entry
+            self._snaps = {**self._snaps, account_id: snap}
+            self._persist(account_id, entry)
+
+    def remove_account(self, account_id: str) -> None:
+        self._ensure_loaded()
+        with self._lock:
+            if self._accounts.pop(account_id, None) is None:
+                return
+            self._snaps = {a: s for a, s in self._snaps.items() if a != account_id}
+            # A queued write would otherwise recreate the file after it is removed
+            get_writer().flush()
+            try:
+                os.unlink(os.path.join(get_data_dir(), _filename(account_id)))
+            except OSError:
+                pass
+
+    def fetched_at(self, account_id: str) -> float | None:
+        self._ensure_loaded()
+        entry = self._accounts.get(account_id)
+        return float(entry.get("fetchedAt", 0)) if entry else None
+
+    def size(self) -> int:
+        self._ensure_loaded()
+        return sum(len(s.lower) for s in self._snaps.values())
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list[dict]:
+        """
+        Best matches for query: prefix of owner/name or name first, then substring,
+        then fuzzy (most shared trigrams). Returns
+        [{"account_id", "full_name", "push", "private", "clone_url", "default_branch"}].
+        """
+        self._ensure_loaded()
+        snaps = list(self._snaps.values())
+        q = query.strip().lower()
+        if not q:
+            return []
+        # Entries are (snapshot, id)
+        found: list[tuple[_Snapshot, int]] = []
+        seen: set[tuple[str, int]] = set()
+
+        def take(hit) -> bool:
+            key = (hit[0].account_id, hit[1])
+            if key not in seen:
+                seen.add(key)
+                found.append(hit)
+            return len(found) >= limit
+
+        def best(hits):
+            return heapq.nsmallest(limit - len(found), hits, key=lambda h: h[0].rank(h[1]))
+
+        # 1. Prefix: contiguous range of sorted keys per account; best rank first
+        hits = []
+        for snap in snaps:
+            lo = bisect.bisect_left(snap.keys, q)
+            hi = bisect.bisect_left(snap.keys, q + "\uffff", lo)
+            hits.extend((snap, i) for i in heapq.nsmallest(limit, set(snap.key_ids[lo:hi])))
+        for hit in best(hits):
+            if take(hit):
+                return self._results(found)
+
+        def postings(g):
+            return [(snap, snap.postings[g]) for snap in snaps if g in snap.postings]
+
+        total = {g: sum(len(p) for _, p in postings(g)) for g in _trigrams(q)}
+        grams = sorted(total, key=total.get)
+        if not grams:
+            return self._results(found)
+
+        # 2. Substring: walk each account's list for the rarest trigram in rank order
+        if total[grams[0]]:
+            hits = []
+            for snap, post in postings(grams[0]):
+                if not all(g in snap.postings for g in grams):
+                    continue
+                n = 0
+                for i in post:
+                    if (snap.account_id, i) not in seen and q in snap.lower[i]:
+                        hits.append((snap, i))
+                        n += 1
+                        if n >= limit - len(found):
+                            break
+            for hit in best(hits):
+                if take(hit):
+                    return self._results(found)
+
+        # 3. Fuzzy (typos): most query trigrams shared. Posting lists are counted
+        # rarest first within a budget, then the best candidates are rescored on all trigrams.
+        counts: dict[tuple[str, int], int] = {}
+        by_account = {snap.account_id: snap for snap in snaps}
+        visited = 0
+        for g in grams:
+            if counts and visited + total[g] > FUZZY_BUDGET:
+                break
+            visited += total[g]
+            for snap, post in postings(g):
+                for i in post:
+                    key = (snap.account_id, i)
+                    counts[key] = counts.get(key, 0) + 1
+        need = max(1, (len(grams) + 1) // 2)
+        pool = heapq.nlargest(limit * 4, counts.items(), key=lambda t: t[1])
+        scored = []
+        for key, _ in pool:
+            if key in seen:
+                continue
+            snap, i = by_account[key[0]], key[1]
+            shared = sum(1 for g in grams if g in snap.lower[i])
+            if shared >= need:
+                scored.append((-shared, snap.rank(i), snap, i))
+        scored.sort(key=lambda t: t[:2])
+        for _, _, snap, i in scored:
+            if take((snap, i)):
+                break
+        return self._results(found)
+
+    @staticmethod
+    def _results(hits: list[tuple[_Snapshot, int]]) -> list[dict]:
+        out = []
+        for snap, i in hits:
+            full, push, private, clone_url, default_branch = (snap.repo[i] + [""] * 5)[:5]
+            out.append({
+                "account_id": snap.account_id,
+                "full_name": full,
+                "push": bool(push),
+                "private": bool(private),
+                "clone_url": clone_url,
+                "default_branch": default_branch or "main",
+            })
+        return out
+
+
+_index = RepoIndex()
+
+
+def get_index() -> RepoIndex:
+    return _index
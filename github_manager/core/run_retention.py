@@ -0,0 +1,80 @@
+"""
+Retention for run history: runs older than the configured age (failed runs kept longer)
+or beyond the maximum count are moved, with their logs, into gzip JSON-lines archives
+under logs/archive/, then removed from runs.db in batches. Their counts stay in
+run_store.run_totals, and log segments nobody references any more are deleted.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+from . import log_store, run_store
+from .settings import get_setting
+from .store_json import get_logs_dir
+
+BATCH_SIZE = 5000
+
+
+def _archive_dir() -> str:
+    path = os.path.join(get_logs_dir(), "archive")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _cutoff(days, now: datetime) -> str:
+    days = int(days or 0)
+    if days <= 0:
+        return ""
+    return (now - timedelta(days=days)).isoformat() + "Z"
+
+
+def _write_archive(runs: list[dict], now: datetime, part: int) -> str:
+    """One gzip JSON-lines file per batch: the run fields plus "log" (text or null)."""
+    name = f"runs-{now.strftime('%Y%m%d-%H%M%S')}-{part:03d}.jsonl.gz"
+    path = os.path.join(_archive_dir(), name)
+    with gzip.open(path + ".tmp", "wt", encoding="utf-8") as f:
+        for r in runs:
+            entry = dict(r, log=log_store.read_run_log(r))
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def compact(
+    max_age_days: int | None = None,
+    failed_max_age_days: int | None = None,
+    max_count: int | None = None,
+    now: datetime | None = None,
+) -> dict:
+    """
+    Apply retention (arguments default to the runRetention* settings; 0 = no limit).
+    Returns {"archived": runs removed, "archives": [paths], "segmentsRemoved": n}.
+    """
+    now = now or datetime.utcnow()
+    older_than = _cutoff(get_setting("runRetentionDays") if max_age_days is None else max_age_days, now)
+    failed_older_than = _cutoff(
+        get_setting("runRetentionFailedDays") if failed_max_age_days is None else failed_max_age_days, now
+    )
+    keep = int((get_setting("runRetentionMaxCount") if max_count is None else max_count) or 0)
+
+    archived = 0
+    archives = []
+    while True:
+        runs = run_store.select_expired(older_than, failed_older_than, keep, BATCH_SIZE)
+        if not runs:
+            break
+        # Archive first: a crash before the delete leaves a duplicate, never a lost run
+        archives.append(_write_archive(runs, now, len(archives) + 1))
+        archived += run_store.archive_runs(runs)
+        for r in runs:
+            path = r.get("logPath") or ""
+            if path and not r.get("logRef") and os.path.isfile(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if len(runs) < BATCH_SIZE:
+            break
+    segments = log_store.remove_unreferenced(run_store.referenced_log_segments()) if archived else 0
+    return {"archived": archived, "archives": archives, "segmentsRemoved": segments}
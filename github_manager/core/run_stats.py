@@ -0,0 +1,157 @@
+"""
+Run analytics kept up to date as runs are added and deleted (runs.db table run_stats).
+Per day, account and repo: runs, successes, bytes pushed and an upload-time histogram
+(log-spaced buckets, ~12 % wide) for median / p95. run_store applies each change in the
+same transaction as the run itself; retention pruning leaves the stats in place.
+"""
+import bisect
+import json
+import sqlite3
+from datetime import datetime
+
+# Upload time bucket upper bounds in ms: 100 ms .. ~1 h, each 1.25x the previous
+BUCKETS_MS = tuple(int(100 * 1.25 ** i) for i in range(47))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS run_stats (
+    day TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    success INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    timed INTEGER NOT NULL DEFAULT 0,
+    duration_ms INTEGER NOT NULL DEFAULT 0,
+    hist TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (day, account_id, repo)
+);
+"""
+
+GROUPS = {"day": "day", "account": "account_id", "repo": "repo"}
+
+
+def duration_ms(run: dict) -> int | None:
+    """endTime - startTime in ms, or None if either is missing / unparsable."""
+    try:
+        start = datetime.fromisoformat(run["startTime"].replace("Z", "+00:00"))
+        end = datetime.fromisoformat(run["endTime"].replace("Z", "+00:00"))
+    except (KeyError, AttributeError, ValueError):
+        return None
+    ms = int((end - start).total_seconds() * 1000)
+    return ms if ms >= 0 else None
+
+
+def _empty() -> dict:
+    return {"runs": 0, "success": 0, "bytes": 0, "timed": 0, "duration_ms": 0, "hist": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _merge(into: dict, other: dict, sign: int = 1) -> None:
+    for k in ("runs", "success", "bytes", "timed", "duration_ms"):
+        into[k] += sign * other[k]
+    hist = other["hist"]
+    for i in range(min(len(hist), len(into["hist"]))):
+        into["hist"][i] += sign * hist[i]
+
+
+def _delta(run: dict) -> dict:
+    d = _empty()
+    d["runs"] = 1
+    d["success"] = 1 if run.get("status") == "Success" else 0
+    if d["success"]:
+        # Only pushed bytes count; failed runs still carry the size of the copied file
+        try:
+            d["bytes"] = int(run.get("bytes") or 0)
+        except (TypeError, ValueError):
+            pass
+    ms = duration_ms(run)
+    if ms is not None:
+        d["timed"] = 1
+        d["duration_ms"] = ms
+        d["hist"][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+    return d
+
+
+def _row(conn: sqlite3.Connection, key: tuple) -> dict:
+    r = conn.execute(
+        "SELECT runs, success, bytes, timed, duration_ms, hist FROM run_stats WHERE day = ? AND account_id = ? AND repo = ?",
+        key,
+    ).fetchone()
+    if r is None:
+        return _empty()
+    hist = [0] * (len(BUCKETS_MS) + 1)
+    stored = json.loads(r[5] or "[]")[:len(hist)]
+    hist[:len(stored)] = stored
+    return {"runs": r[0], "success": r[1], "bytes": r[2], "timed": r[3], "duration_ms": r[4], "hist": hist}
+
+
+def apply(conn: sqlite3.Connection, runs: list[dict], sign: int = 1) -> None:
+    """Add (sign=1) or subtract (sign=-1) runs; caller holds a write transaction (BEGIN IMMEDIATE)."""
+    deltas: dict[tuple, dict] = {}
+    for run in runs:
+        key = ((run.get("startTime") or "")[:10], run.get("accountId") or "", run.get("repoFullName") or "")
+        _merge(deltas.setdefault(key, _empty()), _delta(run))
+    for key, delta in deltas.items():
+        row = _row(conn, key)
+        _merge(row, delta, sign)
+        if row["runs"] <= 0:
+            conn.execute("DELETE FROM run_stats WHERE day = ? AND account_id = ? AND repo = ?", key)
+            continue
+        conn.execute(
+            "INSERT OR REPLACE INTO run_stats (day, account_id, repo, runs, success, bytes, timed, duration_ms, hist) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (row["runs"], row["success"], row["bytes"], row["timed"], row["duration_ms"], json.dumps(row["hist"])),
+        )
+
+
+def add_counts(conn: sqlite3.Connection, day: str, account_id: str, repo: str, runs: int, success: int) -> None:
+    """Counts without timing / size (runs pruned before stats existed)."""
+    row = _row(conn, (day, account_id, repo))
+    row["runs"] += runs
+    row["success"] += success
+    conn.execute(
+        "INSERT OR REPLACE INTO run_stats (day, account_id, repo, runs, success, bytes, timed, duration_ms, hist) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (day, account_id, repo, row["runs"], row["success"], row["bytes"], row["timed"], row["duration_ms"], json.dumps(row["hist"])),
+    )
+
+
+def _percentile(hist: list[int], count: int, p: float) -> float:
+    """Interpolated within the bucket holding the p-th percentile."""
+    if not count:
+        return 0.0
+    rank = p / 100.0 * count
+    seen = 0
+    for i, c in enumerate(hist):
+        if c and seen + c >= rank:
+            lo = BUCKETS_MS[i - 1] if i > 0 else 0
+            hi = BUCKETS_MS[i] if i < len(BUCKETS_MS) else BUCKETS_MS[-1] * 1.25
+            return lo + (hi - lo) * max(0.0, rank - seen) / c
+        seen += c
+    return float(BUCKETS_MS[-1])
+
+
+def _summary(key: str, d: dict) -> dict:
+    return {
+        "key": key,
+        "runs": d["runs"],
+        "success": d["success"],
+        "failed": d["runs"] - d["success"],
+        "success_rate": round(d["success"] / d["runs"], 4) if d["runs"] else 0.0,
+        "bytes": d["bytes"],
+        "median_ms": round(_percentile(d["hist"], d["timed"], 50)),
+        "p95_ms": round(_percentile(d["hist"], d["timed"], 95)),
+        "mean_ms": round(d["duration_ms"] / d["timed"]) if d["timed"] else 0,
+    }
+
+
+def summarize(conn: sqlite3.Connection, by: str) -> dict:
+    """{"total": summary, "groups": [summary per day / account / repo]}; reads only run_stats."""
+    col = GROUPS[by]
+    groups: dict[str, dict] = {}
+    total = _empty()
+    for r in conn.execute(f"SELECT {col}, runs, success, bytes, timed, duration_ms, hist FROM run_stats"):
+        d = {"runs": r[1], "success": r[2], "bytes": r[3], "timed": r[4], "duration_ms": r[5], "hist": json.loads(r[6] or "[]")}
+        _merge(groups.setdefault(r[0], _empty()), d)
+        _merge(total, d)
+    order = sorted(groups, reverse=(by == "day"))
+    return {"by": by, "total": _summary("", total), "groups": [_summary(k, groups[k]) for k in order]}
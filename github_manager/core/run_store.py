@@ -0,0 +1,402 @@
+"""
+Run history in SQLite (data/runs.db) instead of rewriting runs.json per upload.
+Appends are single-row inserts; the Runs page and deletions use indexed queries
+(time, repo, account, status). An existing runs.json is imported once on first open
+and renamed to runs.json.migrated. Runs pruned by retention (core.run_retention)
+leave per-day counts in run_totals, so aggregate() still covers them.
+Analytics (core.run_stats) are updated in the same transaction as each insert / delete.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from . import run_stats
+from .store_json import get_data_dir
+
+DB_NAME = "runs.db"
+LEGACY_FILE = "runs.json"
+
+# run dict key (as in the old runs.json) -> column
+_COLUMNS = {
+    "startTime": "start_time",
+    "endTime": "end_time",
+    "accountId": "account_id",
+    "repoFullName": "repo",
+    "branch": "branch",
+    "fileName": "file_name",
+    "status": "status",
+    "commitSha": "commit_sha",
+    "logPath": "log_path",
+    "logRef": "log_ref",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_time TEXT NOT NULL DEFAULT '',
+    end_time TEXT NOT NULL DEFAULT '',
+    account_id TEXT NOT NULL DEFAULT '',
+    repo TEXT NOT NULL DEFAULT '',
+    branch TEXT NOT NULL DEFAULT '',
+    file_name TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    commit_sha TEXT NOT NULL DEFAULT '',
+    log_path TEXT NOT NULL DEFAULT '',
+    log_ref TEXT NOT NULL DEFAULT '',
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS runs_time ON runs (start_time);
+CREATE INDEX IF NOT EXISTS runs_repo ON runs (repo, start_time);
+CREATE INDEX IF NOT EXISTS runs_account ON runs (account_id, start_time);
+CREATE INDEX IF NOT EXISTS runs_status ON runs (status, start_time);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS run_totals (
+    day TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    status TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, account_id, repo, status)
+);
+"""
+
+# aggregate() group keys -> expressions valid on both runs and run_totals
+_GROUPS = {
+    "day": ("substr(start_time, 1, 10)", "day"),
+    "account": ("account_id", "account_id"),
+    "repo": ("repo", "repo"),
+    "status": ("status", "status"),
+}
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized_path: str | None = None
+
+
+def _db_path() -> str:
+    return os.path.join(get_data_dir(), DB_NAME)
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection (sqlite3 connections are not shared across threads)."""
+    path = _db_path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and getattr(_local, "path", None) == path:
+        return conn
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    _local.conn = conn
+    _local.path = path
+    _ensure_schema(conn, path)
+    return conn
+
+
+@contextmanager
+def _write_transaction(conn: sqlite3.Connection):
+    """
+    Transaction that holds the write lock from its start (BEGIN IMMEDIATE). Needed wherever
+    run_stats rows are read and then rewritten: with the implicit BEGIN (sent only at the first
+    write) the read would run outside the transaction and miss a concurrent add_run.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _ensure_schema(conn: sqlite3.Connection, path: str) -> None:
+    global _initialized_path
+    with _init_lock:
+        if _initialized_path == path:
+            return
+        conn.executescript(_SCHEMA)
+        conn.executescript(run_stats.SCHEMA)
+        _add_missing_columns(conn)
+        conn.executescript(_SORT_INDEXES)
+        _migrate_legacy(conn)
+        _build_stats(conn)
+        _analyze(conn)
+        _initialized_path = path
+
+
+def _analyze(conn: sqlite3.Connection) -> None:
+    """
+    Refresh planner statistics when the table size changed a lot since the last time, so a
+    filtered, sorted page walks the sort index or the filter index, whichever is cheaper.
+    """
+    n = conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    row = conn.execute("SELECT value FROM meta WHERE key = 'analyzed_rows'").fetchone()
+    last = int(row[0]) if row else -1
+    if last >= 0 and last // 2 <= n <= last * 2 + 1000:
+        return
+    with conn:
+        conn.execute("ANALYZE runs")
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('analyzed_rows', ?)", (str(n),))
+
+
+def _add_missing_columns(conn: sqlite3.Connection) -> None:
+    """Columns added after the table was first created (e.g. log_ref)."""
+    have = {r[1] for r in conn.execute("PRAGMA table_info(runs)")}
+    with conn:
+        for col in _COLUMNS.values():
+            if col not in have:
+                conn.execute(f"ALTER TABLE runs ADD COLUMN {col} TEXT NOT NULL DEFAULT ''")
+
+
+def _row_values(entry: dict) -> tuple:
+    extra = {k: v for k, v in entry.items() if k not in _COLUMNS and k != "id"}
+    return tuple(str(entry.get(k) or "") for k in _COLUMNS) + (json.dumps(extra, ensure_ascii=False),)
+
+
+# For the other sortable Runs columns, so each page is an index range (keyset pagination);
+# created after _add_missing_columns since log_ref may be new
+_SORT_INDEXES = """
+CREATE INDEX IF NOT EXISTS runs_branch ON runs (branch, start_time);
+CREATE INDEX IF NOT EXISTS runs_file ON runs (file_name, start_time);
+CREATE INDEX IF NOT EXISTS runs_sha ON runs (commit_sha, start_time);
+CREATE INDEX IF NOT EXISTS runs_log ON runs (log_ref, start_time);
+"""
+
+_INSERT = (
+    f"INSERT INTO runs ({', '.join(_COLUMNS.values())}, extra) "
+    f"VALUES ({', '.join('?' * (len(_COLUMNS) + 1))})"
+)
+
+
+def _migrate_legacy(conn: sqlite3.Connection) -> None:
+    """Import data/runs.json once (in file order, so ids follow the old order)."""
+    legacy = os.path.join(get_data_dir(), LEGACY_FILE)
+    if not os.path.isfile(legacy):
+        return
+    done = conn.execute("SELECT value FROM meta WHERE key = 'migrated_runs_json'").fetchone()
+    if done is None:
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                runs = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            runs = []
+        with conn:
+            conn.executemany(_INSERT, [_row_values(r) for r in runs if isinstance(r, dict)])
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_runs_json', ?)", (str(len(runs)),))
+    try:
+        os.replace(legacy, legacy + ".migrated")
+    except OSError:
+        pass
+
+
+def _build_stats(conn: sqlite3.Connection) -> None:
+    """Fill run_stats once from the runs already stored (and the counts of pruned ones)."""
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'run_stats_built'").fetchone():
+        return
+    with _write_transaction(conn):
+        # Another instance may have built them while we waited for the lock
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'run_stats_built'").fetchone():
+            return
+        cur = conn.execute("SELECT * FROM runs")
+        while True:
+            rows = cur.fetchmany(5000)
+            if not rows:
+                break
+            run_stats.apply(conn, [_to_dict(r) for r in rows])
+        for day, account_id, repo, status, n in conn.execute(
+            "SELECT day, account_id, repo, status, count FROM run_totals"
+        ).fetchall():
+            run_stats.add_counts(conn, day, account_id, repo, n, n if status == "Success" else 0)
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('run_stats_built', '1')")
+
+
+def _to_dict(row: sqlite3.Row) -> dict:
+    d = {"id": row["id"]}
+    for key, col in _COLUMNS.items():
+        d[key] = row[col]
+    try:
+        d.update(json.loads(row["extra"] or "{}"))
+    except json.JSONDecodeError:
+        pass
+    return d
+
+
+def _where(account_id=None, repo=None, status=None, since=None, until=None) -> tuple[str, list]:
+    clauses, args = [], []
+    if account_id:
+        clauses.append("account_id = ?")
+        args.append(account_id)
+    if repo:
+        clauses.append("repo = ?")
+        args.append(repo)
+    if status:
+        clauses.append("status = ?")
+        args.append(status)
+    if since:
+        clauses.append("start_time >= ?")
+        args.append(since)
+    if until:
+        clauses.append("start_time < ?")
+        args.append(until)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+
+def add_run(entry: dict) -> int:
+    """Append one run (dict with the runs.json keys); returns its id."""
+    conn = _connect()
+    with _write_transaction(conn):
+        cur = conn.execute(_INSERT, _row_values(entry))
+        run_stats.apply(conn, [entry])
+    return cur.lastrowid
+
+
+def query_runs(
+    limit: int | None = None,
+    offset: int = 0,
+    account_id: str | None = None,
+    repo: str | None = None,
+    status: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    newest_first: bool = True,
+    order_by: str = "startTime",
+    after: dict | None = None,
+) -> list[dict]:
+    """
+    Runs matching the filters (ISO time bounds on startTime), sorted by order_by (a run key,
+    then startTime / id) — newest / descending first by default.
+    after: the last run of the previous page; the query continues from its sort key
+    (keyset pagination, instead of re-sorting and skipping with offset).
+    """
+    where, args = _where(account_id, repo, status, since, until)
+    order = "DESC" if newest_first else "ASC"
+    col = _COLUMNS[order_by]
+    keys = [col] + [c for c in ("start_time", "id") if c != col]
+    if after is not None:
+        run_keys = [order_by] + [k for k in ("startTime", "id") if k != order_by]
+        cond = f"({', '.join(keys)}) {'<' if newest_first else '>'} ({', '.join('?' * len(keys))})"
+        where = f"{where} AND {cond}" if where else f" WHERE {cond}"
+        args += [after.get(k) if k == "id" else str(after.get(k) or "") for k in run_keys]
+    sql = f"SELECT * FROM runs{where} ORDER BY {', '.join(f'{c} {order}' for c in keys)}"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        args += [int(limit), int(offset)]
+    return [_to_dict(r) for r in _connect().execute(sql, args)]
+
+
+def count_runs(**filters) -> int:
+    where, args = _where(**filters)
+    return _connect().execute(f"SELECT COUNT(*) FROM runs{where}", args).fetchone()[0]
+
+
+def distinct_values(field: str) -> list[str]:
+    """Distinct repo / account / status values (for filters), read from the index."""
+    col = {"repo": "repo", "account": "account_id", "status": "status"}[field]
+    return [r[0] for r in _connect().execute(f"SELECT DISTINCT {col} FROM runs ORDER BY {col}")]
+
+
+def delete_runs(ids: list[int]) -> int:
+    """Delete runs by id; returns the number removed."""
+    if not ids:
+        return 0
+    conn = _connect()
+    removed = 0
+    with _write_transaction(conn):
+        for i in range(0, len(ids), 500):
+            chunk = [int(x) for x in ids[i:i + 500]]
+            marks = ", ".join("?" * len(chunk))
+            run_stats.apply(conn, [_to_dict(r) for r in conn.execute(f"SELECT * FROM runs WHERE id IN ({marks})", chunk)], -1)
+            cur = conn.execute(f"DELETE FROM runs WHERE id IN ({marks})", chunk)
+            removed += cur.rowcount
+    return removed
+
+
+def select_expired(
+    older_than: str = "",
+    failed_older_than: str = "",
+    keep_newest: int = 0,
+    limit: int = 5000,
+) -> list[dict]:
+    """
+    Oldest runs outside the retention window: non-failed runs started before older_than,
+    failed runs before failed_older_than, and anything beyond the keep_newest most recent.
+    Empty cutoffs / 0 disable that rule. At most limit runs, oldest first.
+    """
+    clauses, args = [], []
+    if older_than:
+        clauses.append("(status != 'Failed' AND start_time < ?)")
+        args.append(older_than)
+    if failed_older_than:
+        clauses.append("(status = 'Failed' AND start_time < ?)")
+        args.append(failed_older_than)
+    if keep_newest:
+        clauses.append(
+            "id IN (SELECT id FROM runs ORDER BY start_time DESC, id DESC LIMIT -1 OFFSET ?)"
+        )
+        args.append(int(keep_newest))
+    if not clauses:
+        return []
+    sql = f"SELECT * FROM runs WHERE {' OR '.join(clauses)} ORDER BY start_time, id LIMIT ?"
+    return [_to_dict(r) for r in _connect().execute(sql, args + [int(limit)])]
+
+
+def archive_runs(runs: list[dict]) -> int:
+    """Remove pruned runs, adding them to run_totals in the same transaction; returns the number removed."""
+    totals: dict[tuple, int] = {}
+    for r in runs:
+        key = ((r.get("startTime") or "")[:10], r.get("accountId") or "", r.get("repoFullName") or "", r.get("status") or "")
+        totals[key] = totals.get(key, 0) + 1
+    conn = _connect()
+    with conn:
+        conn.executemany(
+            "INSERT INTO run_totals (day, account_id, repo, status, count) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (day, account_id, repo, status) DO UPDATE SET count = count + excluded.count",
+            [k + (n,) for k, n in totals.items()],
+        )
+        ids = [int(r["id"]) for r in runs]
+        removed = 0
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            removed += conn.execute(f"DELETE FROM runs WHERE id IN ({', '.join('?' * len(chunk))})", chunk).rowcount
+    return removed
+
+
+def aggregate(by: str, include_pruned: bool = True) -> dict[str, int]:
+    """Run counts per day / account / repo / status, including runs removed by retention."""
+    live_expr, total_col = _GROUPS[by]
+    counts: dict[str, int] = {}
+    conn = _connect()
+    for key, n in conn.execute(f"SELECT {live_expr}, COUNT(*) FROM runs GROUP BY 1"):
+        counts[key] = counts.get(key, 0) + n
+    if include_pruned:
+        for key, n in conn.execute(f"SELECT {total_col}, SUM(count) FROM run_totals GROUP BY 1"):
+            counts[key] = counts.get(key, 0) + n
+    return counts
+
+
+def referenced_log_segments() -> set[int]:
+    """Log segments still referenced by a run (see core.log_store)."""
+    rows = _connect().execute(
+        "SELECT DISTINCT substr(log_ref, 1, instr(log_ref, ':') - 1) FROM runs WHERE log_ref != ''"
+    )
+    return {int(r[0]) for r in rows if r[0] and r[0].isdigit()}
+
+
+def delete_all() -> int:
+    conn = _connect()
+    with _write_transaction(conn):
+        cur = conn.execute("SELECT * FROM runs")
+        while True:
+            rows = cur.fetchmany(5000)
+            if not rows:
+                break
+            run_stats.apply(conn, [_to_dict(r) for r in rows], -1)
+        cur = conn.execute("DELETE FROM runs")
+    return cur.rowcount
+
+
+def stats(by: str) -> dict:
+    """Run analytics grouped by "day", "account" or "repo" (see core.run_stats.summarize)."""
+    return run_stats.summarize(_connect(), by)
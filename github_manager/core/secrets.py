@@ -1,32 +1,170 @@
 """
 Secure token storage via Windows Credential Manager using keyring.
-Tokens are NEVER stored in JSON; only secretKey (reference) and metadata.
+accounts.json only holds secretKey (reference) and metadata, never the token.
+Tokens read from the keyring are kept in memory and dropped after tokenCacheIdleSeconds
+without use (swept on every lookup) or when the account is deleted; prefetch_tokens()
+loads all accounts at once from a background thread. Any keyring backend works,
+including file-backed ones configured for keyring (e.g. keyrings.alt EncryptedKeyring:
+the memory cache avoids repeated unlock prompts). Without any backend (headless Linux),
+storing a token fails unless the user opted in to core.file_keyring (setting
+allowPlaintextTokenFile): a plaintext file readable only by the current user.
 """
+import hashlib
+import logging
+import threading
+import time
 import keyring
+import keyring.backends.fail
 import secrets as std_secrets
 
+from .settings import get_setting, set_setting
+
 SERVICE_NAME = "GitHubManager"
 
+# secret_key -> token fingerprint, filled whenever a token passes through here (never the token)
+_fingerprints: dict[str, str] = {}
+
+# secret_key -> (token, last use as time.monotonic())
+_cache: dict[str, tuple[str, float]] = {}
+_cache_lock = threading.Lock()
+_idle_ttl = 0.0  # seconds; read from settings on each keyring lookup
+_backend_ready = False
+
+
+NO_KEYRING_MESSAGE = (
+    "No keyring backend is available to store tokens securely. Install one supported by "
+    "the keyring package, or allow storing tokens unencrypted in a file (Accounts page)."
+)
+
+
+def _keyring():
+    """keyring module; without a real backend, switched to the file backend once the user allowed it."""
+    global _backend_ready
+    if not _backend_ready:
+        if isinstance(keyring.get_keyring(), keyring.backends.fail.Keyring):
+            if not get_setting("allowPlaintextTokenFile"):
+                return keyring  # checked again on the next call (the setting may change)
+            from .file_keyring import FileKeyring
+            backend = FileKeyring()
+            logging.getLogger(__name__).warning("No keyring backend; tokens are stored unencrypted in %s", backend.path())
+            keyring.set_keyring(backend)
+        _backend_ready = True
+    return keyring
+
+
+def backend_status() -> tuple[str, str]:
+    """
+    ("system", backend name), ("file", tokens.json path) when the plaintext fallback is in use,
+    or ("none", "") when there is no backend and the fallback is not allowed.
+    """
+    from .file_keyring import FileKeyring
+    backend = _keyring().get_keyring()
+    if isinstance(backend, FileKeyring):
+        return "file", backend.path()
+    if isinstance(backend, keyring.backends.fail.Keyring):
+        return "none", ""
+    return "system", type(backend).__name__
+
+
+def allow_plaintext_file() -> None:
+    """The user agreed to store tokens unencrypted when there is no keyring backend."""
+    global _backend_ready
+    set_setting("allowPlaintextTokenFile", True)
+    _backend_ready = False
+
 
 def _make_secret_key() -> str:
     return std_secrets.token_urlsafe(32)
 
 
+def token_fingerprint(token: str) -> str:
+    """Short non-reversible id of a token (for rate-limit / metadata lookups)."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprint_for(secret_key: str) -> str | None:
+    """Fingerprint of the token stored under secret_key, if it was read this session."""
+    return _fingerprints.get(secret_key)
+
+
+def _remember(secret_key: str, token: str) -> None:
+    _fingerprints[secret_key] = token_fingerprint(token)
+    with _cache_lock:
+        _cache[secret_key] = (token, time.monotonic())
+
+
+def _sweep(now: float) -> None:
+    """Drop every token idle longer than the TTL (caller holds _cache_lock)."""
+    if _idle_ttl > 0:
+        for key in [k for k, (_, used) in _cache.items() if now - used > _idle_ttl]:
+            del _cache[key]
+
+
+def _cached(secret_key: str) -> str | None:
+    with _cache_lock:
+        now = time.monotonic()
+        _sweep(now)
+        entry = _cache.get(secret_key)
+        if entry is None:
+            return None
+        _cache[secret_key] = (entry[0], now)
+        return entry[0]
+
+
+def _lookup(secret_key: str) -> str | None:
+    global _idle_ttl
+    _idle_ttl = float(get_setting("tokenCacheIdleSeconds") or 0)
+    try:
+        token = _keyring().get_password(SERVICE_NAME, secret_key)
+    except keyring.errors.NoKeyringError:
+        return None
+    if token:
+        _remember(secret_key, token)
+    return token
+
+
 def store_token(secret_key: str, token: str) -> None:
-    """Store PAT in Credential Manager under secret_key."""
-    keyring.set_password(SERVICE_NAME, secret_key, token)
+    """Store PAT in Credential Manager under secret_key. Raises NoKeyringError without a backend."""
+    if backend_status()[0] == "none":
+        raise keyring.errors.NoKeyringError(NO_KEYRING_MESSAGE)
+    _keyring().set_password(SERVICE_NAME, secret_key, token)
+    _remember(secret_key, token)
 
 
 def get_token(secret_key: str) -> str | None:
-    """Retrieve PAT from Credential Manager. Returns None if not found."""
-    return keyring.get_password(SERVICE_NAME, secret_key)
+    """Retrieve PAT (memory, else Credential Manager). Returns None if not found."""
+    if not secret_key:
+        return None
+    return _cached(secret_key) or _lookup(secret_key)
+
+
+def prefetch_tokens(secret_keys: list[str]) -> int:
+    """Load tokens not in memory yet (one keyring lookup each, in this thread); returns how many were loaded."""
+    loaded = 0
+    for secret_key in secret_keys:
+        if secret_key and _cached(secret_key) is None and _lookup(secret_key):
+            loaded += 1
+    return loaded
+
+
+def forget_token(secret_key: str) -> None:
+    """Drop a token from memory (it stays in the keyring)."""
+    with _cache_lock:
+        _cache.pop(secret_key, None)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
 
 
 def delete_token(secret_key: str) -> None:
     """Remove token from Credential Manager."""
+    _fingerprints.pop(secret_key, None)
+    forget_token(secret_key)
     try:
-        keyring.delete_password(SERVICE_NAME, secret_key)
-    except keyring.errors.PasswordDeleteError:
+        _keyring().delete_password(SERVICE_NAME, secret_key)
+    except (keyring.errors.PasswordDeleteError, keyring.errors.NoKeyringError):
         pass
 
 
@@ -0,0 +1,45 @@
+"""
+User-tunable settings in data/settings.json. Missing keys fall back to DEFAULTS.
+"""
+from .store_json import read_json
+from .store_service import get_writer
+
+SETTINGS_FILE = "settings.json"
+
+DEFAULTS = {
+    # Check ALL PAT: accounts checked at the same time
+    "patCheckConcurrency": 16,
+    # Remote branch lists are refreshed in the background after this many seconds
+    "branchCacheTtlSeconds": 900,
+    # Cached repo lists older than this are refreshed in the background when shown
+    "repoCacheTtlSeconds": 300,
+    # Repositories page: size / last push / open PRs of visible rows are refetched after this many seconds
+    "repoDetailsTtlSeconds": 900,
+    # Cross-account repo search index: accounts older than this are refetched in the background
+    "repoIndexRefreshSeconds": 3600,
+    # Tokens are re-checked automatically this many days before they expire
+    "patRecheckBeforeExpiryDays": 3,
+    # Tokens read from the keyring stay in memory until unused for this long (0 = whole session)
+    "tokenCacheIdleSeconds": 1800,
+    # Without a system keyring, store tokens unencrypted in <app data>/keyring/tokens.json
+    # (only after the user agreed on the Accounts page; otherwise adding tokens fails)
+    "allowPlaintextTokenFile": False,
+    # Run history retention (0 = no limit); pruned runs and their logs go to logs/archive/
+    "runRetentionDays": 180,
+    # Failed runs are kept longer than successful ones
+    "runRetentionFailedDays": 365,
+    # At most this many runs are kept in the history, newest first
+    "runRetentionMaxCount": 100000,
+}
+
+
+def get_setting(key: str):
+    """Value from settings.json, or the default."""
+    data = read_json(SETTINGS_FILE)
+    if isinstance(data, dict) and key in data:
+        return data[key]
+    return DEFAULTS.get(key)
+
+
+def set_setting(key: str, value) -> None:
+    get_writer().update(SETTINGS_FILE, lambda data: data.__setitem__(key, value))
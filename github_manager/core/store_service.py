@@ -0,0 +1,183 @@
+"""
+Single writer for read-modify-write changes to JSON files under data/.
+Mutations from any thread are queued and applied by one writer thread; mutations
+that arrive within BATCH_WINDOW of each other are grouped into one read, one write,
+one fsync and one rename per file. Each flush holds an advisory lock
+(data/.<file>.lock) and re-reads the file first, so a second app instance or a CLI
+using this module applies its changes on top of ours instead of overwriting them.
+"""
+import atexit
+import copy
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from .store_json import get_data_dir
+
+# Seconds the writer waits for more mutations before flushing
+BATCH_WINDOW = 0.02
+
+
+@contextmanager
+def file_lock(path: str):
+    """Exclusive advisory lock on path + ".lock", shared by every process using this module."""
+    lock_path = os.path.join(os.path.dirname(path), "." + os.path.basename(path) + ".lock")
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.name == "nt":
+            import msvcrt
+            while True:
+                try:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)  # gives up after ~10 s: try again
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def _read(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _write_durable(path: str, text: str) -> None:
+    dirpath = os.path.dirname(path)
+    fd, tmp = tempfile.mkstemp(dir=dirpath, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class StoreWriter:
+    """Use get_writer() for the shared instance."""
+
+    def __init__(self):
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_thread(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="store-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, filename: str, mutator) -> Future:
+        """
+        Queue mutator(data) for data/<filename>; data is the file's current JSON ({} if missing),
+        changed in place. The future resolves to (mutator result, data as written).
+        """
+        fut: Future = Future()
+        self._queue.put((filename, mutator, fut))
+        self._ensure_thread()
+        return fut
+
+    def update(self, filename: str, mutator):
+        """submit() and wait; returns (mutator result, data as written). Mutator errors are re-raised."""
+        return self.submit(filename, mutator).result()
+
+    def flush(self) -> None:
+        """Wait until everything queued so far is on disk."""
+        if self._thread is None:
+            return
+        fut: Future = Future()
+        self._queue.put((None, None, fut))
+        fut.result()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + BATCH_WINDOW
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            groups: dict[str, list] = {}
+            barriers = []
+            for filename, mutator, fut in batch:
+                if filename is None:
+                    barriers.append(fut)
+                else:
+                    groups.setdefault(filename, []).append((mutator, fut))
+            for filename, items in groups.items():
+                self._flush(filename, items)
+            for fut in barriers:
+                fut.set_result(None)
+
+    @staticmethod
+    def _flush(filename: str, items: list) -> None:
+        path = os.path.join(get_data_dir(), filename)
+        outcomes = []
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with file_lock(path):
+                data = _read(path)
+                before = json.dumps(data, indent=2, ensure_ascii=False)
+                for mutator, fut in items:
+                    # Each mutation works on a copy, so a failing one leaves no partial change
+                    work = copy.deepcopy(data)
+                    try:
+                        result = mutator(work)
+                    except Exception as e:
+                        outcomes.append((fut, None, e))
+                        continue
+                    data = work
+                    outcomes.append((fut, result, None))
+                after = json.dumps(data, indent=2, ensure_ascii=False)
+                if after != before:
+                    _write_durable(path, after)
+        except Exception as e:
+            for mutator, fut in items:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for fut, result, error in outcomes:
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result((result, data))
+
+
+_writer = StoreWriter()
+# Queued writes reach the disk before the interpreter exits
+atexit.register(_writer.flush)
+
+
+def get_writer() -> StoreWriter:
+    return _writer
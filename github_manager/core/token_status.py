@@ -0,0 +1,174 @@
+"""
+PAT status seen passively on API responses, per token fingerprint:
+expiry (GitHub-Authentication-Token-Expiration), scopes (X-OAuth-Scopes),
+last time the token was accepted and last auth failure (401).
+HttpClient feeds every authenticated response here; the Accounts page merges
+pending updates into accounts.json and only re-checks tokens that need it.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from .secrets import token_fingerprint, fingerprint_for
+from .settings import get_setting
+
+EXPIRY_HEADER = "GitHub-Authentication-Token-Expiration"
+SCOPES_HEADER = "X-OAuth-Scopes"
+# Near expiry, a valid token is re-checked at most this often
+RECHECK_INTERVAL_SECONDS = 6 * 3600
+# Expiry is only read from REST responses of this host: a missing header there means "never expires"
+EXPIRY_HOST = "api.github.com"
+
+_lock = threading.Lock()
+# fingerprint -> {"validAt": epoch, "failedAt": epoch, "expiresAt": iso ("" = never), "scopes": [...]}
+_seen: dict[str, dict] = {}
+_dirty: set[str] = set()
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S") + "Z"
+
+
+def _parse_iso(s: str) -> float | None:
+    if not s:
+        return None
+    try:
+        return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_expiration(value: str) -> str | None:
+    """'2025-03-01 12:00:00 UTC' / '... -0700' -> ISO UTC string; None if unparsable."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.endswith("UTC"):
+        value = value[:-3].strip() + " +0000"
+    try:
+        dt = datetime.strptime(value, "%Y-%m-%d %H:%M:%S %z")
+    except ValueError:
+        return None
+    return _iso(dt.timestamp())
+
+
+def _sets_expiry(url: str, status: int) -> bool:
+    """Only a 200 REST response from GitHub itself says whether the token expires
+    (304 revalidations, GraphQL and local stand-ins may omit the header)."""
+    parts = urlsplit(url or "")
+    return status == 200 and parts.netloc == EXPIRY_HOST and not parts.path.startswith("/graphql")
+
+
+def observe(token: str | None, resp, url: str = "") -> None:
+    """Record what an authenticated response (for request url) says about its token."""
+    if not token or resp is None:
+        return
+    status = resp.status_code
+    if status == 401:
+        update = {"failedAt": time.time()}
+    elif 200 <= status < 400:
+        update = {"validAt": time.time()}
+        h = resp.headers
+        if _sets_expiry(url, status):
+            if EXPIRY_HEADER in h:
+                expires = parse_expiration(h[EXPIRY_HEADER])
+                if expires:
+                    update["expiresAt"] = expires
+            else:
+                update["expiresAt"] = ""  # token without expiration
+        if SCOPES_HEADER in h:
+            update["scopes"] = [s.strip() for s in h[SCOPES_HEADER].split(",") if s.strip()]
+    else:
+        return
+    fp = token_fingerprint(token)
+    with _lock:
+        entry = _seen.setdefault(fp, {})
+        # Only mark dirty when something worth saving changed (validAt is saved at most once a minute)
+        changed = (
+            any(entry.get(k) != v for k, v in update.items() if k not in ("validAt", "failedAt"))
+            or "failedAt" in update
+            or ("validAt" in update and update["validAt"] - entry.get("savedValidAt", 0) > 60)
+            or ("validAt" in update and entry.get("failedAt", 0) > entry.get("validAt", 0))
+        )
+        entry.update(update)
+        if changed:
+            _dirty.add(fp)
+
+
+def take_updates() -> dict[str, dict]:
+    """Pending per-fingerprint updates since the last call (cleared)."""
+    with _lock:
+        out = {}
+        for fp in _dirty:
+            entry = _seen.get(fp)
+            if entry:
+                if "validAt" in entry:
+                    entry["savedValidAt"] = entry["validAt"]
+                out[fp] = dict(entry)
+        _dirty.clear()
+    return out
+
+
+def apply_update(acc: dict, updates: dict[str, dict]) -> bool:
+    """
+    Merge the update for acc's token into the account dict (accounts.json fields). True if changed.
+    A passive 401 only sets patAuthFailedAt; the status changes after the re-check it triggers.
+    """
+    fp = fingerprint_for(acc.get("secretKey", ""))
+    entry = updates.get(fp) if fp else None
+    if not entry:
+        return False
+    before = dict(acc)
+    valid_at = entry.get("validAt", 0)
+    failed_at = entry.get("failedAt", 0)
+    if valid_at and valid_at >= failed_at:
+        acc["patStatus"] = "Valid"
+        acc["lastSeenValidAt"] = _iso(valid_at)
+        if (_parse_iso(acc.get("lastCheckAt", "")) or 0) < valid_at:
+            acc["lastCheckAt"] = _iso(valid_at)
+    elif failed_at:
+        acc["patAuthFailedAt"] = _iso(failed_at)
+    if "expiresAt" in entry:
+        acc["patExpiresAt"] = entry["expiresAt"]
+    if "scopes" in entry:
+        acc["patScopes"] = entry["scopes"]
+    return acc != before
+
+
+def expiry_text(acc: dict, now: float | None = None) -> str:
+    """Display text for the account's PAT expiry ("" if not seen yet)."""
+    if "patExpiresAt" not in acc:
+        return ""
+    expires = _parse_iso(acc["patExpiresAt"])
+    if expires is None:
+        return "Không hết hạn"
+    now = now or time.time()
+    text = datetime.fromtimestamp(expires).strftime("%Y-%m-%d %H:%M")
+    if expires <= now:
+        return text + " (đã hết hạn)"
+    if expires - now <= float(get_setting("patRecheckBeforeExpiryDays")) * 86400:
+        return text + " (sắp hết hạn)"
+    return text
+
+
+def needs_check(acc: dict, now: float | None = None) -> bool:
+    """
+    True if the account's token should be checked explicitly: never checked,
+    an auth failure seen after the last check, or within patRecheckBeforeExpiryDays
+    of its expiry (and not confirmed in the last RECHECK_INTERVAL_SECONDS).
+    """
+    now = now or time.time()
+    last_check = _parse_iso(acc.get("lastCheckAt", ""))
+    if last_check is None:
+        return True
+    failed = _parse_iso(acc.get("patAuthFailedAt", ""))
+    if failed is not None and failed >= last_check:
+        return True
+    if acc.get("patStatus") == "Invalid":
+        return False
+    expires = _parse_iso(acc.get("patExpiresAt", ""))
+    if expires is None:
+        return False
+    window = float(get_setting("patRecheckBeforeExpiryDays")) * 86400
+    return expires - now <= window and now - last_check > RECHECK_INTERVAL_SECONDS
@@ -0,0 +1,214 @@
+"""
+Persistent per-workspace index of names under uploads/ for O(1) dedupe.
+Built once from `git ls-tree` of HEAD, then kept current from a small journal
+and `git diff` whenever HEAD moved. Stored inside .git/ (never committed).
+"""
+import json
+import os
+import re
+
+from . import git_ops
+from .path_policy import (
+    UPLOADS_BASE,
+    LAYOUT_FLAT,
+    split_name,
+    shard_dir,
+    resolve_upload_path,
+)
+
+INDEX_NAME = "uploads_index.json"
+JOURNAL_NAME = "uploads_index.log"
+# Journal lines before it is folded back into the snapshot
+_COMPACT_AFTER = 500
+
+_SUFFIX_RE = re.compile(r"^(.*) \((\d+)\)$")
+
+
+class UploadNameIndex:
+    """
+    Set of used paths relative to uploads/ plus, for each (dir, stem, ext),
+    the next free " (n)" suffix. Works as existing_names for resolve_upload_path.
+    """
+
+    def __init__(self, workspace_path: str):
+        self.workspace_path = workspace_path
+        self.head = ""
+        self.names: set[str] = set()
+        self._next: dict[tuple[str, str, str], int] = {}
+        self._pending: list[str] = []
+        self._journal_lines = 0
+
+    # --- set-like API used by resolve_upload_path ---
+
+    def __contains__(self, rel: str) -> bool:
+        return rel in self.names
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, rel: str) -> None:
+        if rel in self.names:
+            return
+        self.names.add(rel)
+        self._pending.append(rel)
+        self._note_suffix(rel)
+
+    def discard(self, rel: str) -> None:
+        # Numbers stay reserved (_next is not lowered); names remain unique.
+        self.names.discard(rel)
+
+    def _note_suffix(self, rel: str) -> None:
+        folder, _, name = rel.rpartition("/")
+        stem, ext = split_name(name)
+        m = _SUFFIX_RE.match(stem)
+        if m:
+            key = (folder, m.group(1), ext)
+            n = int(m.group(2))
+            if self._next.get(key, 2) <= n:
+                self._next[key] = n + 1
+
+    def resolve(self, uploads_dir: str, desired_name: str, layout: str = LAYOUT_FLAT, when=None) -> tuple[str, str]:
+        """Like resolve_upload_path, but starts at the known next free suffix."""
+        stem, ext = split_name(desired_name)
+        key = (shard_dir(desired_name, layout, when), stem, ext)
+        return resolve_upload_path(
+            uploads_dir,
+            desired_name,
+            self,
+            layout,
+            when,
+            first_suffix=self._next.get(key, 2),
+        )
+
+    def copy(self) -> "UploadNameIndex":
+        """Detached copy (e.g. for previews) whose adds are never persisted."""
+        other = UploadNameIndex(self.workspace_path)
+        other.head = self.head
+        other.names = set(self.names)
+        other._next = dict(self._next)
+        return other
+
+    @classmethod
+    def from_names(cls, workspace_path: str, names) -> "UploadNameIndex":
+        """In-memory index over paths relative to uploads/ (e.g. a remote tree)."""
+        idx = cls(workspace_path)
+        for rel in names:
+            idx.names.add(rel)
+            idx._note_suffix(rel)
+        return idx
+
+    # --- persistence ---
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.workspace_path, ".git", name)
+
+    @classmethod
+    def load(cls, workspace_path: str, read_only: bool = False) -> "UploadNameIndex":
+        """
+        Load the index for workspace and bring it in line with HEAD.
+        read_only: never write the snapshot (previews, which may run while a commit
+        appends to the journal of the same workspace).
+        """
+        idx = cls(workspace_path)
+        idx._read()
+        head = git_ops.get_head_sha(workspace_path)
+        if head != idx.head:
+            if idx.head and head and git_ops.is_ancestor(workspace_path, idx.head, head):
+                for status, path in git_ops.diff_name_status(workspace_path, idx.head, head, UPLOADS_BASE):
+                    rel = _rel_to_uploads(path)
+                    if rel is None:
+                        continue
+                    if status == "A":
+                        idx.add(rel)
+                    else:
+                        idx.discard(rel)
+            else:
+                idx._rebuild(head)
+            idx.head = head
+            if not read_only:
+                idx._write_snapshot()
+        idx._pending = []
+        return idx
+
+    def _rebuild(self, head: str) -> None:
+        self.names = set()
+        self._next = {}
+        if not head:
+            return
+        for path in git_ops.list_tree_files(self.workspace_path, UPLOADS_BASE, head):
+            rel = _rel_to_uploads(path)
+            if rel is not None:
+                self.names.add(rel)
+                self._note_suffix(rel)
+
+    def _read(self) -> None:
+        try:
+            with open(self._path(INDEX_NAME), "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            self.head = snap.get("head", "")
+            for rel in snap.get("names", []):
+                self.names.add(rel)
+                self._note_suffix(rel)
+        except (OSError, json.JSONDecodeError, AttributeError):
+            self.head = ""
+            self.names = set()
+            self._next = {}
+            return
+        try:
+            with open(self._path(JOURNAL_NAME), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn last line: ignore the rest
+                    for rel in entry.get("add", []):
+                        self.names.add(rel)
+                        self._note_suffix(rel)
+                    self.head = entry.get("head", self.head)
+                    self._journal_lines += 1
+        except OSError:
+            pass
+
+    def _write_snapshot(self) -> None:
+        data = {"head": self.head, "names": sorted(self.names)}
+        path = self._path(INDEX_NAME)
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp, path)
+            try:
+                os.unlink(self._path(JOURNAL_NAME))
+            except OSError:
+                pass
+            self._journal_lines = 0
+        except OSError:
+            pass
+
+    def commit(self, head: str) -> None:
+        """
+        Record names added since the last call as part of commit head.
+        Appends one journal line; folds the journal into the snapshot now and then.
+        """
+        self.head = head
+        entry = {"head": head, "add": self._pending}
+        self._pending = []
+        try:
+            with open(self._path(JOURNAL_NAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._journal_lines += 1
+        except OSError:
+            pass
+        if self._journal_lines >= _COMPACT_AFTER:
+            self._write_snapshot()
+
+    def rollback(self) -> None:
+        """Forget names added since the last commit() (their commit failed)."""
+        for rel in self._pending:
+            self.names.discard(rel)
+        self._pending = []
+
+
+def _rel_to_uploads(path: str) -> str | None:
+    prefix = UPLOADS_BASE + "/"
+    return path[len(prefix):] if path.startswith(prefix) else None
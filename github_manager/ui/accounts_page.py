@@ -2,6 +2,7 @@
 Accounts page: list accounts, add account (PAT, validate, save to Credential Manager + accounts.json).
 """
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from PySide6.QtWidgets import (
     QWidget,
@@ -20,18 +21,31 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QLabel,
     QMessageBox,
+    QFileDialog,
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QThread, Signal, QTimer
 from PySide6.QtGui import QPixmap, QIcon, QPainter, QColor, QPen, QBrush
-import requests
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.store_json import read_json, write_json
-from core.secrets import create_and_store_token, get_token, delete_token
-from core.github_api import get_user, get_user_emails
+from core.account_store import get_account_store
+from core.secrets import (
+    create_and_store_token,
+    get_token,
+    delete_token,
+    fingerprint_for,
+    prefetch_tokens,
+    backend_status,
+    allow_plaintext_file,
+)
+from core.github_api import get_user, get_user_emails, last_error
+from core.metrics import error_text
+from core import avatar_cache, repo_cache, repo_details, token_status
+from core.account_import import parse_file, validate_rows, write_report_csv, STATUS_VALID, STATUS_DUPLICATE
+from core.rate_limit import get_limiter, PRIORITY_BACKGROUND
+from core.settings import get_setting
 
 
 class CheckTokenWorker(QThread):
@@ -50,34 +64,114 @@ class CheckTokenWorker(QThread):
         if user:
             self.result.emit(True, f"PAT còn hạn. Login: {user.get('login', '')}")
         else:
-            self.result.emit(False, "PAT hết hạn hoặc không hợp lệ.")
+            reason = error_text(last_error())
+            self.result.emit(False, "PAT hết hạn hoặc không hợp lệ." + (f"\n({reason})" if reason else ""))
+
+
+class ValidateTokenWorker(QThread):
+    """
+    Validate a PAT off the UI thread: /user and /user/emails run at the same time;
+    the avatar download starts as soon as /user returns its URL (disk-cached).
+    """
+    result = Signal(object, object, object)  # user dict or None, emails list or None, avatar bytes or None
+
+    def __init__(self, token: str, parent=None):
+        super().__init__(parent)
+        self.token = token
+
+    @staticmethod
+    def _safe(fut):
+        try:
+            return fut.result()
+        except Exception:
+            return None
+
+    def run(self):
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            f_user = pool.submit(get_user, self.token)
+            f_emails = pool.submit(get_user_emails, self.token)
+            user = self._safe(f_user)
+            f_avatar = None
+            if user and user.get("avatar_url"):
+                f_avatar = pool.submit(avatar_cache.fetch, user["avatar_url"])
+            emails = self._safe(f_emails)
+            avatar = self._safe(f_avatar) if f_avatar else None
+        self.result.emit(user, emails, avatar)
+
+
+class AvatarRefreshWorker(QThread):
+    """Revalidate cached avatars (If-None-Match) for accounts; emit url when the image is new."""
+    updated = Signal(str)
+
+    def __init__(self, urls: list[str], parent=None):
+        super().__init__(parent)
+        self.urls = urls
+
+    def run(self):
+        for url in self.urls:
+            before = avatar_cache.cached_sha(url)
+            if avatar_cache.fetch(url, priority=PRIORITY_BACKGROUND) is not None:
+                if avatar_cache.cached_sha(url) != before:
+                    self.updated.emit(url)
+
+
+class TokenPrefetchWorker(QThread):
+    """Load every account's token from the keyring once, so later clicks and workers hit memory."""
+
+    def __init__(self, secret_keys: list[str], parent=None):
+        super().__init__(parent)
+        self.secret_keys = secret_keys
+
+    def run(self):
+        prefetch_tokens(self.secret_keys)
 
 
 class CheckAllPatWorker(QThread):
-    """Check PAT for many accounts; emit (account_id, valid) for each."""
-    result_one = Signal(str, bool)  # account_id, valid
+    """
+    Check PAT for many accounts, max_parallel at a time;
+    emit (account_id, valid, checked_at) as each check completes.
+    """
+    result_one = Signal(str, bool, str)  # account_id, valid, checked_at
 
-    def __init__(self, accounts: list, parent=None):
+    def __init__(self, accounts: list, max_parallel: int = 16, parent=None):
         super().__init__(parent)
         self.accounts = accounts
+        self.max_parallel = max(1, int(max_parallel))
 
-    def run(self):
-        now = datetime.utcnow().isoformat() + "Z"
-        for acc in self.accounts:
-            aid = acc.get("id", "")
+    @staticmethod
+    def _check(acc: dict) -> bool:
+        try:
             token = get_token(acc.get("secretKey", ""))
-            valid = get_user(token) is not None
-            self.result_one.emit(aid, valid)
+            return get_user(token, priority=PRIORITY_BACKGROUND) is not None
+        except Exception:
+            return False
 
+    def run(self):
+        if not self.accounts:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(self.accounts))) as pool:
+            futures = {pool.submit(self._check, acc): acc.get("id", "") for acc in self.accounts}
+            for fut in as_completed(futures):
+                now = datetime.utcnow().isoformat() + "Z"
+                self.result_one.emit(futures[fut], fut.result(), now)
 
-def _accounts_data() -> dict:
-    return read_json("accounts.json")
 
+class ImportAccountsWorker(QThread):
+    """Validate imported rows concurrently and store their tokens; accounts.json is written by the page."""
+    progress = Signal(int, int)  # done, total
+    result = Signal(object, object)  # new account dicts, report rows
 
-def _ensure_accounts_list(data: dict) -> list:
-    if "accounts" not in data:
-        data["accounts"] = []
-    return data["accounts"]
+    def __init__(self, rows: list, existing_logins: set, max_parallel: int, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.existing_logins = existing_logins
+        self.max_parallel = max_parallel
+
+    def run(self):
+        accounts, report = validate_rows(
+            self.rows, self.existing_logins, self.max_parallel, on_progress=self.progress.emit
+        )
+        self.result.emit(accounts, report)
 
 
 def _format_display_date(iso_str: str) -> str:
@@ -91,6 +185,28 @@ def _format_display_date(iso_str: str) -> str:
         return iso_str
 
 
+def _quota_text(acc: dict) -> str:
+    """API quota from the last response seen for this account's token (this session)."""
+    fp = fingerprint_for(acc.get("secretKey", ""))
+    q = get_limiter().quota(fp) if fp else None
+    if not q:
+        return ""
+    reset = datetime.fromtimestamp(q["reset"]).strftime("%H:%M")
+    return f"{q['remaining']}/{q['limit']} (reset {reset})"
+
+
+def _avatar_pixmap(url: str, size: int) -> QPixmap | None:
+    """Avatar from the disk cache (no network), scaled; None if not cached."""
+    data = avatar_cache.get_cached(url)
+    if not data:
+        return None
+    px = QPixmap()
+    px.loadFromData(data)
+    if px.isNull():
+        return None
+    return px.scaled(size, size, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
 def _status_icon_and_text(pat_status: str) -> tuple[QIcon | None, str]:
     """Trả về (icon, text) cho cột PAT Status: LIVE / Chưa Check / Dead."""
     size = 22
@@ -190,45 +306,41 @@ class AddAccountDialog(QDialog):
             return
         self.validate_btn.setEnabled(False)
         self.validate_btn.setText("Validating...")
-        try:
-            user = get_user(token)
-            if user:
-                self._user_data = user
-                login = user.get("login", "")
-                avatar_url = user.get("avatar_url", "")
-                self.preview.setText(f"Login: {login}")
-                # Điền sẵn contributor name và email (có thể sửa trước khi Save)
-                self.name_edit.setText(user.get("name") or login)
-                email = user.get("email")
-                if not email:
-                    emails = get_user_emails(token)
-                    if emails:
-                        primary = next((e for e in emails if e.get("primary") and e.get("verified")), None)
-                        if primary:
-                            email = primary.get("email", "")
-                    if not email:
-                        email = f"{login}@users.noreply.github.com"
-                self.email_edit.setText(email)
-                if avatar_url:
-                    try:
-                        r = requests.get(avatar_url, timeout=5)
-                        if r.status_code == 200:
-                            px = QPixmap()
-                            px.loadFromData(r.content)
-                            if not px.isNull():
-                                self.avatar_label.setPixmap(px.scaled(48, 48, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
-                                self.avatar_label.setVisible(True)
-                    except Exception:
-                        pass
-                QMessageBox.information(self, "Validation", "Token is valid.")
-            else:
-                self._user_data = None
-                self.avatar_label.setVisible(False)
-                self.preview.setText("Validate to see login and avatar.")
-                QMessageBox.warning(self, "Validation", "Invalid token or network error.")
-        finally:
-            self.validate_btn.setEnabled(True)
-            self.validate_btn.setText("Validate")
+        self._validate_worker = ValidateTokenWorker(token, self)
+        self._validate_worker.result.connect(self._on_validated)
+        self._validate_worker.finished.connect(self._validate_worker.deleteLater)
+        self._validate_worker.start()
+
+    def _on_validated(self, user, emails, avatar):
+        self.validate_btn.setEnabled(True)
+        self.validate_btn.setText("Validate")
+        if not user:
+            self._user_data = None
+            self.avatar_label.setVisible(False)
+            self.preview.setText("Validate to see login and avatar.")
+            QMessageBox.warning(self, "Validation", "Invalid token or network error.")
+            return
+        self._user_data = user
+        login = user.get("login", "")
+        self.preview.setText(f"Login: {login}")
+        # Điền sẵn contributor name và email (có thể sửa trước khi Save)
+        self.name_edit.setText(user.get("name") or login)
+        email = user.get("email")
+        if not email:
+            if emails:
+                primary = next((e for e in emails if e.get("primary") and e.get("verified")), None)
+                if primary:
+                    email = primary.get("email", "")
+            if not email:
+                email = f"{login}@users.noreply.github.com"
+        self.email_edit.setText(email)
+        if avatar:
+            px = QPixmap()
+            px.loadFromData(avatar)
+            if not px.isNull():
+                self.avatar_label.setPixmap(px.scaled(48, 48, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation))
+                self.avatar_label.setVisible(True)
+        QMessageBox.information(self, "Validation", "Token is valid.")
 
     def _accept_if_valid(self):
         label = self.label_edit.text().strip()
@@ -239,7 +351,7 @@ class AddAccountDialog(QDialog):
         if not token:
             QMessageBox.warning(self, "Add Account", "Nhập PAT token.")
             return
-        if not self._user_data:
+        if not self._user_data or not self.validate_btn.isEnabled():
             QMessageBox.warning(self, "Add Account", "Bấm Validate token trước.")
             return
         name = self.name_edit.text().strip()
@@ -275,6 +387,12 @@ class EditAccountDialog(QDialog):
         self.setWindowTitle("Edit Account")
         self.account = account
         layout = QVBoxLayout(self)
+        px = _avatar_pixmap(account.get("avatarUrl", ""), 48)
+        if px is not None:
+            avatar_label = QLabel()
+            avatar_label.setFixedSize(48, 48)
+            avatar_label.setPixmap(px)
+            layout.addWidget(avatar_label)
         form = QFormLayout()
         self.label_edit = QLineEdit()
         self.label_edit.setText(account.get("label", ""))
@@ -315,6 +433,57 @@ class EditAccountDialog(QDialog):
         return self.email_edit.text().strip()
 
 
+class ImportReportDialog(QDialog):
+    """Per-row result of a bulk import (valid / invalid / duplicate)."""
+
+    def __init__(self, report: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Import report")
+        self.resize(720, 420)
+        self.report = report
+        layout = QVBoxLayout(self)
+        counts = {}
+        for r in report:
+            counts[r["status"]] = counts.get(r["status"], 0) + 1
+        layout.addWidget(QLabel(
+            f"Thêm mới: {counts.get(STATUS_VALID, 0)}   •   "
+            f"Không hợp lệ: {counts.get('invalid', 0)}   •   "
+            f"Trùng login: {counts.get(STATUS_DUPLICATE, 0)}"
+        ))
+        table = QTableWidget(len(report), 5)
+        table.setHorizontalHeaderLabels(["Row", "Label", "Login", "Result", "Message"])
+        table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        colors = {STATUS_VALID: "#00dd66", STATUS_DUPLICATE: "#e0a000"}
+        for i, r in enumerate(report):
+            values = [str(r["row"]), r["label"], r["login"], r["status"], r["message"]]
+            for c, v in enumerate(values):
+                item = QTableWidgetItem(v)
+                if c == 3:
+                    item.setForeground(QColor(colors.get(r["status"], "#ff4444")))
+                table.setItem(i, c, item)
+        table.resizeColumnsToContents()
+        layout.addWidget(table)
+        row = QHBoxLayout()
+        save_btn = QPushButton("Save report (CSV)...")
+        save_btn.clicked.connect(self._save)
+        row.addWidget(save_btn)
+        row.addStretch()
+        close_btn = QPushButton("Đóng")
+        close_btn.clicked.connect(self.accept)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+
+    def _save(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save report", "import_report.csv", "CSV (*.csv)")
+        if not path:
+            return
+        try:
+            write_report_csv(path, self.report)
+        except OSError as e:
+            QMessageBox.warning(self, "Import report", f"Không ghi được file: {e}")
+
+
 class AccountsPage(QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -338,11 +507,22 @@ class AccountsPage(QWidget):
         add_btn = QPushButton("Add Account")
         add_btn.clicked.connect(self._add_account)
         top.addWidget(add_btn)
+        self.import_btn = QPushButton("Import (CSV/JSON)...")
+        self.import_btn.setToolTip("Nhập nhiều tài khoản từ file: cột label, token, name (tùy chọn), email (tùy chọn).")
+        self.import_btn.clicked.connect(self._import_accounts)
+        top.addWidget(self.import_btn)
         layout.addLayout(top)
 
-        self.table = QTableWidget(0, 4)
+        # Shown when tokens cannot go to a real keyring (plaintext file in use, or nowhere to store them)
+        self.storage_label = QLabel("")
+        self.storage_label.setWordWrap(True)
+        self.storage_label.setStyleSheet("color: #e0a030;")
+        layout.addWidget(self.storage_label)
+        self._update_storage_label()
+
+        self.table = QTableWidget(0, 6)
         self.table.setHorizontalHeaderLabels([
-            "Label", "Login", "PAT Status", "Last check",
+            "Label", "Login", "PAT Status", "Last check", "Expires", "API quota",
         ])
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
@@ -350,45 +530,204 @@ class AccountsPage(QWidget):
         self.table.setStyleSheet("font-size: 12px;")
         layout.addWidget(self.table)
 
+        self._avatar_icons: dict[str, QIcon] = {}  # image sha -> icon
         self._refresh_list()
+        # Every change to the account store (this page, workers, other windows) lands here
+        main_window.accounts_changed.connect(self._on_accounts_changed)
+        self._refresh_avatars()
+        self._prefetch_worker = TokenPrefetchWorker([a.get("secretKey", "") for a in self.get_accounts()], self)
+        self._prefetch_worker.finished.connect(self._prefetch_worker.deleteLater)
+        self._prefetch_worker.start()
+
+        # Quota comes from response headers (in memory): refresh that column only.
+        # PAT expiry / scopes / validity seen on responses are saved on the same tick.
+        self._quota_timer = QTimer(self)
+        self._quota_timer.setInterval(5000)
+        self._quota_timer.timeout.connect(self._refresh_quota_column)
+        self._quota_timer.timeout.connect(self._apply_token_updates)
+        self._quota_timer.start()
+
+        # Explicit PAT checks only for tokens that need one (never checked, auth failure, near expiry)
+        self._auto_check_worker = None
+        self._auto_check_timer = QTimer(self)
+        self._auto_check_timer.setInterval(10 * 60 * 1000)
+        self._auto_check_timer.timeout.connect(self._schedule_checks)
+        self._auto_check_timer.start()
+        QTimer.singleShot(3000, self._schedule_checks)
+
+    def _avatar_icon(self, url: str) -> QIcon | None:
+        sha = avatar_cache.cached_sha(url) if url else None
+        if not sha:
+            return None
+        icon = self._avatar_icons.get(sha)
+        if icon is None:
+            px = _avatar_pixmap(url, 22)
+            if px is None:
+                return None
+            icon = QIcon(px)
+            self._avatar_icons[sha] = icon
+        return icon
+
+    def _refresh_avatars(self):
+        """Revalidate missing / old avatars in the background; rows update when images change."""
+        urls = sorted({
+            a.get("avatarUrl", "")
+            for a in self.get_accounts()
+            if a.get("avatarUrl") and avatar_cache.needs_refresh(a.get("avatarUrl"))
+        })
+        if not urls:
+            return
+        self._avatar_worker = AvatarRefreshWorker(urls, self)
+        self._avatar_worker.updated.connect(self._on_avatar_updated)
+        self._avatar_worker.finished.connect(self._avatar_worker.deleteLater)
+        self._avatar_worker.start()
+
+    def _on_avatar_updated(self, url: str):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 0)
+            acc = item.data(Qt.ItemDataRole.UserRole) if item else None
+            if acc and acc.get("avatarUrl") == url:
+                icon = self._avatar_icon(url)
+                if icon is not None:
+                    item.setIcon(icon)
+
+    def _refresh_quota_column(self):
+        for row in range(self.table.rowCount()):
+            item = self.table.item(row, 5)
+            if item is None:
+                continue
+            text = _quota_text(item.data(Qt.ItemDataRole.UserRole) or {})
+            if item.text() != text:
+                item.setText(text)
+
+    def _apply_token_updates(self):
+        """Merge PAT status seen on API responses into accounts.json (one write) and the rows."""
+        updates = token_status.take_updates()
+        if not updates:
+            return
+        def apply(accounts):
+            return [a.get("id", "") for a in accounts if token_status.apply_update(a, updates)]
+
+        store = get_account_store()
+        changed = [store.get(i) for i in store.update(apply)]
+        if any(token_status.needs_check(a) for a in changed if a):
+            self._schedule_checks()
+
+    def _schedule_checks(self):
+        """Check in the background only the tokens that need it; results are saved silently."""
+        if self._auto_check_worker is not None or not self.check_all_btn.isEnabled():
+            return
+        due = [a for a in self.get_accounts() if token_status.needs_check(a)]
+        if not due:
+            return
+        self._auto_check_worker = CheckAllPatWorker(due, get_setting("patCheckConcurrency"), self)
+        self._auto_check_worker.result_one.connect(self._save_check_result)
+        self._auto_check_worker.finished.connect(self._on_auto_check_finished)
+        self._auto_check_worker.start()
+
+    def _on_auto_check_finished(self):
+        self._auto_check_worker.deleteLater()
+        self._auto_check_worker = None
+
+    def _on_accounts_changed(self, ids):
+        """Store changed: update only those rows, or rebuild when accounts were added / removed / reloaded."""
+        store = get_account_store()
+        if ids is None or any(i not in self._row_of for i in ids):
+            self._refresh_list()
+            return
+        for account_id in ids:
+            acc = store.get(account_id)
+            row = self._row_of.get(account_id)
+            if acc is None:
+                self._refresh_list()
+                return
+            if row < self.table.rowCount():
+                self._set_row(row, acc)
 
     def _refresh_list(self):
-        data = _accounts_data()
-        accounts = _ensure_accounts_list(data)
+        accounts = self.get_accounts()
         self.table.setRowCount(len(accounts))
+        self._row_of = {}
         for row, acc in enumerate(accounts):
-            self.table.setItem(row, 0, QTableWidgetItem(acc.get("label", "?")))
-            self.table.setItem(row, 1, QTableWidgetItem(acc.get("login", "")))
-            status_icon, status_text = _status_icon_and_text(acc.get("patStatus", ""))
-            status_item = QTableWidgetItem(status_text)
-            if status_icon:
-                status_item.setIcon(status_icon)
-            self.table.setItem(row, 2, status_item)
-            self.table.setItem(row, 3, QTableWidgetItem(_format_display_date(acc.get("lastCheckAt", ""))))
-            for col in range(4):
-                item = self.table.item(row, col)
-                if item:
-                    item.setData(Qt.ItemDataRole.UserRole, acc)
+            self._set_row(row, acc)
+            self._row_of[acc.get("id", "")] = row
         self.table.resizeColumnsToContents()
 
+    def _set_row(self, row: int, acc: dict):
+        label_item = QTableWidgetItem(acc.get("label", "?"))
+        icon = self._avatar_icon(acc.get("avatarUrl", ""))
+        if icon is not None:
+            label_item.setIcon(icon)
+        items = [
+            label_item,
+            QTableWidgetItem(acc.get("login", "")),
+        ]
+        status_icon, status_text = _status_icon_and_text(acc.get("patStatus", ""))
+        status_item = QTableWidgetItem(status_text)
+        if status_icon:
+            status_item.setIcon(status_icon)
+        if acc.get("patScopes") is not None:
+            status_item.setToolTip("Scopes: " + (", ".join(acc["patScopes"]) or "(none)"))
+        items.append(status_item)
+        items.append(QTableWidgetItem(_format_display_date(acc.get("lastCheckAt", ""))))
+        items.append(QTableWidgetItem(token_status.expiry_text(acc)))
+        items.append(QTableWidgetItem(_quota_text(acc)))
+        for col, item in enumerate(items):
+            item.setData(Qt.ItemDataRole.UserRole, acc)
+            self.table.setItem(row, col, item)
+
+    def _update_storage_label(self):
+        status, detail = backend_status()
+        if status == "file":
+            text = f"⚠ Không có keyring hệ thống: token đang được lưu KHÔNG mã hóa trong {detail}"
+        elif status == "none":
+            text = "⚠ Không có keyring hệ thống: chưa thể lưu token (sẽ hỏi khi thêm tài khoản)."
+        else:
+            text = ""
+        self.storage_label.setText(text)
+        self.storage_label.setVisible(bool(text))
+
+    def _ensure_token_storage(self) -> bool:
+        """Without a keyring backend, ask before falling back to the plaintext token file."""
+        if backend_status()[0] != "none":
+            return True
+        reply = QMessageBox.question(
+            self,
+            "Token storage",
+            "Máy này không có keyring hệ thống (Credential Manager / Secret Service) để lưu token an toàn.\n\n"
+            "Lưu token KHÔNG mã hóa trong một file chỉ user hiện tại đọc được?\n"
+            "Chọn No để hủy và cài một keyring backend trước.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return False
+        allow_plaintext_file()
+        self._update_storage_label()
+        return True
+
     def _add_account(self):
+        if not self._ensure_token_storage():
+            return
         dlg = AddAccountDialog(self)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
         label = dlg.get_label()
         token = dlg.get_token()
         user = dlg.get_user_data()
-        secret_key = create_and_store_token(token)
+        try:
+            secret_key = create_and_store_token(token)
+        except Exception as e:
+            QMessageBox.warning(self, "Accounts", f"Không lưu được token:\n{e}")
+            return
         account_id = str(uuid.uuid4())
-        data = _accounts_data()
-        accounts = _ensure_accounts_list(data)
         login = user.get("login", "")
         # Name và email do user nhập trong dialog (contributor cho commit)
         name = dlg.get_contributor_name()
         email = dlg.get_contributor_email()
 
         added_at = datetime.utcnow().isoformat() + "Z"
-        accounts.append({
+        get_account_store().add([{
             "id": account_id,
             "label": label,
             "secretKey": secret_key,
@@ -399,11 +738,47 @@ class AccountsPage(QWidget):
             "addedAt": added_at,
             "patStatus": "Chưa check",
             "lastCheckAt": "",
-        })
-        data["accounts"] = accounts
-        write_json("accounts.json", data)
-        self._refresh_list()
-        QMessageBox.information(self, "Accounts", "Account added and token stored securely.")
+        }])
+        if backend_status()[0] == "file":
+            QMessageBox.information(self, "Accounts", "Account added; token stored in the unencrypted token file.")
+        else:
+            QMessageBox.information(self, "Accounts", "Account added and token stored securely.")
+
+    def _import_accounts(self):
+        if not self._ensure_token_storage():
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import accounts", "", "Accounts (*.csv *.json);;CSV (*.csv);;JSON (*.json)"
+        )
+        if not path:
+            return
+        try:
+            rows = parse_file(path)
+        except (OSError, ValueError, UnicodeDecodeError) as e:
+            QMessageBox.warning(self, "Import", f"Không đọc được file:\n{e}")
+            return
+        if not rows:
+            QMessageBox.warning(self, "Import", "File không có dòng nào.")
+            return
+        existing = {a.get("login", "").lower() for a in self.get_accounts() if a.get("login")}
+        self.import_btn.setEnabled(False)
+        self.import_btn.setText(f"Đang import... 0/{len(rows)}")
+        self._import_worker = ImportAccountsWorker(rows, existing, get_setting("patCheckConcurrency"), self)
+        self._import_worker.progress.connect(
+            lambda done, total: self.import_btn.setText(f"Đang import... {done}/{total}")
+        )
+        self._import_worker.result.connect(self._on_import_done)
+        self._import_worker.finished.connect(self._import_worker.deleteLater)
+        self._import_worker.start()
+
+    def _on_import_done(self, accounts: list, report: list):
+        self.import_btn.setEnabled(True)
+        self.import_btn.setText("Import (CSV/JSON)...")
+        if accounts:
+            # All new accounts in one atomic write
+            get_account_store().add(accounts)
+            self._refresh_avatars()
+        ImportReportDialog(report, self).exec()
 
     def _get_selected_account(self):
         row = self.table.currentRow()
@@ -430,48 +805,47 @@ class AccountsPage(QWidget):
         self.check_btn.setText("Check token (PAT còn hạn?)")
         acc = self._get_selected_account()
         if acc:
-            data = _accounts_data()
-            accounts = _ensure_accounts_list(data)
-            now = datetime.utcnow().isoformat() + "Z"
-            status = "Valid" if valid else "Invalid"
-            for a in accounts:
-                if a.get("id") == acc.get("id"):
-                    a["lastCheckAt"] = now
-                    a["patStatus"] = status
-                    break
-            write_json("accounts.json", data)
-            self._refresh_list()
+            get_account_store().patch(acc.get("id", ""), {
+                "lastCheckAt": datetime.utcnow().isoformat() + "Z",
+                "patStatus": "Valid" if valid else "Invalid",
+            })
         if valid:
             QMessageBox.information(self, "Check token", message)
         else:
             QMessageBox.warning(self, "Check token", message)
 
     def _check_all_pat(self):
-        accounts = _ensure_accounts_list(_accounts_data())
+        accounts = self.get_accounts()
         if not accounts:
             QMessageBox.warning(self, "Accounts", "Chưa có tài khoản nào.")
             return
+        if self._auto_check_worker is not None:
+            QMessageBox.information(self, "Check ALL PAT", "Đang kiểm tra tự động, thử lại sau ít giây.")
+            return
         self.check_btn.setEnabled(False)
         self.check_all_btn.setEnabled(False)
-        self.check_all_btn.setText("Đang check...")
-        self._check_all_data = _accounts_data()
-        self._check_all_accounts = _ensure_accounts_list(self._check_all_data)
-        self._check_all_now = datetime.utcnow().isoformat() + "Z"
-        self._check_all_worker = CheckAllPatWorker(self._check_all_accounts, self)
+        self._check_all_total = len(accounts)
+        self._check_all_done = 0
+        self.check_all_btn.setText(f"Đang check... 0/{self._check_all_total}")
+        self._check_all_worker = CheckAllPatWorker(accounts, get_setting("patCheckConcurrency"), self)
         self._check_all_worker.result_one.connect(self._on_check_all_one)
         self._check_all_worker.finished.connect(self._on_check_all_finished)
         self._check_all_worker.start()
 
-    def _on_check_all_one(self, account_id: str, valid: bool):
-        for a in self._check_all_accounts:
-            if a.get("id") == account_id:
-                a["patStatus"] = "Valid" if valid else "Invalid"
-                a["lastCheckAt"] = self._check_all_now
-                break
+    def _on_check_all_one(self, account_id: str, valid: bool, checked_at: str):
+        self._save_check_result(account_id, valid, checked_at)
+        self._check_all_done += 1
+        self.check_all_btn.setText(f"Đang check... {self._check_all_done}/{self._check_all_total}")
+
+    def _save_check_result(self, account_id: str, valid: bool, checked_at: str):
+        """Save one result right away (the store signal updates only that account's row)."""
+        get_account_store().patch(account_id, {
+            "patStatus": "Valid" if valid else "Invalid",
+            "lastCheckAt": checked_at,
+        })
 
     def _on_check_all_finished(self):
-        write_json("accounts.json", self._check_all_data)
-        self._refresh_list()
+        self.table.resizeColumnsToContents()
         self.check_btn.setEnabled(True)
         self.check_all_btn.setEnabled(True)
         self.check_all_btn.setText("Check ALL PAT")
@@ -486,16 +860,11 @@ class AccountsPage(QWidget):
         dlg = EditAccountDialog(acc, self)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
-        data = _accounts_data()
-        accounts = _ensure_accounts_list(data)
-        for a in accounts:
-            if a.get("id") == acc.get("id"):
-                a["label"] = dlg.get_label()
-                a["name"] = dlg.get_contributor_name()
-                a["email"] = dlg.get_contributor_email()
-                break
-        write_json("accounts.json", data)
-        self._refresh_list()
+        get_account_store().patch(acc.get("id", ""), {
+            "label": dlg.get_label(),
+            "name": dlg.get_contributor_name(),
+            "email": dlg.get_contributor_email(),
+        })
         QMessageBox.information(self, "Edit", "Đã lưu thay đổi.")
 
     def _delete_account(self):
@@ -517,13 +886,11 @@ class AccountsPage(QWidget):
         account_id = acc.get("id", "")
         secret_key = acc.get("secretKey", "")
         delete_token(secret_key)
-        data = _accounts_data()
-        accounts = _ensure_accounts_list(data)
-        data["accounts"] = [a for a in accounts if a.get("id") != account_id]
-        write_json("accounts.json", data)
-        self._refresh_list()
+        repo_cache.forget(account_id)
+        repo_details.forget(account_id)
+        get_account_store().remove(account_id)
         QMessageBox.information(self, "Accounts", "Đã xóa tài khoản và token.")
 
     def get_accounts(self):
-        data = _accounts_data()
-        return _ensure_accounts_list(data)
+        """Accounts from the in-memory store (no disk I/O)."""
+        return get_account_store().accounts()
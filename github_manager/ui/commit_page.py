@@ -20,54 +20,101 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QProgressBar,
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QThread, Signal, QTimer
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.store_json import (
-    read_json,
-    write_json,
-    get_workspace_path,
-    get_logs_dir,
-)
+from core.store_json import get_workspace_path
 from core.secrets import get_token
-from core.github_api import get_repos
-from core.path_policy import clean_filename, resolve_upload_path, ensure_upload_dir
-from core.git_ops import clone_repo, checkout_branch, add_commit_push
-
-
-def _runs_data() -> list:
-    return read_json("runs.json")
+from core.github_api import get_tree_paths
+from core.path_policy import (
+    clean_filename,
+    ensure_upload_dir,
+    append_manifest,
+    shard_dir,
+    UPLOADS_BASE,
+    LAYOUT_FLAT,
+    LAYOUT_HASH,
+    LAYOUT_DATE,
+)
+from core.git_ops import clone_repo, checkout_branch, add_commit_push, get_current_branch
+from core.upload_index import UploadNameIndex
+from core.rate_limit import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from core import branch_cache, repo_cache, log_store
+from core.run_store import add_run
 
+from .repos_page import LoadReposWorker
 
-def _append_run(entry: dict) -> None:
-    data = _runs_data()
-    data.append(entry)
-    write_json("runs.json", data)
 
+class _LoadBranchesWorker(QThread):
+    """Fetch remote branch names for one repo (API or ls-remote) and update the cache."""
+    page = Signal(str, object)  # repo full name, list of branch names
+    result = Signal(str, object)  # repo full name, list or None
 
-class _LoadReposWorker(QThread):
-    result = Signal(object)
+    def __init__(self, account, repo_full_name, clone_url, priority, parent=None):
+        super().__init__(parent)
+        self.account = account
+        self.repo_full_name = repo_full_name
+        self.clone_url = clone_url
+        self.priority = priority
 
-    def __init__(self, token: str, parent=None):
+    def run(self):
+        token = get_token(self.account.get("secretKey", ""))
+        if not token:
+            self.result.emit(self.repo_full_name, None)
+            return
+        branches = branch_cache.fetch(
+            self.account.get("id", ""),
+            self.repo_full_name,
+            token,
+            self.clone_url,
+            on_page=lambda names: self.page.emit(self.repo_full_name, names),
+            priority=self.priority,
+        )
+        self.result.emit(self.repo_full_name, branches)
+
+
+class _PreviewBaseWorker(QThread):
+    """
+    Load the names already under uploads/ for the preview: the local workspace
+    index when the clone is on the selected branch, otherwise the remote tree.
+    """
+    result = Signal(int, object, str)  # generation, UploadNameIndex or None, source
+
+    def __init__(self, generation, account, repo_full_name, branch, parent=None):
         super().__init__(parent)
-        self.token = token
+        self.generation = generation
+        self.account = account
+        self.repo_full_name = repo_full_name
+        self.branch = branch
 
     def run(self):
-        self.result.emit(get_repos(self.token))
+        workspace = get_workspace_path(self.account.get("id", ""), self.repo_full_name)
+        if os.path.isdir(os.path.join(workspace, ".git")) and (
+            not self.branch or get_current_branch(workspace) == self.branch
+        ):
+            self.result.emit(self.generation, UploadNameIndex.load(workspace, read_only=True), "workspace")
+            return
+        token = get_token(self.account.get("secretKey", ""))
+        paths = get_tree_paths(token, self.repo_full_name, self.branch or "HEAD", UPLOADS_BASE) if token else None
+        if paths is None:
+            self.result.emit(self.generation, None, "")
+            return
+        self.result.emit(self.generation, UploadNameIndex.from_names(workspace, paths), "remote")
 
 
 class CommitWorker(QThread):
     progress = Signal(int, int, str)  # current, total, message
     finished_signal = Signal()
 
-    def __init__(self, account, repo_full_name, branch, file_paths, clone_url, parent=None):
+    def __init__(self, account, repo_full_name, branch, file_paths, clone_url, layout=LAYOUT_FLAT, parent=None):
         super().__init__(parent)
         self.account = account
         self.repo_full_name = repo_full_name
         self.branch = branch
         self.file_paths = file_paths
         self.clone_url = clone_url
+        self.layout = layout
 
     def run(self):
         account_id = self.account.get("id", "")
@@ -77,7 +124,6 @@ class CommitWorker(QThread):
             self.finished_signal.emit()
             return
         workspace = get_workspace_path(account_id, self.repo_full_name)
-        owner_repo_dir = self.repo_full_name.replace("/", "_")
         # Clone if needed
         ok, msg = clone_repo(self.clone_url, token, workspace)
         if not ok:
@@ -89,18 +135,13 @@ class CommitWorker(QThread):
             if not ok:
                 checkout_branch(workspace, "main")
         uploads_dir = ensure_upload_dir(workspace)
-        existing = set()
-        for p in os.listdir(uploads_dir):
-            if os.path.isfile(os.path.join(uploads_dir, p)):
-                existing.add(p)
+        # Index of used names, built from git ls-tree once and kept in .git/
+        existing = UploadNameIndex.load(workspace)
         total = len(self.file_paths)
         for i, src in enumerate(self.file_paths):
             filename = clean_filename(os.path.basename(src))
-            dest_abs, rel_path = resolve_upload_path(uploads_dir, filename, existing)
+            dest_abs, rel_path = existing.resolve(uploads_dir, filename, self.layout)
             start_time = datetime.utcnow().isoformat() + "Z"
-            log_dir = get_logs_dir()
-            log_name = f"commit_{account_id}_{owner_repo_dir}_{i}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.log"
-            log_path = os.path.join(log_dir, log_name)
             run_entry = {
                 "accountId": account_id,
                 "repoFullName": self.repo_full_name,
@@ -110,12 +151,13 @@ class CommitWorker(QThread):
                 "status": "Failed",
                 "startTime": start_time,
                 "endTime": "",
-                "logPath": log_path,
             }
             lines = []
             try:
                 import shutil
+                os.makedirs(os.path.dirname(dest_abs), exist_ok=True)
                 shutil.copy2(src, dest_abs)
+                run_entry["bytes"] = os.path.getsize(dest_abs)
                 commit_msg = f"Upload {os.path.basename(dest_abs)}"
                 # Dùng đúng contributor name/email của account để contributions tính vào tài khoản,
                 # không dùng git config global của máy (ép qua GIT_AUTHOR_* trong git_ops).
@@ -135,20 +177,26 @@ class CommitWorker(QThread):
                 run_entry["endTime"] = end_time
                 run_entry["commitSha"] = commit_sha or ""
                 run_entry["status"] = "Success" if ok else "Failed"
+                if commit_sha:
+                    existing.commit(commit_sha)
+                else:
+                    existing.rollback()
+                if ok:
+                    append_manifest(workspace, rel_path, os.path.basename(src), self.layout)
                 lines.append(f"File: {src}")
                 lines.append(f"Dest: {rel_path}")
                 lines.append(f"Commit: {commit_msg}")
                 lines.append(f"Push: {'OK' if ok else err}")
             except Exception as e:
+                existing.rollback()
                 run_entry["status"] = "Failed"
                 run_entry["endTime"] = datetime.utcnow().isoformat() + "Z"
                 lines.append(str(e))
             try:
-                with open(log_path, "w", encoding="utf-8") as f:
-                    f.write("\n".join(lines))
-            except Exception:
+                run_entry["logRef"] = log_store.append("\n".join(lines))
+            except OSError:
                 pass
-            _append_run(run_entry)
+            add_run(run_entry)
             self.progress.emit(i + 1, total, run_entry["status"])
         self.finished_signal.emit()
 
@@ -188,7 +236,16 @@ class CommitPage(QWidget):
         r3.addWidget(QLabel("Branch:"))
         self.branch_combo = QComboBox()
         self.branch_combo.setMinimumWidth(180)
+        self.branch_combo.currentIndexChanged.connect(self._schedule_preview_base)
         r3.addWidget(self.branch_combo)
+        r3.addWidget(QLabel("Layout:"))
+        self.layout_combo = QComboBox()
+        self.layout_combo.addItem("uploads/<file> (flat)", LAYOUT_FLAT)
+        self.layout_combo.addItem("uploads/ab/cd/<file> (hash)", LAYOUT_HASH)
+        self.layout_combo.addItem("uploads/YYYY/MM/DD/<file> (date)", LAYOUT_DATE)
+        self.layout_combo.setToolTip("Chia uploads/ thành thư mục con để tree của git nhỏ khi repo có nhiều file.")
+        self.layout_combo.currentIndexChanged.connect(self._preview_resolve_all)
+        r3.addWidget(self.layout_combo)
         r3.addStretch()
         layout.addLayout(r3)
 
@@ -211,12 +268,28 @@ class CommitPage(QWidget):
         self.files_list.setMaximumHeight(120)
         layout.addWidget(self.files_list)
 
-        # Preview table: source -> uploads/<filename>
+        # Preview table: source -> uploads/<filename>, resolved against the real tree
         layout.addWidget(QLabel("Preview (source → uploads/<filename>):"))
-        self.preview_table = QTableWidget(0, 2)
-        self.preview_table.setHorizontalHeaderLabels(["Source file", "uploads/..."])
+        self.preview_table = QTableWidget(0, 3)
+        self.preview_table.setHorizontalHeaderLabels(["Source file", "uploads/...", "Status"])
         self.preview_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.preview_table)
+        self.preview_summary = QLabel("")
+        layout.addWidget(self.preview_summary)
+
+        # Preview state: selected paths (ordered + set), base names in uploads/,
+        # working index (base + rows so far), resolved rows (rel_path, status)
+        self._preview_paths: list[str] = []
+        self._preview_path_set: set[str] = set()
+        self._preview_base: UploadNameIndex | None = None
+        self._preview_source = ""
+        self._preview_index = UploadNameIndex("")
+        self._preview_rows: list[tuple[str, str]] = []
+        self._preview_generation = 0
+        self._preview_base_timer = QTimer(self)
+        self._preview_base_timer.setSingleShot(True)
+        self._preview_base_timer.setInterval(200)
+        self._preview_base_timer.timeout.connect(self._load_preview_base)
 
         self.run_btn = QPushButton("Commit & Push (one commit per file)")
         self.run_btn.clicked.connect(self._run_commit_push)
@@ -227,101 +300,324 @@ class CommitPage(QWidget):
         layout.addWidget(self.progress)
 
         self._worker = None
+        self._repos_error = ""
         self.refresh_accounts()
+        main_window.accounts_changed.connect(self.refresh_accounts)
 
-    def refresh_accounts(self):
+    def refresh_accounts(self, _changed_ids=None):
+        """Rebuild the account list from the store, keeping the selected account (no reload if unchanged)."""
+        current = (self.account_combo.currentData() or {}).get("id")
+        self.account_combo.blockSignals(True)
         self.account_combo.clear()
-        for acc in self.main_window.get_accounts():
+        index = 0
+        for i, acc in enumerate(self.main_window.get_accounts()):
             self.account_combo.addItem(
                 f"{acc.get('label', '?')} ({acc.get('login', '')})",
                 acc,
             )
-        self._clone_url_map.clear()
-        self.repo_combo.clear()
-        self.branch_combo.clear()
+            if acc.get("id") == current:
+                index = i
+        self.account_combo.setCurrentIndex(index if self.account_combo.count() else -1)
+        self.account_combo.blockSignals(False)
+        if (self.account_combo.currentData() or {}).get("id") != current:
+            self._on_account_changed()
+
+    def select_repo(self, account_id: str, hit: dict):
+        """Select account and repo (e.g. from the cross-account search); hit is a repo_index result."""
+        for i in range(self.account_combo.count()):
+            acc = self.account_combo.itemData(i)
+            if acc and acc.get("id") == account_id:
+                if i != self.account_combo.currentIndex():
+                    self.account_combo.setCurrentIndex(i)
+                break
+        else:
+            return
+        full = hit.get("full_name", "")
+        idx = self.repo_combo.findText(full)
+        if idx < 0:
+            # Repo list not cached for this account yet: add the indexed entry
+            self.repo_combo.blockSignals(True)
+            self._add_repos([{
+                "full_name": full,
+                "clone_url": hit.get("clone_url", ""),
+                "default_branch": hit.get("default_branch", "main"),
+                "private": hit.get("private", False),
+                "permissions": {"push": hit.get("push", True)},
+            }])
+            self.repo_combo.blockSignals(False)
+            idx = self.repo_combo.findText(full)
+        if idx == self.repo_combo.currentIndex():
+            self._on_repo_changed()
+        else:
+            self.repo_combo.setCurrentIndex(idx)
 
     def _on_account_changed(self):
         self._clone_url_map.clear()
         self.repo_combo.clear()
         self.branch_combo.clear()
         self._clear_all_files()
+        acc = self.account_combo.currentData()
+        if not acc:
+            return
+        # Cached repo list (shared with the Repositories page) shows at once; stale -> background refresh
+        cached = repo_cache.get(acc.get("id", ""))
+        if cached is None:
+            return
+        repos, fetched_at = cached
+        self._set_repos(repos)
+        if not repo_cache.is_fresh(fetched_at):
+            self._start_repos_worker(acc, PRIORITY_BACKGROUND)
 
     def _remove_selected_files(self):
-        for item in self.files_list.selectedItems():
-            self.files_list.takeItem(self.files_list.row(item))
-        self._update_preview()
+        rows = sorted({self.files_list.row(item) for item in self.files_list.selectedItems()}, reverse=True)
+        if not rows:
+            return
+        self.files_list.setUpdatesEnabled(False)
+        self.preview_table.setUpdatesEnabled(False)
+        for row in rows:
+            self.files_list.takeItem(row)
+            self.preview_table.removeRow(row)
+            self._preview_path_set.discard(self._preview_paths[row])
+            del self._preview_paths[row]
+            del self._preview_rows[row]
+        self.files_list.setUpdatesEnabled(True)
+        self.preview_table.setUpdatesEnabled(True)
+        # Freed names may shift later "(n)" suffixes; only changed cells are rewritten
+        self._preview_resolve_all()
 
     def _clear_all_files(self):
         self.files_list.clear()
-        self._update_preview()
+        self.preview_table.setRowCount(0)
+        self._preview_paths = []
+        self._preview_path_set = set()
+        self._preview_rows = []
+        self._preview_resolve_all()
 
     def _load_repos_for_commit(self):
         acc = self.account_combo.currentData()
         if not acc:
             return
-        token = get_token(acc.get("secretKey", ""))
-        if not token:
+        if not get_token(acc.get("secretKey", "")):
             QMessageBox.warning(self, "Commit", "No token for this account.")
             return
         self.add_files_btn.setEnabled(False)
         self.run_btn.setEnabled(False)
-        w = _LoadReposWorker(token)
-        w.result.connect(self._on_repos_loaded_commit)
+        self.repo_combo.clear()
+        self.branch_combo.clear()
+        self._clone_url_map.clear()
+        self._repos_error = ""
+        self._start_repos_worker(acc, PRIORITY_INTERACTIVE)
+
+    def _start_repos_worker(self, acc: dict, priority: str):
+        # Parented to the page: switching accounts again while one runs must not drop it
+        w = LoadReposWorker(acc, priority, self)
+        if priority == PRIORITY_INTERACTIVE:
+            w.page.connect(self._on_repos_page_commit)
+            w.failed.connect(self._on_repos_failed_commit)
+        w.result.connect(lambda account_id, repos, p=priority: self._on_repos_loaded_commit(account_id, repos, p))
         w.finished.connect(w.deleteLater)
         w.start()
-        self._load_repos_worker_ref = w
 
-    def _on_repos_loaded_commit(self, repos):
-        self.add_files_btn.setEnabled(True)
-        self.run_btn.setEnabled(True)
+    def _current_account_id(self) -> str:
+        acc = self.account_combo.currentData()
+        return acc.get("id", "") if acc else ""
+
+    def _add_repos(self, repos) -> None:
+        for r in repos:
+            full = r.get("full_name", "")
+            if full in self._clone_url_map:
+                continue  # already added (e.g. REST fallback after a partial GraphQL load)
+            self.repo_combo.addItem(full, r)
+            self._clone_url_map[full] = r.get("clone_url", "")
+            if not r.get("permissions", {}).get("push", True):
+                self.repo_combo.setItemData(self.repo_combo.count() - 1, "Không có quyền push", Qt.ItemDataRole.ToolTipRole)
+
+    def _set_repos(self, repos) -> None:
+        """Replace the repo list, keeping the selected repo (and its files) if it still exists."""
+        current = self.repo_combo.currentText()
+        self.repo_combo.blockSignals(True)
         self.repo_combo.clear()
         self._clone_url_map.clear()
+        self._add_repos(repos)
+        idx = self.repo_combo.findText(current) if current else -1
+        if idx >= 0:
+            self.repo_combo.setCurrentIndex(idx)
+        self.repo_combo.blockSignals(False)
+        if idx >= 0:
+            self._add_branches((self.repo_combo.currentData() or {}).get("branches", []))
+        elif self.repo_combo.count():
+            self._on_repo_changed()
+
+    def _on_repos_page_commit(self, account_id: str, repos):
+        """Add one page of repos to the combo as it arrives (selection is kept)."""
+        if account_id != self._current_account_id():
+            return
+        was_empty = self.repo_combo.count() == 0
+        self.repo_combo.blockSignals(True)
+        self._add_repos(repos)
+        self.repo_combo.blockSignals(False)
+        if was_empty and self.repo_combo.count():
+            self._on_repo_changed()
+
+    def _on_repos_failed_commit(self, account_id: str, error: str):
+        self._repos_error = error
+
+    def _on_repos_loaded_commit(self, account_id: str, repos, priority: str):
+        if priority == PRIORITY_INTERACTIVE:
+            self.add_files_btn.setEnabled(True)
+            self.run_btn.setEnabled(True)
+        if account_id != self._current_account_id():
+            return
         if repos is None:
-            QMessageBox.warning(self, "Commit", "Failed to load repositories.")
+            if priority == PRIORITY_INTERACTIVE:
+                error = f"\n({self._repos_error})" if self._repos_error else ""
+                QMessageBox.warning(self, "Commit", "Failed to load repositories." + error)
             return
-        if repos:
-            for r in repos:
-                full = r.get("full_name", "")
-                clone_url = r.get("clone_url", "")
-                self.repo_combo.addItem(full, r)
-                self._clone_url_map[full] = clone_url
-        self._on_repo_changed()
+        self._set_repos(repos)
 
     def _on_repo_changed(self):
         self.branch_combo.clear()
         self._clear_all_files()
+        self._preview_base = None
+        self._preview_source = ""
         repo = self.repo_combo.currentData()
         if repo:
             default = repo.get("default_branch", "main")
             self.branch_combo.addItem(default, default)
+            self._add_branches(repo.get("branches", []))
         acc = self.account_combo.currentData()
         if not acc:
             return
-        workspace = get_workspace_path(acc.get("id", ""), self.repo_combo.currentText() or "")
+        full = self.repo_combo.currentText() or ""
+        if repo and full:
+            # Cached list shows at once; stale or missing lists are refreshed in the background
+            cached = branch_cache.get_cached(acc.get("id", ""), full)
+            if cached:
+                self._add_branches(cached[0])
+            if "branches" not in repo and (not cached or not branch_cache.is_fresh(cached[1])):
+                priority = PRIORITY_BACKGROUND if cached else PRIORITY_INTERACTIVE
+                w = _LoadBranchesWorker(acc, full, repo.get("clone_url", ""), priority, self)
+                w.page.connect(self._on_branches_page)
+                w.result.connect(self._on_branches_page)
+                w.finished.connect(w.deleteLater)
+                w.start()
+        workspace = get_workspace_path(acc.get("id", ""), full)
         if os.path.isdir(workspace) and os.path.isdir(os.path.join(workspace, ".git")):
             from core.git_ops import get_branches
-            for b in get_branches(workspace):
-                if self.branch_combo.findText(b) < 0:
-                    self.branch_combo.addItem(b, b)
+            self._add_branches(get_branches(workspace))
+
+    def _add_branches(self, names):
+        for b in names or []:
+            if b and self.branch_combo.findText(b) < 0:
+                self.branch_combo.addItem(b, b)
+
+    def _on_branches_page(self, repo_full_name: str, names):
+        if repo_full_name == self.repo_combo.currentText():
+            self._add_branches(names)
 
     def _select_files(self):
         paths, _ = QFileDialog.getOpenFileNames(self, "Select files to upload", "", "All files (*)")
+        new_paths = []
         for p in paths:
-            if p and self.files_list.findItems(p, Qt.MatchFlag.MatchExactly) == []:
-                self.files_list.addItem(p)
-        self._update_preview()
+            if p and p not in self._preview_path_set:
+                self._preview_path_set.add(p)
+                new_paths.append(p)
+        if not new_paths:
+            return
+        self.files_list.addItems(new_paths)
+        self._preview_paths.extend(new_paths)
+        self._preview_append(new_paths)
 
-    def _update_preview(self):
-        from core.path_policy import UPLOADS_BASE
-        paths = [self.files_list.item(i).text() for i in range(self.files_list.count())]
-        uploads_dir = ""
-        existing = set()
-        self.preview_table.setRowCount(len(paths))
-        for row, src in enumerate(paths):
-            name = clean_filename(os.path.basename(src))
-            _, rel_path = resolve_upload_path(uploads_dir or "/", name, existing)
+    def _schedule_preview_base(self):
+        self._preview_base_timer.start()
+
+    def _load_preview_base(self):
+        """Fetch the names already in uploads/ for the selected repo/branch in the background."""
+        self._preview_generation += 1
+        acc = self.account_combo.currentData()
+        repo_name = self.repo_combo.currentText()
+        if not acc or not repo_name:
+            return
+        branch = self.branch_combo.currentData() or self.branch_combo.currentText() or ""
+        self._preview_source = ""
+        self._update_preview_summary()
+        w = _PreviewBaseWorker(self._preview_generation, acc, repo_name, branch, self)
+        w.result.connect(self._on_preview_base_loaded)
+        w.finished.connect(w.deleteLater)
+        w.start()
+
+    def _on_preview_base_loaded(self, generation: int, base, source: str):
+        if generation != self._preview_generation:
+            return  # repo/branch changed meanwhile
+        self._preview_base = base
+        self._preview_source = source if base is not None else "unavailable"
+        self._preview_resolve_all()
+
+    def _preview_resolve_one(self, index: UploadNameIndex, src: str, layout: str, when: datetime) -> tuple[str, str]:
+        name = clean_filename(os.path.basename(src))
+        sub = shard_dir(name, layout, when)
+        desired = f"{sub}/{name}" if sub else name
+        _, rel_path = index.resolve("", name, layout, when)
+        if rel_path == f"{UPLOADS_BASE}/{desired}":
+            status = "New"
+        elif self._preview_base is not None and desired in self._preview_base:
+            status = "Renamed (exists in repo)"
+        else:
+            status = "Renamed (duplicate in list)"
+        return rel_path, status
+
+    def _preview_append(self, new_paths: list[str]):
+        """Resolve only the newly added files on top of the current working index."""
+        layout = self.layout_combo.currentData() or LAYOUT_FLAT
+        when = datetime.utcnow()
+        start = self.preview_table.rowCount()
+        self.preview_table.setUpdatesEnabled(False)
+        self.preview_table.setRowCount(start + len(new_paths))
+        for offset, src in enumerate(new_paths):
+            row = self._preview_resolve_one(self._preview_index, src, layout, when)
+            self._preview_rows.append(row)
+            self._set_preview_row(start + offset, src, row)
+        self.preview_table.setUpdatesEnabled(True)
+        self._update_preview_summary()
+
+    def _preview_resolve_all(self):
+        """Re-resolve every file against the base; rewrite only rows whose result changed."""
+        layout = self.layout_combo.currentData() or LAYOUT_FLAT
+        when = datetime.utcnow()
+        base = self._preview_base
+        self._preview_index = base.copy() if base is not None else UploadNameIndex("")
+        self.preview_table.setUpdatesEnabled(False)
+        self.preview_table.setRowCount(len(self._preview_paths))
+        for i, src in enumerate(self._preview_paths):
+            row = self._preview_resolve_one(self._preview_index, src, layout, when)
+            if i >= len(self._preview_rows):
+                self._preview_rows.append(row)
+                self._set_preview_row(i, src, row)
+            elif self._preview_rows[i] != row:
+                self._preview_rows[i] = row
+                self._set_preview_row(i, None, row)
+        self.preview_table.setUpdatesEnabled(True)
+        self._update_preview_summary()
+
+    def _set_preview_row(self, row: int, src: str | None, resolved: tuple[str, str]):
+        """Fill one preview row; src None keeps the existing source cell."""
+        if src is not None:
             self.preview_table.setItem(row, 0, QTableWidgetItem(src))
-            self.preview_table.setItem(row, 1, QTableWidgetItem(rel_path))
+        self.preview_table.setItem(row, 1, QTableWidgetItem(resolved[0]))
+        self.preview_table.setItem(row, 2, QTableWidgetItem(resolved[1]))
+
+    def _update_preview_summary(self):
+        total = len(self._preview_rows)
+        in_repo = sum(1 for _, st in self._preview_rows if st == "Renamed (exists in repo)")
+        in_list = sum(1 for _, st in self._preview_rows if st == "Renamed (duplicate in list)")
+        source = {
+            "workspace": "workspace clone",
+            "remote": "remote tree",
+            "unavailable": "không đọc được tree, chỉ so trong danh sách",
+        }.get(self._preview_source, "đang tải tree...")
+        self.preview_summary.setText(
+            f"{total} file · {in_repo} trùng tên trong repo · {in_list} trùng trong danh sách · ({source})"
+        )
 
     def _run_commit_push(self):
         acc = self.account_combo.currentData()
@@ -345,7 +641,8 @@ class CommitPage(QWidget):
         self.progress.setVisible(True)
         self.progress.setMaximum(len(paths))
         self.progress.setValue(0)
-        self._worker = CommitWorker(acc, repo_name, branch, paths, clone_url, self)
+        layout = self.layout_combo.currentData() or LAYOUT_FLAT
+        self._worker = CommitWorker(acc, repo_name, branch, paths, clone_url, layout, self)
         self._worker.progress.connect(self._on_progress)
         self._worker.finished_signal.connect(self._on_worker_finished)
         self._worker.start()
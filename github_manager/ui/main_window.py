@@ -21,13 +21,17 @@ from PySide6.QtWidgets import (
     QPushButton,
     QMessageBox,
 )
-from PySide6.QtCore import Qt, QThread, Signal
-from PySide6.QtGui import QFont, QIcon, QAction
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QFileSystemWatcher
+from PySide6.QtGui import QFont, QIcon, QAction, QKeySequence
 
 from .accounts_page import AccountsPage
 from .repos_page import ReposPage
 from .commit_page import CommitPage
 from .runs_page import RunsPage
+from .metrics_dialog import MetricsDialog
+from .repo_search_dialog import RepoSearchDialog, RepoIndexRefreshWorker
+
+from core.account_store import get_account_store
 
 RELEASES_URL = "https://github.com/TroLyAmazon/GitHub-Manager/releases"
 
@@ -49,10 +53,12 @@ class CheckUpdateWorker(QThread):
 
     def run(self):
         try:
-            from core.github_api import get_latest_release
-            release = get_latest_release("TroLyAmazon", "GitHub-Manager")
+            from core.github_api import get_latest_release, last_error, PRIORITY_BACKGROUND
+            from core.metrics import error_text
+            release = get_latest_release("TroLyAmazon", "GitHub-Manager", priority=PRIORITY_BACKGROUND)
             if not release:
-                self.result.emit(False, "", "Không lấy được thông tin bản phát hành.")
+                reason = error_text(last_error())
+                self.result.emit(False, "", "Không lấy được thông tin bản phát hành." + (f" ({reason})" if reason else ""))
                 return
             tag = (release.get("tag_name") or "").strip()
             current = _parse_version(self.current_version)
@@ -95,6 +101,11 @@ class AboutDialog(QDialog):
 
 
 class MainWindow(QMainWindow):
+    # Changed account ids (None = reloaded from disk); emitted by the account store, possibly from a worker thread
+    accounts_changed = Signal(object)
+    # Error message when a change to accounts.json could not be saved (writer thread)
+    accounts_write_failed = Signal(str)
+
     def __init__(self):
         super().__init__()
         try:
@@ -133,6 +144,19 @@ class MainWindow(QMainWindow):
         self.sidebar.setCurrentRow(0)
         self.sidebar.currentRowChanged.connect(self._on_page_changed)
 
+        # Pages read accounts from memory and follow accounts_changed; the file is
+        # re-read only when it changes on disk (edited by hand / another instance)
+        store = get_account_store()
+        store.subscribe(self.accounts_changed.emit)
+        store.subscribe_errors(self.accounts_write_failed.emit)
+        self.accounts_write_failed.connect(self._on_accounts_write_failed)
+        self._accounts_watcher = QFileSystemWatcher(self)
+        self._accounts_watcher.fileChanged.connect(self._on_accounts_file_changed)
+        self._accounts_watcher.directoryChanged.connect(self._on_accounts_file_changed)
+        self._accounts_watcher.addPath(os.path.dirname(store.path()))
+        if os.path.isfile(store.path()):
+            self._accounts_watcher.addPath(store.path())
+
         # Stacked pages
         self.stack = QStackedWidget()
         self.accounts_page = AccountsPage(self)
@@ -148,8 +172,16 @@ class MainWindow(QMainWindow):
         layout.addWidget(self.sidebar)
         layout.addWidget(self.stack, 1)
 
-        # Menu: Help -> About, Check for updates
+        # Menu: Repositories -> Find (all accounts); Help -> About, Check for updates, API metrics
         menubar = self.menuBar()
+        repos_menu = menubar.addMenu("&Repositories")
+        find_action = QAction("&Find repository (all accounts)...", self)
+        find_action.setShortcut(QKeySequence("Ctrl+K"))
+        find_action.triggered.connect(self._find_repository)
+        repos_menu.addAction(find_action)
+        refresh_index_action = QAction("&Refresh search index", self)
+        refresh_index_action.triggered.connect(lambda: self._refresh_repo_index())
+        repos_menu.addAction(refresh_index_action)
         help_menu = menubar.addMenu("&Help")
         about_action = QAction("&About GitHub Manager", self)
         about_action.triggered.connect(self._show_about)
@@ -157,6 +189,17 @@ class MainWindow(QMainWindow):
         self.check_update_action = QAction("Check for &updates", self)
         self.check_update_action.triggered.connect(self._check_for_updates)
         help_menu.addAction(self.check_update_action)
+        metrics_action = QAction("API &metrics...", self)
+        metrics_action.triggered.connect(self._show_metrics)
+        help_menu.addAction(metrics_action)
+
+        # Cross-account repo index: stale accounts are refetched in the background
+        self._index_worker = None
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(15 * 60 * 1000)
+        self._index_timer.timeout.connect(self._refresh_repo_index)
+        self._index_timer.start()
+        QTimer.singleShot(5000, self._refresh_repo_index)
 
         # Style sidebar
         self.sidebar.setFrameShape(QFrame.Shape.NoFrame)
@@ -179,9 +222,38 @@ class MainWindow(QMainWindow):
             }
         """)
 
+    def _on_accounts_write_failed(self, message: str):
+        QMessageBox.warning(
+            self,
+            "Accounts",
+            f"Không lưu được accounts.json, thay đổi vừa rồi đã bị hủy.\n\n{message}",
+        )
+
     def _show_about(self):
         AboutDialog(self._version, self._github_url, self).exec()
 
+    def _refresh_repo_index(self):
+        if self._index_worker is not None:
+            return
+        self._index_worker = RepoIndexRefreshWorker(self.get_accounts(), self)
+        self._index_worker.finished.connect(self._on_index_refreshed)
+        self._index_worker.start()
+
+    def _on_index_refreshed(self):
+        self._index_worker.deleteLater()
+        self._index_worker = None
+
+    def _find_repository(self):
+        dlg = RepoSearchDialog(self.get_accounts(), self)
+        if dlg.exec() != QDialog.DialogCode.Accepted or not dlg.selected():
+            return
+        hit = dlg.selected()
+        self.sidebar.setCurrentRow(2)
+        self.commit_page.select_repo(hit["account_id"], hit)
+
+    def _show_metrics(self):
+        MetricsDialog(self).exec()
+
     def _check_for_updates(self):
         self.check_update_action.setEnabled(False)
         self._update_worker = CheckUpdateWorker(self._version, self)
@@ -205,16 +277,19 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.information(self, "Check for updates", message)
 
+    def _on_accounts_file_changed(self, _path: str):
+        store = get_account_store()
+        # Atomic replace swaps the inode: watch the new file again
+        if os.path.isfile(store.path()) and store.path() not in self._accounts_watcher.files():
+            self._accounts_watcher.addPath(store.path())
+        store.reload_if_changed()
+
     def _on_page_changed(self, row: int):
         if row >= 0:
             self.stack.setCurrentIndex(row)
-            if row == 1:
-                self.repos_page.refresh_accounts()
-            elif row == 2:
-                self.commit_page.refresh_accounts()
-            elif row == 3:
+            if row == 3:
                 self.runs_page.refresh_runs()
 
     def get_accounts(self):
-        """Return list of account dicts from accounts page / storage."""
+        """Return list of account dicts (in-memory account store)."""
         return self.accounts_page.get_accounts()
@@ -0,0 +1,122 @@
+"""
+API metrics viewer (Help -> API metrics): per-endpoint latency histograms from core.metrics.
+"""
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
+    QLabel,
+    QFileDialog,
+    QMessageBox,
+)
+from PySide6.QtCore import Qt, QTimer
+
+from core.metrics import get_metrics
+from core.http_client import get_client
+
+_COLUMNS = [
+    "Endpoint", "Calls", "Errors", "Avg ms", "p50", "p95", "Max",
+    "DNS avg", "Connect avg", "TLS avg", "Reused", "Cache hits", "Bytes", "Last error",
+]
+
+
+def _num_item(value, text: str | None = None) -> QTableWidgetItem:
+    item = QTableWidgetItem(text if text is not None else str(value))
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+class MetricsDialog(QDialog):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("API metrics")
+        self.resize(1100, 450)
+        layout = QVBoxLayout(self)
+
+        self.summary = QLabel("")
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+
+        row = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self._refresh)
+        row.addWidget(refresh_btn)
+        export_btn = QPushButton("Export JSON...")
+        export_btn.clicked.connect(self._export)
+        row.addWidget(export_btn)
+        reset_btn = QPushButton("Reset")
+        reset_btn.clicked.connect(self._reset)
+        row.addWidget(reset_btn)
+        row.addStretch()
+        close_btn = QPushButton("Đóng")
+        close_btn.clicked.connect(self.accept)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(2000)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start()
+        self._refresh()
+
+    def _refresh(self):
+        snap = get_metrics().snapshot()
+        endpoints = snap["endpoints"]
+        self.table.setRowCount(len(endpoints))
+        for r, (name, st) in enumerate(endpoints.items()):
+            total = st["total"]
+            err = st["last_error"]
+            items = [
+                QTableWidgetItem(name),
+                _num_item(st["count"]),
+                _num_item(st["errors"]),
+                _num_item(total["mean_ms"], f"{total['mean_ms']:.1f}"),
+                _num_item(total["p50_ms"], f"≤{total['p50_ms']:g}"),
+                _num_item(total["p95_ms"], f"≤{total['p95_ms']:g}"),
+                _num_item(total["max_ms"], f"{total['max_ms']:.0f}"),
+                _num_item(st["dns"]["mean_ms"], f"{st['dns']['mean_ms']:.1f}"),
+                _num_item(st["connect"]["mean_ms"], f"{st['connect']['mean_ms']:.1f}"),
+                _num_item(st["tls"]["mean_ms"], f"{st['tls']['mean_ms']:.1f}"),
+                _num_item(st["reused_connections"], f"{st['reused_connections']}/{st['count']}"),
+                _num_item(st["cache_hits"]),
+                _num_item(st["bytes"]),
+                QTableWidgetItem(f"{err['status']} {err['reason']}" if err else ""),
+            ]
+            for c, item in enumerate(items):
+                self.table.setItem(r, c, item)
+        calls = sum(st["count"] for st in endpoints.values())
+        errors = sum(st["errors"] for st in endpoints.values())
+        pool = get_client().stats()
+        self.summary.setText(
+            f"{calls} requests, {errors} errors — "
+            f"{pool['connections_opened']} connections opened, {pool['connections_reused']} reused, "
+            f"cache {pool['cache_hits']} hits / {pool['cache_misses']} misses"
+        )
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export metrics", "api_metrics.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            get_metrics().export_json(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Export", f"Không ghi được file: {e}")
+
+    def _reset(self):
+        get_metrics().reset()
+        self._refresh()
@@ -0,0 +1,111 @@
+"""
+Find a repository across all accounts (core.repo_index) and jump to it in Commit & Push.
+"""
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QLineEdit,
+    QListWidget,
+    QListWidgetItem,
+    QLabel,
+)
+from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtGui import QColor
+
+from core.secrets import get_token
+from core.settings import get_setting
+from core.rate_limit import PRIORITY_BACKGROUND
+from core.repo_index import get_index
+from core import repo_cache
+
+
+class RepoIndexRefreshWorker(QThread):
+    """Bring every account into the index: from the repo cache if present, refetch when stale."""
+    account_done = Signal(str)  # account id whose entries changed
+
+    def __init__(self, accounts: list, parent=None):
+        super().__init__(parent)
+        self.accounts = accounts
+
+    def run(self):
+        index = get_index()
+        max_age = float(get_setting("repoIndexRefreshSeconds"))
+        for acc in self.accounts:
+            account_id = acc.get("id", "")
+            if not account_id:
+                continue
+            if index.fetched_at(account_id) is None:
+                cached = repo_cache.get(account_id)
+                if cached:
+                    index.update_account(account_id, cached[0], cached[1])
+                    self.account_done.emit(account_id)
+            fetched_at = index.fetched_at(account_id)
+            if fetched_at is not None and time.time() - fetched_at < max_age:
+                continue
+            token = get_token(acc.get("secretKey", ""))
+            if not token:
+                continue
+            if repo_cache.refresh(account_id, token, priority=PRIORITY_BACKGROUND) is not None:
+                self.account_done.emit(account_id)
+
+
+class RepoSearchDialog(QDialog):
+    """Type to search; Enter / double-click picks the repo (see selected())."""
+
+    def __init__(self, accounts: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Find repository")
+        self.resize(620, 420)
+        self._labels = {
+            a.get("id", ""): f"{a.get('label', '?')} ({a.get('login', '')})" for a in accounts
+        }
+        self._selected = None
+        layout = QVBoxLayout(self)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("owner/repo, tên repo hoặc một phần tên...")
+        self.query_edit.textChanged.connect(self._search)
+        self.query_edit.returnPressed.connect(self._accept_current)
+        layout.addWidget(self.query_edit)
+        self.results = QListWidget()
+        self.results.itemActivated.connect(lambda _item: self._accept_current())
+        layout.addWidget(self.results)
+        self.status = QLabel("")
+        layout.addWidget(self.status)
+        self._search("")
+
+    def _search(self, text: str):
+        index = get_index()
+        t0 = time.perf_counter()
+        hits = [h for h in index.search(text) if h["account_id"] in self._labels]
+        ms = (time.perf_counter() - t0) * 1000
+        self.results.clear()
+        for h in hits:
+            label = self._labels[h["account_id"]]
+            item = QListWidgetItem(f"{h['full_name']}    —  {label}")
+            item.setData(Qt.ItemDataRole.UserRole, h)
+            if not h["push"]:
+                item.setForeground(QColor("#888888"))
+                item.setToolTip("Không có quyền push")
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        if text.strip():
+            self.status.setText(f"{len(hits)} kết quả ({ms:.1f} ms, {index.size()} repo trong chỉ mục)")
+        else:
+            self.status.setText(f"{index.size()} repo trong chỉ mục")
+
+    def _accept_current(self):
+        item = self.results.currentItem()
+        if item is None:
+            return
+        self._selected = item.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+
+    def selected(self) -> dict | None:
+        """Chosen search hit: {"account_id", "full_name", "push", "clone_url", "default_branch", ...}."""
+        return self._selected
@@ -1,5 +1,9 @@
 """
 Repositories page: select account, load repos (full name, private/public, default branch).
+Repos come from core.repo_cache: cached list at once, refreshed in the background when stale.
+The table is a model/view (ReposTableModel) that grows page by page as repos arrive; size,
+last push, open PRs and workspace status (core.repo_details) are fetched only for the visible
+rows, once scrolling pauses, and cached.
 """
 import os
 import sys
@@ -11,27 +15,199 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QComboBox,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
+    QAbstractItemView,
     QLabel,
 )
-from PySide6.QtCore import Qt, QThread, Signal
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QAbstractTableModel, QModelIndex
 
 from core.secrets import get_token
-from core.github_api import get_repos
+from core.rate_limit import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from core import repo_cache, repo_details
+from core.metrics import last_error, error_text
 
 
 class LoadReposWorker(QThread):
-    result = Signal(object)  # list of repo dicts or None
+    """Refresh one account's repo list through core.repo_cache (shared with the Commit page)."""
+    page = Signal(str, object)  # account id, list of repo dicts (one page as it arrives)
+    result = Signal(str, object)  # account id, list of repo dicts or None
+    failed = Signal(str, str)  # account id, error (status + reason), emitted before result None
 
-    def __init__(self, token: str, parent=None):
+    def __init__(self, account: dict, priority: str = PRIORITY_INTERACTIVE, parent=None):
         super().__init__(parent)
-        self.token = token
+        self.account = account
+        self.priority = priority
 
     def run(self):
-        repos = get_repos(self.token) if self.token else None
-        self.result.emit(repos)
+        account_id = self.account.get("id", "")
+        token = get_token(self.account.get("secretKey", ""))
+        if not token:
+            self.failed.emit(account_id, "No token")
+            self.result.emit(account_id, None)
+            return
+        repos = repo_cache.refresh(
+            account_id,
+            token,
+            on_page=lambda repos: self.page.emit(account_id, repos),
+            priority=self.priority,
+        )
+        if repos is None:
+            self.failed.emit(account_id, error_text(last_error()))
+        self.result.emit(account_id, repos)
+
+
+class RepoDetailsWorker(QThread):
+    """Fetch details (core.repo_details) for a few repos of one account."""
+    result = Signal(str, object)  # account id, {full_name: details}
+
+    def __init__(self, account: dict, full_names: list[str], parent=None):
+        super().__init__(parent)
+        self.account = account
+        self.full_names = full_names
+
+    def run(self):
+        account_id = self.account.get("id", "")
+        token = get_token(self.account.get("secretKey", ""))
+        self.result.emit(account_id, repo_details.fetch(account_id, token, self.full_names))
+
+
+def _format_size(kb: int) -> str:
+    if kb >= 1024 * 1024:
+        return f"{kb / (1024 * 1024):.1f} GB"
+    if kb >= 1024:
+        return f"{kb / 1024:.1f} MB"
+    return f"{kb} KB"
+
+
+_COLUMNS = ["Full name", "Visibility", "Default branch", "Size", "Last push", "Open PRs", "Workspace"]
+
+
+class ReposTableModel(QAbstractTableModel):
+    """Compact rows (full_name, visibility, default branch); detail columns read core.repo_details."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.account_id = ""
+        self._rows: list[tuple[str, str, str]] = []
+        self._row_of: dict[str, int] = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(_COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return _COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        col = index.column()
+        if role == Qt.ItemDataRole.TextAlignmentRole and col in (3, 5):
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        row = self._rows[index.row()]
+        if col < 3:
+            return row[col]
+        details = repo_details.get(self.account_id, row[0])
+        if details is None:
+            return "…"
+        if col == 3:
+            return _format_size(details["size_kb"])
+        if col == 4:
+            return details["pushed_at"].replace("T", " ")[:16]
+        if col == 5:
+            return str(details["open_prs"])
+        return details["workspace"]
+
+    def set_repos(self, account_id: str, repos: list[dict]) -> None:
+        self.beginResetModel()
+        self.account_id = account_id
+        self._rows = []
+        self._row_of = {}
+        self.endResetModel()
+        self.append_repos(repos)
+
+    @staticmethod
+    def _row(r: dict) -> tuple[str, str, str]:
+        return (r.get("full_name", ""), "Private" if r.get("private") else "Public", r.get("default_branch", "main"))
+
+    def append_repos(self, repos: list[dict]) -> None:
+        rows = [self._row(r) for r in repos if r.get("full_name") and r.get("full_name") not in self._row_of]
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        for i, row in enumerate(rows, start=start):
+            self._row_of[row[0]] = i
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def update_repos(self, account_id: str, repos: list[dict]) -> None:
+        """
+        Apply a refreshed list as a diff: gone rows removed, new rows inserted where they belong,
+        changed rows updated in place, so the view keeps its scroll position and selection.
+        """
+        if account_id != self.account_id:
+            self.set_repos(account_id, repos)
+            return
+        new, seen = [], set()
+        for r in repos:
+            full = r.get("full_name")
+            if full and full not in seen:
+                seen.add(full)
+                new.append(self._row(r))
+        # 1. Removals, bottom-up, one call per contiguous run
+        i = len(self._rows) - 1
+        while i >= 0:
+            if self._rows[i][0] in seen:
+                i -= 1
+                continue
+            end = i
+            while i >= 0 and self._rows[i][0] not in seen:
+                i -= 1
+            self.beginRemoveRows(QModelIndex(), i + 1, end)
+            del self._rows[i + 1:end + 1]
+            self.endRemoveRows()
+        present = {row[0] for row in self._rows}
+        if [row[0] for row in new if row[0] in present] != [row[0] for row in self._rows]:
+            # Order changed (e.g. REST fallback sorted differently): rebuild
+            self.set_repos(account_id, repos)
+            return
+        # 2. Insertions (runs of new names) and in-place changes, in the new order
+        j = 0
+        while j < len(new):
+            if new[j][0] in present:
+                if self._rows[j] != new[j]:
+                    self._rows[j] = new[j]
+                    self.dataChanged.emit(self.index(j, 0), self.index(j, 2))
+                j += 1
+                continue
+            k = j
+            while k < len(new) and new[k][0] not in present:
+                k += 1
+            self.beginInsertRows(QModelIndex(), j, k - 1)
+            self._rows[j:j] = new[j:k]
+            self.endInsertRows()
+            j = k
+        self._row_of = {row[0]: i for i, row in enumerate(self._rows)}
+
+    def full_name(self, row: int) -> str:
+        return self._rows[row][0]
+
+    def row_of(self, full_name: str) -> int | None:
+        return self._row_of.get(full_name)
+
+    def details_changed(self, full_names) -> None:
+        for full in full_names:
+            row = self._row_of.get(full)
+            if row is not None:
+                self.dataChanged.emit(self.index(row, 3), self.index(row, len(_COLUMNS) - 1))
 
 
 class ReposPage(QWidget):
@@ -44,57 +220,183 @@ class ReposPage(QWidget):
         row.addWidget(QLabel("Account:"))
         self.account_combo = QComboBox()
         self.account_combo.setMinimumWidth(220)
+        self.account_combo.currentIndexChanged.connect(self._on_account_changed)
         row.addWidget(self.account_combo)
         self.load_btn = QPushButton("Load Repositories")
-        self.load_btn.clicked.connect(self._load_repos)
+        self.load_btn.clicked.connect(lambda: self._load_repos())
         row.addWidget(self.load_btn)
+        self.status_label = QLabel("")
+        row.addWidget(self.status_label)
         row.addStretch()
         layout.addLayout(row)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Full name", "Visibility", "Default branch", ""])
+        self.model = ReposTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         layout.addWidget(self.table)
 
+        # Details of visible rows: requested once scrolling / loading pauses for 250 ms
+        self._details_worker = None
+        self._details_timer = QTimer(self)
+        self._details_timer.setSingleShot(True)
+        self._details_timer.setInterval(250)
+        self._details_timer.timeout.connect(self._fetch_visible_details)
+        self.table.verticalScrollBar().valueChanged.connect(self._details_timer.start)
+        self.model.rowsInserted.connect(self._details_timer.start)
+        self.model.modelReset.connect(self._details_timer.start)
+
+        self._repos_worker = None
+        self._last_error = ""
+        # Account whose refresh is running; pages / results of other accounts are ignored
+        self._loading_account = ""
         self.refresh_accounts()
+        main_window.accounts_changed.connect(self.refresh_accounts)
 
-    def refresh_accounts(self):
+    def refresh_accounts(self, _changed_ids=None):
+        """Rebuild the account list from the store, keeping the selected account (no reload if unchanged)."""
+        current = (self.account_combo.currentData() or {}).get("id")
+        self.account_combo.blockSignals(True)
         self.account_combo.clear()
-        for acc in self.main_window.get_accounts():
+        index = 0
+        for i, acc in enumerate(self.main_window.get_accounts()):
             self.account_combo.addItem(
                 f"{acc.get('label', '?')} ({acc.get('login', '')})",
                 acc,
             )
+            if acc.get("id") == current:
+                index = i
+        self.account_combo.setCurrentIndex(index if self.account_combo.count() else -1)
+        self.account_combo.blockSignals(False)
+        if (self.account_combo.currentData() or {}).get("id") != current:
+            self._on_account_changed()
 
-    def _load_repos(self):
-        idx = self.account_combo.currentIndex()
-        if idx < 0:
-            return
+    def _on_account_changed(self):
+        """Show the cached list at once; refresh in the background if it is stale."""
         acc = self.account_combo.currentData()
+        self.model.set_repos(self._current_account_id(), [])
+        self.status_label.setText("")
         if not acc:
             return
-        token = get_token(acc.get("secretKey", ""))
-        if not token:
-            self.table.setRowCount(0)
+        cached = repo_cache.get(acc.get("id", ""))
+        if cached is None:
+            return
+        repos, fetched_at = cached
+        self._show_repos(repos)
+        self.status_label.setText(f"{len(repos)} repos (cached)")
+        if not repo_cache.is_fresh(fetched_at):
+            self._load_repos(PRIORITY_BACKGROUND)
+
+    def _load_repos(self, priority: str = PRIORITY_INTERACTIVE):
+        acc = self.account_combo.currentData()
+        if not acc:
             return
+        account_id = acc.get("id", "")
+        if self._repos_worker is not None and self._loading_account == account_id:
+            return  # already refreshing this account
+        if priority == PRIORITY_INTERACTIVE:
+            # Explicit load: list is rebuilt as pages arrive
+            self.model.set_repos(account_id, [])
+            self.status_label.setText("")
+        else:
+            self.status_label.setText(f"{self.model.rowCount()} repos (cached, refreshing...)")
         self.load_btn.setEnabled(False)
         self.load_btn.setText("Loading...")
-        self._repos_worker = LoadReposWorker(token, self)
-        self._repos_worker.result.connect(self._on_repos_loaded)
-        self._repos_worker.finished.connect(lambda: self._repos_worker.deleteLater())
-        self._repos_worker.start()
-
-    def _on_repos_loaded(self, repos):
-        self.load_btn.setEnabled(True)
-        self.load_btn.setText("Load Repositories")
-        self.table.setRowCount(0)
-        if repos:
-            for r in repos:
-                row = self.table.rowCount()
-                self.table.insertRow(row)
-                full = r.get("full_name", "")
-                self.table.setItem(row, 0, QTableWidgetItem(full))
-                vis = "Private" if r.get("private") else "Public"
-                self.table.setItem(row, 1, QTableWidgetItem(vis))
-                self.table.setItem(row, 2, QTableWidgetItem(r.get("default_branch", "main")))
-                self.table.setItem(row, 3, QTableWidgetItem(""))
+        self._last_error = ""
+        self._loading_account = account_id
+        w = LoadReposWorker(acc, priority, self)
+        if priority == PRIORITY_INTERACTIVE:
+            w.page.connect(self._on_repos_page)
+        w.failed.connect(self._on_repos_failed)
+        w.result.connect(self._on_repos_loaded)
+        w.finished.connect(w.deleteLater)
+        self._repos_worker = w
+        w.start()
+
+    def _current_account_id(self) -> str:
+        acc = self.account_combo.currentData()
+        return acc.get("id", "") if acc else ""
+
+    def _show_repos(self, repos):
+        self.model.set_repos(self._current_account_id(), repos)
+
+    def _on_repos_page(self, account_id: str, repos):
+        """Append one page of repos as soon as it arrives."""
+        if account_id != self._current_account_id():
+            return
+        self.model.append_repos(repos)
+        self.status_label.setText(f"{self.model.rowCount()} repos...")
+
+    def _on_repos_failed(self, account_id: str, error: str):
+        self._last_error = error
+
+    def _on_repos_loaded(self, account_id: str, repos):
+        if account_id == self._loading_account:
+            self._repos_worker = None
+            self._loading_account = ""
+            self.load_btn.setEnabled(True)
+            self.load_btn.setText("Load Repositories")
+        if account_id != self._current_account_id():
+            return
+        if repos is None:
+            reason = f": {self._last_error}" if self._last_error else ""
+            self.status_label.setText(f"{self.model.rowCount()} repos (tải không đủ{reason}, thử lại)")
+        else:
+            # A diff, not a reset: background refreshes keep selection and fetched details;
+            # the repo at the top of the view stays there when rows are added / removed above it
+            top = self.table.rowAt(0)
+            anchor = self.model.full_name(top) if top >= 0 else ""
+            self.model.update_repos(account_id, repos)
+            row = self.model.row_of(anchor) if anchor else None
+            if row is not None:
+                # Lay out the new rows first, or the scroll range is still the old one
+                self.table.doItemsLayout()
+                self.table.scrollTo(self.model.index(row, 0), QAbstractItemView.ScrollHint.PositionAtTop)
+            self.status_label.setText(f"{self.model.rowCount()} repos")
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._details_timer.start()
+
+    def _visible_rows(self) -> range:
+        count = self.model.rowCount()
+        if not count:
+            return range(0)
+        first = self.table.rowAt(0)
+        last = self.table.rowAt(self.table.viewport().height() - 1)
+        first = first if first >= 0 else 0
+        last = last if last >= 0 else count - 1
+        return range(first, last + 1)
+
+    def _fetch_visible_details(self):
+        """Request details for the visible rows that are not cached (one worker at a time)."""
+        if self._details_worker is not None or not self.isVisible():
+            return
+        acc = self.account_combo.currentData()
+        if not acc:
+            return
+        names = [self.model.full_name(r) for r in self._visible_rows()]
+        todo = repo_details.missing(acc.get("id", ""), names)
+        if not todo:
+            return
+        self._details_worker = RepoDetailsWorker(acc, todo, self)
+        self._details_worker.result.connect(self._on_details_loaded)
+        self._details_worker.finished.connect(self._on_details_finished)
+        self._details_worker.start()
+
+    def _on_details_loaded(self, account_id: str, details: dict):
+        if account_id == self.model.account_id:
+            self.model.details_changed(details.keys())
+
+    def _on_details_finished(self):
+        self._details_worker.deleteLater()
+        self._details_worker = None
+        # Rows scrolled into view while fetching
+        self._details_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._details_timer.start()
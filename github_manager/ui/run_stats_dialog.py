@@ -0,0 +1,138 @@
+"""
+Run statistics (Runs / Logs -> Statistics): success rate, median / p95 upload time and bytes
+pushed per day, account or repo, from the incrementally maintained core.run_stats tables.
+"""
+import json
+import os
+import sys
+from datetime import datetime
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+    QAbstractItemView,
+    QLabel,
+    QComboBox,
+    QFileDialog,
+    QMessageBox,
+)
+from PySide6.QtCore import Qt
+
+from core import run_store
+
+_COLUMNS = ["", "Runs", "Success", "Failed", "Success rate", "Median", "p95", "Bytes pushed"]
+
+
+def _num_item(text: str) -> QTableWidgetItem:
+    item = QTableWidgetItem(text)
+    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+    return item
+
+
+def _seconds(ms: int) -> str:
+    return f"{ms / 1000:.1f} s" if ms else ""
+
+
+def _size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return str(n)
+
+
+class RunStatsDialog(QDialog):
+    def __init__(self, accounts: list, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Run statistics")
+        self.resize(900, 480)
+        self._labels = {a.get("id", ""): f"{a.get('label', '?')} ({a.get('login', '')})" for a in accounts}
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Group by:"))
+        self.group_combo = QComboBox()
+        self.group_combo.addItem("Repo", "repo")
+        self.group_combo.addItem("Account", "account")
+        self.group_combo.addItem("Day", "day")
+        self.group_combo.currentIndexChanged.connect(self._refresh)
+        top.addWidget(self.group_combo)
+        top.addStretch()
+        layout.addLayout(top)
+
+        self.summary = QLabel("")
+        layout.addWidget(self.summary)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        layout.addWidget(self.table)
+
+        row = QHBoxLayout()
+        refresh_btn = QPushButton("Refresh")
+        refresh_btn.clicked.connect(self._refresh)
+        row.addWidget(refresh_btn)
+        export_btn = QPushButton("Export JSON...")
+        export_btn.clicked.connect(self._export)
+        row.addWidget(export_btn)
+        row.addStretch()
+        close_btn = QPushButton("Đóng")
+        close_btn.clicked.connect(self.accept)
+        row.addWidget(close_btn)
+        layout.addLayout(row)
+        self._refresh()
+
+    def _key_text(self, by: str, key: str) -> str:
+        if by == "account":
+            return self._labels.get(key, key or "?")
+        return key or "?"
+
+    def _refresh(self):
+        by = self.group_combo.currentData()
+        data = run_store.stats(by)
+        headers = list(_COLUMNS)
+        headers[0] = self.group_combo.currentText()
+        self.table.setHorizontalHeaderLabels(headers)
+        groups = data["groups"]
+        self.table.setRowCount(len(groups))
+        for r, g in enumerate(groups):
+            items = [
+                QTableWidgetItem(self._key_text(by, g["key"])),
+                _num_item(str(g["runs"])),
+                _num_item(str(g["success"])),
+                _num_item(str(g["failed"])),
+                _num_item(f"{g['success_rate'] * 100:.1f} %"),
+                _num_item(_seconds(g["median_ms"])),
+                _num_item(_seconds(g["p95_ms"])),
+                _num_item(_size(g["bytes"])),
+            ]
+            for c, item in enumerate(items):
+                self.table.setItem(r, c, item)
+        t = data["total"]
+        self.summary.setText(
+            f"{t['runs']} runs, {t['success_rate'] * 100:.1f} % success — "
+            f"median {_seconds(t['median_ms']) or '-'}, p95 {_seconds(t['p95_ms']) or '-'}, "
+            f"{_size(t['bytes'])} pushed (gồm cả runs đã bị xóa theo retention)"
+        )
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export run statistics", "run_stats.json", "JSON (*.json)")
+        if not path:
+            return
+        out = {"generatedAt": datetime.utcnow().isoformat() + "Z"}
+        for by in ("repo", "account", "day"):
+            data = run_store.stats(by)
+            out["total"] = data["total"]
+            out[f"by_{by}"] = data["groups"]
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(out, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            QMessageBox.warning(self, "Export", f"Không ghi được file: {e}")
@@ -1,6 +1,11 @@
 """
-Runs / Logs page: list run entries from runs.json, read-only, Delete / Delete All.
+Runs / Logs page: run history from core.run_store (SQLite) in a model/view table.
+RunsTableModel fetches pages lazily as the view scrolls and keeps one compact tuple per row;
+filters, sorting and deletions are store queries. Read-only, Delete / Delete All.
+Double-click a row to view its log (core.log_store). Retention (core.run_retention)
+runs in the background shortly after start and then every hour.
 """
+import logging
 import os
 import sys
 from datetime import datetime
@@ -8,19 +13,26 @@ from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QHeaderView,
     QAbstractItemView,
     QPushButton,
     QLabel,
+    QComboBox,
     QMessageBox,
+    QDialog,
+    QPlainTextEdit,
 )
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QThread, Signal, QTimer, QAbstractTableModel, QModelIndex
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.store_json import read_json, write_json, get_logs_dir
+from core import run_store, log_store, run_retention
+
+from .run_stats_dialog import RunStatsDialog
+
+# Rows fetched from the store each time the view scrolls near the end
+PAGE_SIZE = 500
 
 
 def _format_time(iso_str: str) -> str:
@@ -33,6 +45,154 @@ def _format_time(iso_str: str) -> str:
         return iso_str
 
 
+class RunCompactionWorker(QThread):
+    """Apply run history retention off the UI thread."""
+    result = Signal(object)  # run_retention.compact() summary
+
+    def run(self):
+        try:
+            self.result.emit(run_retention.compact())
+        except Exception as e:
+            logging.getLogger(__name__).exception("Run history compaction failed")
+            self.result.emit({"archived": 0, "error": str(e)})
+
+
+def _log_location(run: dict) -> str:
+    parsed = log_store.parse_ref(run.get("logRef", ""))
+    if parsed:
+        return f"segment {parsed[0]} @ {parsed[1]}"
+    return run.get("logPath", "")
+
+
+# header, run key used for store-side sorting
+_COLUMNS = [
+    ("Time", "startTime"),
+    ("Repo", "repoFullName"),
+    ("Branch", "branch"),
+    ("File", "fileName"),
+    ("Status", "status"),
+    ("Commit SHA", "commitSha"),
+    ("Log", "logRef"),
+]
+# Row tuple layout: display values first, then id / logRef / logPath
+_ID, _LOG_REF, _LOG_PATH = 7, 8, 9
+
+
+def _compact(r: dict) -> tuple:
+    sha = r.get("commitSha") or ""
+    return (
+        _format_time(r.get("startTime", "")),
+        r.get("repoFullName", ""),
+        r.get("branch", ""),
+        r.get("fileName", ""),
+        r.get("status", ""),
+        sha[:8],
+        _log_location(r),
+        r["id"],
+        r.get("logRef", ""),
+        r.get("logPath", ""),
+    )
+
+
+class RunsTableModel(QAbstractTableModel):
+    """Runs for the current filters / sort, fetched PAGE_SIZE rows at a time (canFetchMore / fetchMore)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[tuple] = []
+        self._total = 0
+        self._filters: dict = {}
+        self._order_by = "startTime"
+        self._descending = True
+        self._loaded = False
+        # Last run fetched: the next page continues after its sort key
+        self._last: dict | None = None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(_COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._rows[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return _COLUMNS[section][0]
+        return None
+
+    def total(self) -> int:
+        return self._total
+
+    def reload(self, filters: dict | None = None) -> None:
+        """Drop loaded rows and fetch the first page (filters kept if None)."""
+        self.beginResetModel()
+        if filters is not None:
+            self._filters = filters
+        self._rows = []
+        self._last = None
+        self._total = run_store.count_runs(**self._filters)
+        self._loaded = True
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        order_by = _COLUMNS[column][1]
+        descending = order == Qt.SortOrder.DescendingOrder
+        # setSortingEnabled() re-applies the current order: nothing to reload then
+        if self._loaded and (order_by, descending) == (self._order_by, self._descending):
+            return
+        self._order_by = order_by
+        self._descending = descending
+        self.reload()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self._rows) < self._total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        runs = run_store.query_runs(
+            limit=PAGE_SIZE,
+            newest_first=self._descending,
+            order_by=self._order_by,
+            after=self._last,
+            **self._filters,
+        )
+        if not runs:
+            self._total = len(self._rows)
+            return
+        self._last = runs[-1]
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(runs) - 1)
+        self._rows.extend(_compact(r) for r in runs)
+        self.endInsertRows()
+
+    def run_id(self, row: int) -> int:
+        return self._rows[row][_ID]
+
+    def log_source(self, row: int) -> dict:
+        r = self._rows[row]
+        return {"logRef": r[_LOG_REF], "logPath": r[_LOG_PATH]}
+
+
+class LogViewDialog(QDialog):
+    def __init__(self, title: str, text: str, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self.resize(640, 360)
+        layout = QVBoxLayout(self)
+        view = QPlainTextEdit(text)
+        view.setReadOnly(True)
+        layout.addWidget(view)
+        close_btn = QPushButton("Đóng")
+        close_btn.clicked.connect(self.accept)
+        layout.addWidget(close_btn)
+
+
 class RunsPage(QWidget):
     def __init__(self, main_window):
         super().__init__()
@@ -40,10 +200,25 @@ class RunsPage(QWidget):
         layout = QVBoxLayout(self)
 
         row = QHBoxLayout()
-        row.addWidget(QLabel("Run history (runs.json)"))
+        row.addWidget(QLabel("Run history"))
+        row.addWidget(QLabel("Repo:"))
+        self.repo_filter = QComboBox()
+        self.repo_filter.setMinimumWidth(200)
+        self.repo_filter.currentIndexChanged.connect(self._reload)
+        row.addWidget(self.repo_filter)
+        row.addWidget(QLabel("Status:"))
+        self.status_filter = QComboBox()
+        self.status_filter.addItem("All", "")
+        self.status_filter.addItem("Success", "Success")
+        self.status_filter.addItem("Failed", "Failed")
+        self.status_filter.currentIndexChanged.connect(self._reload)
+        row.addWidget(self.status_filter)
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self.refresh_runs)
         row.addWidget(refresh_btn)
+        stats_btn = QPushButton("Statistics...")
+        stats_btn.clicked.connect(lambda: RunStatsDialog(self.main_window.get_accounts(), self).exec())
+        row.addWidget(stats_btn)
         delete_btn = QPushButton("Delete")
         delete_btn.clicked.connect(self._delete_selected)
         row.addWidget(delete_btn)
@@ -53,59 +228,105 @@ class RunsPage(QWidget):
         row.addStretch()
         layout.addLayout(row)
 
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels([
-            "Time", "Repo", "Branch", "File", "Status", "Commit SHA", "Log"
-        ])
+        self.model = RunsTableModel(self)
+        self.model.rowsInserted.connect(self._update_count)
+        self.model.modelReset.connect(self._update_count)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setDefaultSectionSize(22)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.doubleClicked.connect(lambda index: self._show_log(index.row()))
         layout.addWidget(self.table)
 
+        bottom = QHBoxLayout()
+        self.count_label = QLabel("")
+        bottom.addWidget(self.count_label)
+        bottom.addStretch()
+        self.compaction_label = QLabel("")
+        self.compaction_label.setStyleSheet("color: #c62828;")
+        bottom.addWidget(self.compaction_label)
+        layout.addLayout(bottom)
+
+        self._columns_sized = False
         self.refresh_runs()
+        # Header clicks sort in the store (RunsTableModel.sort); the indicator matches the
+        # order already loaded (newest first), so enabling sorting does not reload
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
+
+        self._compaction_worker = None
+        self._compaction_timer = QTimer(self)
+        self._compaction_timer.setInterval(60 * 60 * 1000)
+        self._compaction_timer.timeout.connect(self._start_compaction)
+        self._compaction_timer.start()
+        QTimer.singleShot(30 * 1000, self._start_compaction)
+
+    def _start_compaction(self):
+        if self._compaction_worker is not None:
+            return
+        self._compaction_worker = RunCompactionWorker(self)
+        self._compaction_worker.result.connect(self._on_compaction_done)
+        self._compaction_worker.finished.connect(self._on_compaction_finished)
+        self._compaction_worker.start()
+
+    def _on_compaction_done(self, summary: dict):
+        error = summary.get("error")
+        # Cleared again by the next successful pass
+        self.compaction_label.setText(f"Dọn lịch sử run thất bại: {error}" if error else "")
+        self.compaction_label.setToolTip(error or "")
+        if summary.get("archived"):
+            self.refresh_runs()
+
+    def _on_compaction_finished(self):
+        self._compaction_worker.deleteLater()
+        self._compaction_worker = None
+
+    def _filters(self) -> dict:
+        return {
+            "repo": self.repo_filter.currentData() or None,
+            "status": self.status_filter.currentData() or None,
+        }
 
     def refresh_runs(self):
-        runs = read_json("runs.json")
-        if not isinstance(runs, list):
-            runs = []
-        self.table.setRowCount(len(runs))
-        for row, r in enumerate(reversed(runs)):
-            time_str = _format_time(r.get("startTime", ""))
-            self.table.setItem(row, 0, QTableWidgetItem(time_str))
-            self.table.setItem(row, 1, QTableWidgetItem(r.get("repoFullName", "")))
-            self.table.setItem(row, 2, QTableWidgetItem(r.get("branch", "")))
-            self.table.setItem(row, 3, QTableWidgetItem(r.get("fileName", "")))
-            self.table.setItem(row, 4, QTableWidgetItem(r.get("status", "")))
-            self.table.setItem(row, 5, QTableWidgetItem(r.get("commitSha", "")[:8] if r.get("commitSha") else ""))
-            self.table.setItem(row, 6, QTableWidgetItem(r.get("logPath", "")))
-            for col in range(7):
-                item = self.table.item(row, col)
-                if item:
-                    item.setData(Qt.ItemDataRole.UserRole, r)
-        self.table.resizeColumnsToContents()
-
-    def _get_selected_runs(self):
-        """Return list of run dicts for selected rows (each run is stored in row)."""
-        rows = set(self.table.selectedIndexes())
-        run_rows = set()
-        for idx in rows:
-            run_rows.add(idx.row())
-        runs = []
-        seen = set()
-        for row in run_rows:
-            item = self.table.item(row, 0)
-            if item:
-                r = item.data(Qt.ItemDataRole.UserRole)
-                if r is not None and id(r) not in seen:
-                    seen.add(id(r))
-                    runs.append(r)
-        return runs
-
-    def _run_key(self, r):
-        return (r.get("startTime"), r.get("repoFullName"), r.get("fileName"), r.get("branch"))
+        """Reload the repo filter values and the first page."""
+        current = self.repo_filter.currentData() or ""
+        self.repo_filter.blockSignals(True)
+        self.repo_filter.clear()
+        self.repo_filter.addItem("All", "")
+        for repo in run_store.distinct_values("repo"):
+            if repo:
+                self.repo_filter.addItem(repo, repo)
+        self.repo_filter.setCurrentIndex(max(self.repo_filter.findData(current), 0))
+        self.repo_filter.blockSignals(False)
+        self._reload()
+
+    def _reload(self):
+        self.model.reload(self._filters())
+        if not self._columns_sized and self.model.rowCount():
+            # Sized once from the first page, not from the whole history
+            self.table.resizeColumnsToContents()
+            self._columns_sized = True
+
+    def _update_count(self, *_args):
+        self.count_label.setText(f"{self.model.rowCount()} / {self.model.total()} runs")
+
+    def _show_log(self, row: int):
+        text = log_store.read_run_log(self.model.log_source(row))
+        if text is None:
+            QMessageBox.warning(self, "Log", "Không đọc được log của run này.")
+            return
+        repo = self.model.index(row, 1).data()
+        file_name = self.model.index(row, 3).data()
+        LogViewDialog(f"Log — {repo} / {file_name}", text, self).exec()
+
+    def _get_selected_ids(self) -> list[int]:
+        """Run ids of the selected rows."""
+        return [self.model.run_id(idx.row()) for idx in self.table.selectionModel().selectedRows(0)]
 
     def _delete_selected(self):
-        selected = self._get_selected_runs()
+        selected = self._get_selected_ids()
         if not selected:
             QMessageBox.warning(self, "Runs", "Chọn ít nhất một dòng để xóa.")
             return
@@ -117,18 +338,12 @@ class RunsPage(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
-        runs = read_json("runs.json")
-        if not isinstance(runs, list):
-            runs = []
-        keys_to_remove = {self._run_key(r) for r in selected}
-        runs = [r for r in runs if self._run_key(r) not in keys_to_remove]
-        write_json("runs.json", runs)
+        run_store.delete_runs(selected)
         self.refresh_runs()
         QMessageBox.information(self, "Runs", "Đã xóa.")
 
     def _delete_all(self):
-        runs = read_json("runs.json")
-        if not isinstance(runs, list) or len(runs) == 0:
+        if run_store.count_runs() == 0:
             QMessageBox.information(self, "Runs", "Không có dữ liệu.")
             return
         reply = QMessageBox.question(
@@ -139,6 +354,6 @@ class RunsPage(QWidget):
         )
         if reply != QMessageBox.StandardButton.Yes:
             return
-        write_json("runs.json", [])
+        run_store.delete_all()
         self.refresh_runs()
         QMessageBox.information(self, "Runs", "Đã xóa hết.")